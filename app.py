@@ -8,7 +8,7 @@ Task 4: Interactive Chat Interface
 """
 
 import gradio as gr
-from typing import Tuple, List, Dict, Any, Optional
+from typing import Iterator, Tuple, List, Dict, Any, Optional
 import sys
 import re
 import warnings
@@ -27,6 +27,20 @@ from src.rag_pipeline import RAGPipeline
 # Global pipeline instance (loaded once at startup)
 pipeline: RAGPipeline = None
 
+# Minimum cosine similarity of a source (normalized embeddings: roughly 0.2-1.0);
+# 0.35 means sources must have at least moderate relevance
+MIN_SIMILARITY_THRESHOLD = 0.35
+
+# Queries the pipeline executes at once (each gets an equal share of the CPU
+# threads for FAISS and torch); Gradio admits as many requests as the
+# pipeline's pool accepts and queues the rest in the browser
+QUERY_WORKERS = 4
+MAX_PENDING_QUERIES = 8
+
+# Answers kept for rephrased questions (e.g. the example questions asked in
+# slightly different words skip retrieval and generation)
+RESULT_CACHE_SIZE = 256
+
 
 def initialize_pipeline():
     """Initialize the RAG pipeline once at startup."""
@@ -34,7 +48,20 @@ def initialize_pipeline():
     if pipeline is None:
         try:
             print("[INFO] Initializing RAG Pipeline...")
-            pipeline = RAGPipeline(top_k=5)
+            # Memory-map the index so multiple app workers share one copy,
+            # load models in the background so the UI can start serving at once,
+            # and pick up newly published vector store builds without a restart.
+            # Sources are distinct complaints rather than chunks of one narrative.
+            pipeline = RAGPipeline(
+                top_k=5,
+                index_load_mode="mmap",
+                background_load=True,
+                watch_interval=60.0,
+                collapse_by_complaint=True,
+                query_workers=QUERY_WORKERS,
+                max_pending_queries=MAX_PENDING_QUERIES,
+                result_cache_size=RESULT_CACHE_SIZE,
+            )
             print("[OK] RAG Pipeline ready")
         except Exception as e:
             print(f"[ERROR] Failed to initialize RAG Pipeline: {e}")
@@ -374,26 +401,101 @@ def extract_product_category(question: str) -> Optional[str]:
     return None
 
 
-def query_rag(question: str, history: List[List[str]]) -> Tuple[str, str]:
+def format_answer(answer: str, relevant_chunks: List[Dict[str, Any]]) -> str:
+    """
+    Format the answer with a relevance quality indicator for its sources.
+
+    Args:
+        answer: Answer text (possibly still being generated)
+        relevant_chunks: Sources the answer is based on
+
+    Returns:
+        Markdown answer text
+    """
+    answer_text = f"**Answer:**\n\n{answer}\n\n"
+    if not relevant_chunks:
+        return answer_text
+
+    # Calculate average similarity for quality assessment
+    avg_similarity = sum(
+        c.get("similarity_score", 0.0) for c in relevant_chunks
+    ) / len(relevant_chunks)
+
+    # Add quality indicator based on average similarity
+    if avg_similarity >= 0.6:
+        quality_indicator = "✅ **High Relevance** - Sources are highly relevant to your question"
+    elif avg_similarity >= 0.45:
+        quality_indicator = "⚠️ **Moderate Relevance** - Sources have moderate relevance to your question"
+    else:
+        quality_indicator = "⚠️ **Lower Relevance** - Consider refining your question for better results"
+
+    answer_text += f"**Relevance Quality:** {quality_indicator}\n\n"
+    return answer_text
+
+
+def format_sources(relevant_chunks: List[Dict[str, Any]], product_category: Optional[str]) -> str:
+    """
+    Format the sources panel.
+
+    Args:
+        relevant_chunks: Retrieved chunks that met the relevance threshold
+        product_category: Product category the retrieval was filtered by, if any
+
+    Returns:
+        Markdown sources display
+    """
+    if not relevant_chunks:
+        # Nothing met the relevance threshold, so generation was skipped
+        return (
+            f"⚠️ **No High-Relevance Sources Found**\n\n"
+            f"No complaint met the minimum relevance threshold "
+            f"(≥ {MIN_SIMILARITY_THRESHOLD:.2f} similarity).\n\n"
+            f"**Suggestions:**\n"
+            f"- Refine your question to be more specific about complaints\n"
+            f"- Use product-specific terms (Credit Cards, Savings Accounts, etc.)\n"
+            f"- Try rephrasing your question with complaint-related keywords\n"
+        )
+
+    sources_display = f"### Retrieved Complaint Sources ({len(relevant_chunks)} relevant source{'s' if len(relevant_chunks) != 1 else ''})\n\n"
+
+    # Retrieval is pre-filtered by product category, so every source
+    # already matches the category mentioned in the question
+    if product_category:
+        sources_display += (
+            f"✅ All sources match requested product category: **{product_category}**\n\n"
+        )
+
+    for idx, chunk in enumerate(relevant_chunks, 1):
+        sources_display += format_source_display(chunk, idx)
+
+    return sources_display
+
+
+def query_rag(question: str, history: List[List[str]]) -> Iterator[Tuple[str, str]]:
     """
     Process a user question through the RAG pipeline with relevance filtering.
 
+    Streams its output: the sources are shown as soon as retrieval finishes,
+    then the answer grows as it is generated.
+
     Args:
         question: User's question
         history: Chat history (Gradio format: [[user_msg, bot_msg], ...])
 
-    Returns:
-        Tuple of (answer_text, sources_display)
+    Yields:
+        Tuples of (answer_text, sources_display)
     """
     global pipeline
 
     if not question or not question.strip():
-        return "", "Please enter a question to query the complaint analysis system."
+        yield "", "Please enter a question to query the complaint analysis system."
+        return
 
     # Validate question scope
     is_valid, validation_message = validate_question_scope(question)
     if not is_valid:
-        return f"**⚠️ Out of Scope Question**\n\n{validation_message}", ""
+        yield f"**⚠️ Out of Scope Question**\n\n{validation_message}", ""
+        return
 
     try:
         # Initialize pipeline if not already done
@@ -403,122 +505,33 @@ def query_rag(question: str, history: List[List[str]]) -> Tuple[str, str]:
         # Extract product category if mentioned in question
         product_category = extract_product_category(question)
 
-        # Query the RAG pipeline (with optional product filtering)
-        if product_category:
-            result = pipeline.query(question.strip(), product_category=product_category)
-        else:
-            result = pipeline.query(question.strip())
-
-        # Extract answer and sources
-        answer = result.get("answer", "No answer generated.")
-        retrieved_chunks = result.get("retrieved_chunks", [])
-
-        # Filter sources by relevance (similarity threshold)
-        # Cosine similarity with normalized embeddings: range is approximately 0.2-1.0
-        # Threshold: 0.35 means sources must have at least moderate relevance
-        MIN_SIMILARITY_THRESHOLD = 0.35
-        relevant_chunks = [
-            chunk
-            for chunk in retrieved_chunks
-            if chunk.get("similarity_score", 0.0) >= MIN_SIMILARITY_THRESHOLD
-        ]
-
-        # Validate product category matching if product was mentioned
-        if product_category:
-            category_matched = [
-                c
-                for c in relevant_chunks
-                if c.get("metadata", {}).get("product_category") == product_category
-            ]
-            category_mismatch_count = len(relevant_chunks) - len(category_matched)
-
-            # If most results match the category, use only matching ones
-            if len(category_matched) >= 2:
-                relevant_chunks = category_matched
-        else:
-            category_mismatch_count = 0
-
-        # If we filtered out chunks, provide a warning
-        filtered_count = len(retrieved_chunks) - len(relevant_chunks)
-
-        # Calculate average similarity for quality assessment
-        if relevant_chunks:
-            avg_similarity = sum(
-                c.get("similarity_score", 0.0) for c in relevant_chunks
-            ) / len(relevant_chunks)
-        else:
-            avg_similarity = 0.0
-
-        # Format answer with relevance quality indicator
-        answer_text = f"**Answer:**\n\n{answer}\n\n"
-
-        # Add quality indicator based on average similarity
-        if relevant_chunks:
-            if avg_similarity >= 0.6:
-                quality_indicator = "✅ **High Relevance** - Sources are highly relevant to your question"
-            elif avg_similarity >= 0.45:
-                quality_indicator = "⚠️ **Moderate Relevance** - Sources have moderate relevance to your question"
-            else:
-                quality_indicator = "⚠️ **Lower Relevance** - Consider refining your question for better results"
-
-            answer_text += f"**Relevance Quality:** {quality_indicator}\n\n"
-
-        # Format sources with relevance validation
-        if relevant_chunks:
-            sources_display = f"### Retrieved Complaint Sources ({len(relevant_chunks)} relevant source{'s' if len(relevant_chunks) != 1 else ''})\n\n"
-
-            # Add quality and filtering information
-            quality_notes = []
-
-            if product_category:
-                matching_count = sum(
-                    1
-                    for c in relevant_chunks
-                    if c.get("metadata", {}).get("product_category") == product_category
-                )
-                if matching_count == len(relevant_chunks):
-                    quality_notes.append(
-                        f"✅ All sources match requested product category: **{product_category}**"
-                    )
-                elif matching_count > 0:
-                    quality_notes.append(
-                        f"⚠️ {matching_count}/{len(relevant_chunks)} sources match requested product category: **{product_category}**"
-                    )
-
-            if filtered_count > 0:
-                quality_notes.append(
-                    f"⚠️ {filtered_count} source{'s were' if filtered_count > 1 else ' was'} filtered out due to low relevance (< {MIN_SIMILARITY_THRESHOLD:.2f} similarity)"
-                )
-
-            if quality_notes:
-                sources_display += "\n".join(quality_notes) + "\n\n"
-
-            for idx, chunk in enumerate(relevant_chunks, 1):
-                sources_display += format_source_display(chunk, idx)
-        elif retrieved_chunks:
-            # We had chunks but they all failed the relevance threshold
-            sources_display = (
-                f"⚠️ **No High-Relevance Sources Found**\n\n"
-                f"Retrieved {len(retrieved_chunks)} source(s), but none met the minimum relevance threshold "
-                f"(≥ {MIN_SIMILARITY_THRESHOLD:.2f} similarity).\n\n"
-                f"**Suggestions:**\n"
-                f"- Refine your question to be more specific about complaints\n"
-                f"- Use product-specific terms (Credit Cards, Savings Accounts, etc.)\n"
-                f"- Try rephrasing your question with complaint-related keywords\n\n"
-                f"**Low-Relevance Sources (for reference):**\n\n"
-            )
-            for idx, chunk in enumerate(
-                retrieved_chunks[:3], 1
-            ):  # Show top 3 as reference
-                sources_display += format_source_display(chunk, idx)
-        else:
-            sources_display = "No sources retrieved for this query."
-
-        return answer_text, sources_display
+        # Query the RAG pipeline (with optional product filtering). Chunks below
+        # the relevance threshold are dropped during retrieval, so they never
+        # reach the prompt; if none qualify, no answer is generated. Sources are
+        # returned right away even if the generator model is still loading.
+        sources_display = ""
+        for result in pipeline.query_stream(
+            question.strip(),
+            product_category=product_category,
+            wait_for_generator=False,
+            min_similarity=MIN_SIMILARITY_THRESHOLD,
+        ):
+            relevant_chunks = result.get("retrieved_chunks", [])
+            if not sources_display:
+                sources_display = format_sources(relevant_chunks, product_category)
+            answer = result.get("answer") or ("" if result["done"] else "_Generating answer..._")
+            yield format_answer(answer, relevant_chunks), sources_display
+
+        timings = result["timings"]
+        first_token = timings.get("time_to_first_token")
+        print(
+            f"[INFO] Query answered: sources after {timings['time_to_sources'] * 1000:.0f} ms, "
+            + (f"first token after {first_token * 1000:.0f} ms" if first_token is not None else "nothing generated")
+        )
 
     except Exception as e:
         error_msg = f"**Error:** {str(e)}\n\nPlease ensure the vector store is properly initialized (complete Task 2)."
-        return error_msg, ""
+        yield error_msg, ""
 
 
 def clear_conversation() -> Tuple[str, str, str]:
@@ -608,6 +621,8 @@ def build_interface():
             """
         )
 
+    # Concurrent users: hand the pipeline no more requests than its pool accepts
+    demo.queue(default_concurrency_limit=QUERY_WORKERS + MAX_PENDING_QUERIES)
     return demo
 
 
@@ -0,0 +1,120 @@
+"""
+Benchmark Concurrent Querying
+
+Runs 1, 4 and 16 concurrent clients against one RAGPipeline and reports
+throughput (queries/s) and latency percentiles (p50 / p95 / p99) for two
+settings:
+
+    unbounded   one query worker per client and every worker allowed all
+                cores for FAISS and torch (what happens without governance)
+    governed    the pipeline's bounded query pool (--workers) with the CPU
+                threads split between the workers
+
+By default only retrieval (query embedding + FAISS search) runs; with
+--generate every query also generates an answer with the pipeline's
+generator model.
+
+Usage:
+    python scripts/benchmark_concurrency.py
+    python scripts/benchmark_concurrency.py --workers 4 --queries 400 --generate
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+CLIENT_COUNTS = [1, 4, 16]
+
+
+def make_questions(pipeline, count: int):
+    """Query-like texts taken from chunk prefixes of the store."""
+    chunks = pipeline.vector_store_loader.chunks
+    step = max(len(chunks) // count, 1)
+    return [chunks[row][:160] for row in range(0, len(chunks), step)][:count]
+
+
+def run_clients(pipeline, questions, clients: int, generate: bool):
+    """(queries/s, latencies in seconds) of questions issued by concurrent clients."""
+    def issue(question):
+        start = time.perf_counter()
+        if generate:
+            pipeline.query(question)
+        else:
+            pipeline.query_executor.run(pipeline.retriever.retrieve, question)
+        return time.perf_counter() - start
+
+    # Warm-up (query cache disabled, so this only warms the models)
+    for question in questions[:4]:
+        issue(question)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(issue, questions))
+    return len(questions) / (time.perf_counter() - start), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", type=Path, default=None,
+                        help="Vector store to query (defaults to project vector_store/)")
+    parser.add_argument("--workers", type=int, default=4, help="Query workers of the governed setting")
+    parser.add_argument("--threads", type=int, default=None, help="CPU thread budget (default: CPU count)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--generate", action="store_true", help="Also generate answers")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    from src.rag_pipeline import RAGPipeline
+
+    threads = args.threads or os.cpu_count() or 1
+    settings = [
+        ("unbounded", lambda clients: dict(
+            query_workers=clients, faiss_threads=threads, torch_threads=threads,
+        )),
+        ("governed", lambda clients: dict(query_workers=args.workers, total_threads=threads)),
+    ]
+
+    rows = []
+    for label, options in settings:
+        for clients in CLIENT_COUNTS:
+            try:
+                pipeline = RAGPipeline(
+                    args.vector_store_dir,
+                    query_cache_size=0,
+                    max_pending_queries=clients,
+                    **options(clients),
+                )
+            except RuntimeError as e:
+                print(f"[ERROR] {e}")
+                return 1
+            questions = make_questions(pipeline, args.queries)
+            throughput, latencies = run_clients(pipeline, questions, clients, args.generate)
+            budget = pipeline.thread_budget
+            pipeline.close()
+            latencies = np.asarray(latencies) * 1000
+            rows.append((
+                label, clients, budget.query_workers, budget.torch_threads, budget.faiss_threads,
+                throughput, *np.percentile(latencies, [50, 95, 99]),
+            ))
+
+    print("=" * 80)
+    print("CONCURRENT QUERY BENCHMARK")
+    print("=" * 80)
+    print(f"CPU threads: {threads}   queries per run: {args.queries}   "
+          f"{'retrieval + generation' if args.generate else 'retrieval only'}\n")
+    print(f"{'setting':<12}{'clients':>8}{'workers':>9}{'torch':>7}{'faiss':>7}"
+          f"{'q/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, clients, workers, torch_threads, faiss_threads, throughput, p50, p95, p99 in rows:
+        print(f"{label:<12}{clients:>8}{workers:>9}{torch_threads:>7}{faiss_threads:>7}"
+              f"{throughput:>10.1f}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Benchmark Query Embedding Backends
+
+Compares the query encoders VectorStoreLoader can serve with: the PyTorch
+SentenceTransformer, its ONNX export and the int8-quantized ONNX export.
+For each backend it reports single-query latency (p50 / p95) and batched
+throughput (queries/s) for batch sizes 1, 8 and 32, plus the minimum cosine
+similarity of its embeddings to the torch embeddings.
+
+The ONNX variants are read from the store's onnx/ export (written by
+``python -m src.store_builder build ... --export-onnx``); with --export they
+are exported to a temporary directory first. Needs onnx and onnxruntime.
+
+Usage:
+    python scripts/benchmark_embedding_backends.py
+    python scripts/benchmark_embedding_backends.py --export --queries 500
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BATCH_SIZES = [1, 8, 32]
+SAMPLE_QUERIES = [
+    "Why are people unhappy with credit card fees?",
+    "What problems do customers report with money transfers?",
+    "Are there complaints about personal loan interest rates?",
+    "Why was my savings account frozen?",
+    "unexpected annual fee charged on my statement",
+    "wire transfer never arrived and customer service was unhelpful",
+]
+
+
+def load_queries(store_dir: Path, count: int):
+    """Query-like texts: chunk prefixes from the store, or the sample questions."""
+    from src.vector_store_loader import VectorStoreLoader
+
+    loader = VectorStoreLoader(store_dir)
+    if loader.check_files():
+        store = loader.load_chunks()
+        step = max(len(store.chunks) // count, 1)
+        texts = [store.chunks[row][:200] for row in range(0, len(store.chunks), step)][:count]
+        if texts:
+            return loader.resolve_model_name(), texts
+    texts = (SAMPLE_QUERIES * (count // len(SAMPLE_QUERIES) + 1))[:count]
+    return loader.resolve_model_name(), texts
+
+
+def benchmark(model, queries):
+    """(p50 ms, p95 ms) of single queries and queries/s per batch size."""
+    import numpy as np
+
+    model.encode(queries[:8], convert_to_numpy=True)  # warm-up
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        model.encode([query], convert_to_numpy=True)
+        latencies.append(time.perf_counter() - start)
+    throughput = {}
+    for batch_size in BATCH_SIZES:
+        start = time.perf_counter()
+        for offset in range(0, len(queries), batch_size):
+            model.encode(queries[offset:offset + batch_size], batch_size=batch_size, convert_to_numpy=True)
+        throughput[batch_size] = len(queries) / (time.perf_counter() - start)
+    latencies = np.asarray(latencies) * 1000
+    return float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95)), throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", type=Path, default=None,
+                        help="Vector store whose model and onnx/ export to use (defaults to project vector_store/)")
+    parser.add_argument("--export", action="store_true",
+                        help="Export the model to ONNX first instead of using the store's export")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime intra-op threads")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    from src.embedding_backends import (
+        COSINE_TOLERANCE,
+        ONNX_BACKENDS,
+        ONNX_DIRNAME,
+        OnnxEmbeddingModel,
+        cosine_agreement,
+        export_onnx,
+    )
+
+    store_dir = args.vector_store_dir or Path(__file__).parent.parent / "vector_store"
+    model_name, queries = load_queries(store_dir, args.queries)
+    torch_model = SentenceTransformer(model_name)
+    reference = torch_model.encode(queries, convert_to_numpy=True, normalize_embeddings=True)
+
+    build_dir = store_dir
+    if args.export:
+        build_dir = Path(tempfile.mkdtemp(prefix="onnx_export_"))
+        try:
+            export_onnx(torch_model, model_name, build_dir, queries[:32], reference[:32])
+        except ImportError as e:
+            print(f"[ERROR] ONNX export needs onnx and onnxruntime: {e}")
+            return 1
+
+    backends = [("torch", torch_model)]
+    for variant in ONNX_BACKENDS:
+        try:
+            backends.append((variant, OnnxEmbeddingModel(build_dir / ONNX_DIRNAME, variant, args.threads)))
+        except (ImportError, OSError) as e:
+            print(f"[INFO] Skipping {variant}: {e}")
+
+    print("=" * 80)
+    print("QUERY EMBEDDING BACKEND BENCHMARK")
+    print("=" * 80)
+    print(f"Model: {model_name}   queries: {len(queries)}\n")
+    header = "".join(f"{f'batch {b} q/s':>14}" for b in BATCH_SIZES)
+    print(f"{'backend':<12}{'p50 ms':>9}{'p95 ms':>9}{header}{'min cosine':>13}")
+    for label, model in backends:
+        p50, p95, throughput = benchmark(model, queries)
+        agreement = cosine_agreement(model, queries, reference)
+        flag = "" if agreement >= 1.0 - COSINE_TOLERANCE.get(label, 1e-4) else "  (outside tolerance)"
+        rates = "".join(f"{throughput[b]:>14.1f}" for b in BATCH_SIZES)
+        print(f"{label:<12}{p50:>9.2f}{p95:>9.2f}{rates}{agreement:>13.5f}{flag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
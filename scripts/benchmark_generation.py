@@ -0,0 +1,97 @@
+"""
+Benchmark Batched Generation
+
+Generates answers for the same RAG prompts with Generator.generate_many at
+batch sizes 1, 4 and 8 and reports generated tokens/s and seconds per prompt
+for each. Batch size 1 is the serial generate() path every prompt took
+before generate_many.
+
+Prompts are built with PromptTemplate from sample questions and chunks of
+the vector store (or the questions alone when no store is built).
+
+Usage:
+    python scripts/benchmark_generation.py
+    python scripts/benchmark_generation.py --model gpt2 --prompts 16 --max-new-tokens 64
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BATCH_SIZES = [1, 4, 8]
+SAMPLE_QUESTIONS = [
+    "Why are people unhappy with credit card fees?",
+    "What problems do customers report with money transfers?",
+    "Are there complaints about personal loan interest rates?",
+    "Why was my savings account frozen?",
+]
+
+
+def build_prompts(store_dir: Path, count: int, context_chars: int):
+    """RAG prompts pairing the sample questions with chunks of the store."""
+    from src.prompt_template import PromptTemplate
+    from src.vector_store_loader import VectorStoreLoader
+
+    loader = VectorStoreLoader(store_dir)
+    chunks = loader.load_chunks().chunks if loader.check_files() else []
+    prompts = []
+    for i in range(count):
+        question = SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]
+        context = "\n\n".join(
+            f"[Complaint {n + 1}]\n{chunks[(2 * i + n) % len(chunks)][:context_chars]}"
+            for n in range(2)
+        ) if chunks else "No relevant complaints found."
+        prompts.append(PromptTemplate.build_prompt(question, context))
+    return prompts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", type=Path, default=None,
+                        help="Vector store to take context chunks from (defaults to project vector_store/)")
+    parser.add_argument("--model", default="gpt2", help="Generator model")
+    parser.add_argument("--prompts", type=int, default=16)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--context-chars", type=int, default=400, help="Characters kept per context chunk")
+    args = parser.parse_args()
+
+    import torch
+
+    from src.generator import Generator
+
+    store_dir = args.vector_store_dir or Path(__file__).parent.parent / "vector_store"
+    prompts = build_prompts(store_dir, args.prompts, args.context_chars)
+    generator = Generator(model_name=args.model, device="cpu")
+    if generator.model is None:
+        print(f"[ERROR] Could not load generator model {args.model}")
+        return 1
+
+    generator.generate_many(prompts[:2], max_length=8)  # warm-up
+    rows = []
+    for batch_size in BATCH_SIZES:
+        start = time.perf_counter()
+        answers = generator.generate_many(prompts, max_length=args.max_new_tokens, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+        tokens = sum(len(generator.tokenizer.encode(answer)) for answer in answers)
+        rows.append((batch_size, tokens, seconds))
+
+    print("=" * 80)
+    print("BATCHED GENERATION BENCHMARK")
+    print("=" * 80)
+    print(f"Model: {args.model}   prompts: {len(prompts)}   max new tokens: {args.max_new_tokens}   "
+          f"torch threads: {torch.get_num_threads()}\n")
+    print(f"{'batch':>6}{'tokens':>9}{'seconds':>10}{'tokens/s':>11}{'s/prompt':>10}{'speedup':>9}")
+    serial_rate = rows[0][1] / rows[0][2]
+    for batch_size, tokens, seconds in rows:
+        rate = tokens / seconds
+        print(f"{batch_size:>6}{tokens:>9}{seconds:>10.2f}{rate:>11.1f}"
+              f"{seconds / len(prompts):>10.2f}{rate / serial_rate:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Benchmark FAISS Index Loading Modes
+
+Compares cold-start time and memory footprint of the "eager" and "mmap"
+index load modes of VectorStoreLoader. Each measurement runs in a fresh
+subprocess so that heap usage from one mode cannot leak into the other.
+
+Usage:
+    python scripts/benchmark_index_loading.py
+    python scripts/benchmark_index_loading.py --synthetic-vectors 500000 --runs 5
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def read_process_memory() -> dict:
+    """Return this process's RSS split into anonymous (private heap) and file-backed pages."""
+    memory = {"rss_bytes": None, "rss_anon_bytes": None, "rss_file_bytes": None}
+    status_path = Path("/proc/self/status")
+    if status_path.exists():
+        keys = {"VmRSS:": "rss_bytes", "RssAnon:": "rss_anon_bytes", "RssFile:": "rss_file_bytes"}
+        for line in status_path.read_text().splitlines():
+            fields = line.split()
+            if fields and fields[0] in keys:
+                memory[keys[fields[0]]] = int(fields[1]) * 1024
+    else:
+        import resource
+
+        # ru_maxrss is the peak RSS (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory["rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return memory
+
+
+def run_child(mode: str, vector_store_dir: str, queries: int) -> None:
+    """Load the index in the given mode, run a few searches and print a JSON report."""
+    import numpy as np
+    from src.vector_store_loader import VectorStoreLoader
+
+    before = read_process_memory()
+    loader = VectorStoreLoader(Path(vector_store_dir), index_load_mode=mode)
+    index = loader.load_index()
+    after_load = read_process_memory()
+
+    # A flat index scan touches every vector, so this measures the steady state
+    rng = np.random.default_rng(0)
+    query_vectors = rng.standard_normal((queries, index.d)).astype("float32")
+    start = time.perf_counter()
+    index.search(query_vectors, 5)
+    first_search_seconds = time.perf_counter() - start
+    after_search = read_process_memory()
+
+    print(json.dumps({
+        "mode": mode,
+        "load_seconds": loader.index_load_seconds,
+        "first_search_seconds": first_search_seconds,
+        "memory_before": before,
+        "memory_after_load": after_load,
+        "memory_after_search": after_search,
+        "index_memory": loader.get_index_memory(),
+    }))
+
+
+def build_synthetic_store(num_vectors: int, dimension: int) -> Path:
+    """Write a normalized random IndexFlatIP to a temporary vector store directory."""
+    import faiss
+    import numpy as np
+
+    store_dir = Path(tempfile.mkdtemp(prefix="bench_vector_store_"))
+    rng = np.random.default_rng(42)
+    index = faiss.IndexFlatIP(dimension)
+    for start in range(0, num_vectors, 50_000):
+        batch = rng.standard_normal((min(50_000, num_vectors - start), dimension)).astype("float32")
+        faiss.normalize_L2(batch)
+        index.add(batch)
+    faiss.write_index(index, str(store_dir / "complaint_embeddings.index"))
+    return store_dir
+
+
+def format_mb(value) -> str:
+    return "n/a" if value is None else f"{value / 1e6:,.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", type=Path, default=None,
+                        help="Vector store to benchmark (defaults to project vector_store/)")
+    parser.add_argument("--synthetic-vectors", type=int, default=0,
+                        help="Benchmark a synthetic flat index with this many vectors instead")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--child", choices=["eager", "mmap"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, str(args.vector_store_dir), args.queries)
+        return 0
+
+    if args.synthetic_vectors:
+        print(f"Building synthetic index with {args.synthetic_vectors:,} vectors...")
+        store_dir = build_synthetic_store(args.synthetic_vectors, args.dimension)
+    else:
+        store_dir = args.vector_store_dir or Path(__file__).parent.parent / "vector_store"
+        if not (store_dir / "complaint_embeddings.index").exists():
+            print(f"[ERROR] No index found in {store_dir}. Use --synthetic-vectors to benchmark without one.")
+            return 1
+
+    print("=" * 80)
+    print("FAISS INDEX LOADING BENCHMARK")
+    print("=" * 80)
+    print(f"Vector store: {store_dir}\n")
+
+    reports = {"eager": [], "mmap": []}
+    for run in range(args.runs):
+        for mode in reports:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode,
+                 "--vector-store-dir", str(store_dir), "--queries", str(args.queries)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            reports[mode].append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8}{'load (median)':>16}{'1st search':>14}{'RSS':>14}{'private':>14}{'file-backed':>14}")
+    for mode, runs in reports.items():
+        runs.sort(key=lambda r: r["load_seconds"])
+        median = runs[len(runs) // 2]
+        memory = median["memory_after_search"]
+        base = median["memory_before"]
+        private = None
+        if memory["rss_anon_bytes"] is not None:
+            private = memory["rss_anon_bytes"] - base["rss_anon_bytes"]
+        print(
+            f"{mode:<8}{median['load_seconds'] * 1000:>13.1f} ms"
+            f"{median['first_search_seconds'] * 1000:>11.1f} ms"
+            f"{format_mb(memory['rss_bytes'] - base['rss_bytes']):>14}"
+            f"{format_mb(private):>14}"
+            f"{format_mb(memory['rss_file_bytes'] and memory['rss_file_bytes'] - base['rss_file_bytes']):>14}"
+        )
+
+    print("\nRSS/private/file-backed are growth over the pre-load baseline of each process.")
+    print("File-backed pages of an mmap load are shared by all processes mapping the index.")
+
+    if args.synthetic_vectors:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Benchmark FAISS Index Types
+
+Builds every index type supported by the vector store (flat, ivf_flat,
+ivf_pq, hnsw, sq8) over the same vectors and reports build time, index size,
+query latency (p50/p95) and recall@k against the exact flat index, for a
+sweep of nprobe (IVF) and efSearch (HNSW) values.
+
+Usage:
+    python scripts/benchmark_index_types.py
+    python scripts/benchmark_index_types.py --synthetic-vectors 500000 --queries 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+NPROBE_SWEEP = [1, 4, 16, 64]
+EF_SEARCH_SWEEP = [16, 32, 64, 128]
+
+
+def load_vectors(vector_store_dir: Path):
+    """Reconstruct the vectors of an existing (possibly sharded) vector store."""
+    from src.vector_store_loader import VectorStoreLoader
+
+    loader = VectorStoreLoader(vector_store_dir)
+    index = loader.load_index()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def synthetic_vectors(num_vectors: int, dimension: int):
+    """Clustered, normalized random vectors (closer to real embeddings than pure noise)."""
+    import faiss
+    import numpy as np
+
+    rng = np.random.default_rng(42)
+    centers = rng.standard_normal((max(num_vectors // 500, 1), dimension)).astype("float32")
+    vectors = centers[rng.integers(0, len(centers), num_vectors)]
+    vectors += 0.5 * rng.standard_normal(vectors.shape).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def measure(index, queries, truth, k: int, params=None) -> dict:
+    """Per-query latency percentiles and recall@k against the exact neighbours."""
+    import numpy as np
+
+    latencies, found = [], []
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        if params is None:
+            _, labels = index.search(queries[i:i + 1], k)
+        else:
+            _, labels = index.search(queries[i:i + 1], k, params=params)
+        latencies.append(time.perf_counter() - start)
+        found.append(len(set(labels[0].tolist()) & set(truth[i].tolist())) / k)
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "recall": float(np.mean(found)),
+    }
+
+
+def index_bytes(index) -> int:
+    import faiss
+
+    return len(faiss.serialize_index(index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", type=Path, default=None,
+                        help="Vector store whose vectors to index (defaults to project vector_store/)")
+    parser.add_argument("--synthetic-vectors", type=int, default=0,
+                        help="Benchmark synthetic vectors instead of a vector store")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    import numpy as np
+    from src.index_types import INDEX_TYPES, build_index, make_search_params
+
+    if args.synthetic_vectors:
+        print(f"Generating {args.synthetic_vectors:,} synthetic vectors...")
+        vectors = synthetic_vectors(args.synthetic_vectors + args.queries, args.dimension)
+    else:
+        store_dir = args.vector_store_dir or Path(__file__).parent.parent / "vector_store"
+        if not (store_dir / "complaint_embeddings.index").exists() and not (store_dir / "shards.json").exists():
+            print(f"[ERROR] No index found in {store_dir}. Use --synthetic-vectors to benchmark without one.")
+            return 1
+        vectors = load_vectors(store_dir)
+
+    # Held-out vectors act as queries so they are not their own nearest neighbour
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(vectors))
+    queries = np.ascontiguousarray(vectors[order[:args.queries]])
+    vectors = np.ascontiguousarray(vectors[order[args.queries:]])
+
+    print("=" * 80)
+    print("FAISS INDEX TYPE BENCHMARK")
+    print("=" * 80)
+    print(f"Vectors: {len(vectors):,} x {vectors.shape[1]}   queries: {len(queries)}   k: {args.k}\n")
+
+    exact = build_index(vectors, "flat")
+    _, truth = exact.search(queries, args.k)
+
+    print(f"{'index':<10}{'knob':<14}{'build':>10}{'size':>12}{'p50':>10}{'p95':>10}{'recall@k':>10}")
+    for index_type in INDEX_TYPES:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type)
+        build_seconds = time.perf_counter() - start
+        size = f"{index_bytes(index) / 1e6:,.1f} MB"
+
+        if index_type.startswith("ivf"):
+            knobs = [(f"nprobe={n}", make_search_params(index_type, nprobe=n)) for n in NPROBE_SWEEP]
+        elif index_type == "hnsw":
+            knobs = [(f"efSearch={e}", make_search_params(index_type, ef_search=e)) for e in EF_SEARCH_SWEEP]
+        else:
+            knobs = [("-", None)]
+
+        for knob, params in knobs:
+            result = measure(index, queries, truth, args.k, params)
+            print(
+                f"{index_type:<10}{knob:<14}{build_seconds:>8.2f} s{size:>12}"
+                f"{result['p50_ms']:>7.2f} ms{result['p95_ms']:>7.2f} ms{result['recall']:>10.3f}"
+            )
+
+    print("\nLatency is single-query search time; recall@k is measured against the flat index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Benchmark BM25 Lexical Index
+
+Builds the BM25 index over every chunk of a vector store (or a synthetic
+Zipf-distributed corpus) and reports build time, index size, save / open
+time and lexical query latency (p50/p95). With a vector store, it also
+compares end-to-end dense and hybrid retrieval latency per stage.
+
+Usage:
+    python scripts/benchmark_lexical_index.py
+    python scripts/benchmark_lexical_index.py --synthetic-docs 1000000 --queries 500
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+QUERY_TERMS = 3
+
+
+def synthetic_corpus(num_docs: int, vocabulary: int = 50000, doc_length: int = 80):
+    """Documents of Zipf-distributed words (word frequencies of natural text)."""
+    import numpy as np
+
+    rng = np.random.default_rng(42)
+    words = np.asarray([f"w{i}" for i in range(vocabulary)])
+    for _ in range(num_docs):
+        ids = np.minimum(rng.zipf(1.2, doc_length), vocabulary) - 1
+        yield " ".join(words[ids])
+
+
+def sample_queries(texts, num_queries: int):
+    """Queries of a few words picked from random documents."""
+    import numpy as np
+
+    from src.lexical_index import tokenize
+
+    rng = np.random.default_rng(0)
+    queries = []
+    while len(queries) < num_queries:
+        tokens = tokenize(texts[int(rng.integers(0, len(texts)))])
+        if tokens:
+            queries.append(" ".join(rng.choice(tokens, min(QUERY_TERMS, len(tokens)), replace=False)))
+    return queries
+
+
+def percentiles(latencies) -> str:
+    import numpy as np
+
+    latencies = np.asarray(latencies) * 1000
+    return f"p50 {np.percentile(latencies, 50):.2f} ms   p95 {np.percentile(latencies, 95):.2f} ms"
+
+
+def compare_retrieval(store_dir: Path, queries, k: int):
+    """Dense vs hybrid Retriever latency per stage, on the store's own model."""
+    from src.vector_store_loader import VectorStoreLoader
+    from src.retriever import Retriever
+
+    loader = VectorStoreLoader(store_dir)
+    if not loader.load():
+        return
+    print("\nRetriever stages (ms)")
+    print(f"{'mode':<8}{'stage':<16}{'p50':>10}{'p95':>10}")
+    for mode in ("dense", "hybrid"):
+        # No query cache, so every query pays for its embedding
+        retriever = Retriever(loader, top_k=k, retrieval_mode=mode, query_cache_size=0)
+        for query in queries:
+            retriever.retrieve(query)
+        for stage, stats in retriever.latency.get_stats().items():
+            print(f"{mode:<8}{stage:<16}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", type=Path, default=None,
+                        help="Vector store whose chunks to index (defaults to project vector_store/)")
+    parser.add_argument("--synthetic-docs", type=int, default=0,
+                        help="Benchmark a synthetic corpus instead of a vector store")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=50)
+    args = parser.parse_args()
+
+    from src.lexical_index import BM25Index, LexicalSearcher
+
+    store_dir = None
+    if args.synthetic_docs:
+        print(f"Generating {args.synthetic_docs:,} synthetic documents...")
+        texts = list(synthetic_corpus(args.synthetic_docs))
+    else:
+        from src.chunk_store import ChunkStore, STORE_DIRNAME
+
+        store_dir = args.vector_store_dir or Path(__file__).parent.parent / "vector_store"
+        if not (store_dir / STORE_DIRNAME).exists():
+            print(f"[ERROR] No chunk store found in {store_dir}. Use --synthetic-docs to benchmark without one.")
+            return 1
+        texts = ChunkStore.open(store_dir / STORE_DIRNAME).chunks
+
+    print("=" * 80)
+    print("BM25 LEXICAL INDEX BENCHMARK")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    index = BM25Index.build(texts)
+    build_seconds = time.perf_counter() - start
+    print(f"Documents:      {index.num_docs:,}   terms: {len(index.terms):,}   postings: {len(index.doc_ids):,}")
+    print(f"Build:          {build_seconds:.2f} s ({index.num_docs / max(build_seconds, 1e-9):,.0f} docs/s)")
+    print(f"Index size:     {index.nbytes() / 1e6:,.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        index.save(Path(tmp))
+        save_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        opened = BM25Index.open(Path(tmp))
+        open_seconds = time.perf_counter() - start
+        print(f"Save / open:    {save_seconds:.2f} s / {open_seconds * 1000:.1f} ms (memory-mapped)")
+
+        queries = sample_queries(texts, args.queries)
+        searcher = LexicalSearcher([(opened, 0)])
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            searcher.search(query, args.k)
+            latencies.append(time.perf_counter() - start)
+        print(f"Query (k={args.k}):  {percentiles(latencies)}   ({len(queries)} queries of {QUERY_TERMS} terms)")
+        del searcher, opened
+
+    if store_dir is not None:
+        compare_retrieval(store_dir, queries, args.k)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Benchmark MMR Diversity Reranking
+
+Measures the latency MMR reranking adds per query: reconstructing the
+candidate vectors from the index plus the vectorized greedy selection, for a
+sweep of candidate-pool sizes. With a vector store, it also reports the
+Retriever's per-stage latency with and without MMR and how many distinct
+complaints the top-k covers.
+
+Usage:
+    python scripts/benchmark_mmr.py
+    python scripts/benchmark_mmr.py --synthetic-vectors 200000 --queries 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+POOL_SWEEP = [10, 20, 50, 100]
+LAMBDA = 0.5
+
+
+def percentiles(latencies) -> str:
+    import numpy as np
+
+    latencies = np.asarray(latencies) * 1000
+    return f"{np.percentile(latencies, 50):>8.3f}{np.percentile(latencies, 95):>8.3f}"
+
+
+def benchmark_pools(index, queries, k: int):
+    """Search + reconstruct + MMR latency per pool size, on a raw FAISS index."""
+    from src.diversity import mmr_select
+
+    print(f"{'pool':>6}{'search p50':>12}{'p95':>8}{'rebuild p50':>13}{'p95':>8}{'mmr p50':>10}{'p95':>8}   (ms)")
+    for pool in POOL_SWEEP:
+        search, rebuild, select = [], [], []
+        for query in queries:
+            start = time.perf_counter()
+            _, labels = index.search(query[None, :], pool)
+            search.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            vectors = index.reconstruct_batch(labels[0])
+            rebuild.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            mmr_select(query, vectors, k, LAMBDA)
+            select.append(time.perf_counter() - start)
+        print(f"{pool:>6}    {percentiles(search)}     {percentiles(rebuild)}  {percentiles(select)}")
+
+
+def compare_retrieval(store_dir: Path, num_queries: int, k: int):
+    """Retriever stage latency and complaint coverage with and without MMR."""
+    import numpy as np
+
+    from src.vector_store_loader import VectorStoreLoader
+    from src.retriever import Retriever
+
+    loader = VectorStoreLoader(store_dir)
+    if not loader.load():
+        return
+    snapshot = loader.get_snapshot()
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(snapshot.chunks), min(num_queries, len(snapshot.chunks)), replace=False)
+    queries = [snapshot.chunks[int(row)][:200] for row in rows]
+
+    print(f"\n{'setting':<18}{'stage':<14}{'p50 ms':>10}{'p95 ms':>10}   distinct complaints in top-{k}")
+    for label, mmr_lambda in (("no MMR", None), (f"MMR lambda={LAMBDA}", LAMBDA)):
+        retriever = Retriever(loader, top_k=k, mmr_lambda=mmr_lambda)
+        distinct = []
+        for query in queries:
+            results = retriever.retrieve(query)
+            distinct.append(len({r["metadata"].get("complaint_id") for r in results}))
+        for stage, stats in retriever.latency.get_stats().items():
+            print(f"{label:<18}{stage:<14}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+        print(f"{label:<18}{'':<34}   {np.mean(distinct):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", type=Path, default=None,
+                        help="Vector store to benchmark (defaults to project vector_store/)")
+    parser.add_argument("--synthetic-vectors", type=int, default=0,
+                        help="Benchmark synthetic vectors instead of a vector store")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    import numpy as np
+    from benchmark_index_types import load_vectors, synthetic_vectors
+    from src.index_types import build_index
+
+    store_dir = None
+    if args.synthetic_vectors:
+        print(f"Generating {args.synthetic_vectors:,} synthetic vectors...")
+        vectors = synthetic_vectors(args.synthetic_vectors + args.queries, args.dimension)
+    else:
+        store_dir = args.vector_store_dir or Path(__file__).parent.parent / "vector_store"
+        if not (store_dir / "complaint_embeddings.index").exists() and not (store_dir / "shards.json").exists():
+            print(f"[ERROR] No index found in {store_dir}. Use --synthetic-vectors to benchmark without one.")
+            return 1
+        vectors = load_vectors(store_dir)
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(vectors))
+    queries = np.ascontiguousarray(vectors[order[:args.queries]])
+    index = build_index(np.ascontiguousarray(vectors[order[args.queries:]]), "flat")
+
+    print("=" * 80)
+    print("MMR RERANKING BENCHMARK")
+    print("=" * 80)
+    print(f"Vectors: {index.ntotal:,} x {index.d}   queries: {len(queries)}   k: {args.k}   lambda: {LAMBDA}\n")
+    benchmark_pools(index, queries, args.k)
+
+    if store_dir is not None:
+        compare_retrieval(store_dir, args.queries, args.k)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
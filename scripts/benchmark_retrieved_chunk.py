@@ -0,0 +1,134 @@
+"""
+Benchmark Retrieval Result Objects
+
+Compares building top-k results as per-hit dicts (text and metadata decoded
+eagerly) with RetrievedChunk hits (row id + score; text and metadata decoded
+on access), for top_k=50 by default. Reports per-query build latency and
+allocated bytes (tracemalloc). It measures results that are only partly read,
+like the sources panel showing the first few, and results that are fully read.
+
+Usage:
+    python scripts/benchmark_retrieved_chunk.py
+    python scripts/benchmark_retrieved_chunk.py --rows 200000 --top-k 50 --repeats 2000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+CHUNK_LENGTH = 500
+READ_FIRST = 5
+
+
+def synthetic_store(num_rows: int):
+    """Columnar chunk store with complaint-like text and metadata."""
+    import numpy as np
+
+    from src.chunk_store import ChunkStore
+
+    rng = np.random.default_rng(0)
+    words = np.asarray(["account", "fee", "charged", "card", "transfer", "loan", "bank", "refund"])
+    chunks = [" ".join(rng.choice(words, CHUNK_LENGTH // 7)) for _ in range(num_rows)]
+    categories = ["Credit Cards", "Personal Loans", "Savings Accounts", "Money Transfers"]
+    metadata = [
+        {
+            "complaint_id": str(row // 3),
+            "product_category": categories[row % 4],
+            "issue": "Fees or interest",
+            "date_received": f"2023-{row % 12 + 1:02d}-15",
+            "chunk_index": row % 3,
+            "total_chunks": 3,
+        }
+        for row in range(num_rows)
+    ]
+    return ChunkStore.from_records(chunks, metadata)
+
+
+def as_dicts(store, distances, indices):
+    """Previous result format: one dict per hit, text and metadata decoded up front."""
+    return [
+        {
+            "chunk": store.chunks[idx],
+            "metadata": store.metadata[idx],
+            "similarity_score": float(distance),
+            "rank": rank,
+        }
+        for rank, (distance, idx) in enumerate(zip(distances, indices), 1)
+    ]
+
+
+def as_hits(store, distances, indices):
+    from src.retrieved_chunk import RetrievedChunk
+
+    return [
+        RetrievedChunk(store, idx, distance, rank)
+        for rank, (distance, idx) in enumerate(zip(distances.tolist(), indices.tolist()), 1)
+    ]
+
+
+def consume(results, count):
+    """Read text and metadata of the first count results, like a consumer would."""
+    for result in results[:count]:
+        result["chunk"]
+        result["metadata"].get("complaint_id")
+
+
+def measure(build, store, queries, read_count):
+    """(p50 microseconds per query, bytes allocated per query) of build + consume."""
+    import numpy as np
+
+    for distances, indices in queries[:20]:
+        # Warm-up (page in the store's columns)
+        consume(build(store, distances, indices), read_count)
+    latencies = []
+    for distances, indices in queries:
+        start = time.perf_counter()
+        consume(build(store, distances, indices), read_count)
+        latencies.append(time.perf_counter() - start)
+
+    distances, indices = queries[0]
+    tracemalloc.start()
+    results = build(store, distances, indices)
+    consume(results, read_count)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return float(np.percentile(latencies, 50) * 1e6), allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+
+    import numpy as np
+
+    print(f"Building a synthetic chunk store of {args.rows:,} rows...")
+    store = synthetic_store(args.rows)
+    rng = np.random.default_rng(1)
+    queries = [
+        (np.sort(rng.random(args.top_k, dtype=np.float32))[::-1], rng.integers(0, args.rows, args.top_k))
+        for _ in range(args.repeats)
+    ]
+
+    print("=" * 80)
+    print("RETRIEVAL RESULT OBJECT BENCHMARK")
+    print("=" * 80)
+    print(f"top_k: {args.top_k}   queries: {args.repeats}\n")
+    print(f"{'results':<16}{'read':<14}{'p50 / query':>14}{'allocated / query':>20}")
+    for read_label, read_count in ((f"first {READ_FIRST}", READ_FIRST), ("all", args.top_k)):
+        for label, build in (("dicts", as_dicts), ("RetrievedChunk", as_hits)):
+            micros, allocated = measure(build, store, queries, read_count)
+            print(f"{label:<16}{read_label:<14}{micros:>11.1f} us{allocated / 1024:>17.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,580 @@
+"""
+Build Pipeline Module
+
+Production replacement for the vector store build in
+notebooks/task-2-embeddings-vectorstore.ipynb:
+
+    read    Stream filtered_complaints.csv in batches, reading only the
+            columns the build needs
+    chunk   Split narratives on a process pool (Task 2 splitter settings)
+    embed   Encode in large blocks; every finished block is checkpointed so an
+            interrupted build resumes at the first missing block
+    write   Write the index, chunk store, sampling summary and manifest that
+            VectorStoreLoader reads (see store_builder.write_vector_store),
+            optionally with a verified ONNX / int8 export of the embedding
+            model for query encoding (see embedding_backends)
+
+Each stage reports its throughput (rows/s, chunks/s, embeddings/s).
+
+Usage:
+    python -m src.store_builder build data/filtered_complaints.csv vector_store
+    python -m src.store_builder build data/filtered_complaints.csv vector_store --sample-size 12000 --publish
+    python -m src.store_builder build data/filtered_complaints.csv vector_store --export-onnx
+"""
+
+import collections
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_backends import export_onnx, sample_rows
+from .embedding_cache import (
+    DEFAULT_CACHE_DIRNAME,
+    DEFAULT_MAX_BYTES,
+    CachedEncoder,
+    EmbeddingCache,
+)
+from .store_builder import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    TARGET_CATEGORIES,
+    chunk_complaints,
+    make_text_splitter,
+    map_to_product_category,
+    normalize_embeddings,
+    write_vector_store,
+)
+from .store_manifest import VERSIONS_DIRNAME, new_build_id, publish_version
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Columns of the Task 1 output that the build reads; the rest are never parsed
+NARRATIVE_COLUMN = "narrative"
+PRODUCT_COLUMN = "Product"
+DATE_COLUMN = "Date received"
+WORD_COUNT_COLUMN = "cleaned_word_count"
+COMPLAINT_ID_COLUMNS = ("complaint_id", "Complaint ID")
+
+CHECKPOINT_FILENAME = "checkpoint.json"
+
+# Splitter of each chunking worker process, created on first use
+_worker_splitter = None
+
+
+def _chunk_batch(
+    complaints: List[Dict[str, Any]], chunk_size: int, chunk_overlap: int
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Process-pool task: chunk one batch of complaints."""
+    global _worker_splitter
+    if _worker_splitter is None:
+        _worker_splitter = make_text_splitter(chunk_size, chunk_overlap)
+    return chunk_complaints(complaints, _worker_splitter)
+
+
+def _file_fingerprint(path: Path) -> Dict[str, Any]:
+    stat = Path(path).stat()
+    return {"path": str(Path(path).resolve()), "bytes": stat.st_size, "mtime": stat.st_mtime}
+
+
+class StageStats:
+    """Wall-clock time and item counts per build stage."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, stage: str, seconds: float, items: int = 0, unit: str = "items"):
+        entry = self.stages.setdefault(stage, {"seconds": 0.0, "items": 0, "unit": unit})
+        entry["seconds"] += seconds
+        entry["items"] += items
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-stage seconds, item counts and items per second."""
+        return {
+            stage: dict(
+                entry,
+                per_second=entry["items"] / entry["seconds"] if entry["seconds"] > 0 else None,
+            )
+            for stage, entry in self.stages.items()
+        }
+
+    def print_report(self):
+        print("\nBuild throughput:")
+        for stage, entry in self.report().items():
+            rate = entry["per_second"]
+            rate_text = f"{rate:,.0f} {entry['unit']}/s" if rate is not None else "-"
+            print(
+                f"  {stage:<8} {entry['items']:>12,} {entry['unit']:<10} "
+                f"{entry['seconds']:>8.2f}s  {rate_text}"
+            )
+
+
+class BuildPipeline:
+    """Streams a complaints CSV into a vector store build."""
+
+    def __init__(
+        self,
+        csv_path: Path,
+        output_dir: Path,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        embedding_model: Any = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        batch_rows: int = 20_000,
+        workers: Optional[int] = None,
+        embed_block_size: int = 8192,
+        encode_batch_size: int = 128,
+        sample_size: Optional[int] = None,
+        seed: int = 42,
+        num_shards: int = 1,
+        work_dir: Optional[Path] = None,
+        publish: bool = False,
+        use_embedding_cache: bool = True,
+        embedding_cache_dir: Optional[Path] = None,
+        embedding_cache_max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        index_type: str = "flat",
+        index_options: Optional[Dict[str, Any]] = None,
+        export_onnx: bool = False,
+    ):
+        """
+        Initialize the build pipeline.
+
+        Args:
+            csv_path: Task 1 output (filtered_complaints.csv)
+            output_dir: Vector store directory to write. With publish=True the build
+                goes to output_dir/versions/<build_id> and becomes the active version;
+                otherwise it replaces the index already in output_dir, whatever its
+                shard count.
+            model_name: SentenceTransformer model to embed with
+            embedding_model: Already loaded embedding model (loaded from model_name if omitted)
+            chunk_size: Characters per chunk
+            chunk_overlap: Overlap between chunks
+            batch_rows: CSV rows read (and chunked) per batch
+            workers: Chunking processes (None = CPU count, 0 = chunk in this process)
+            embed_block_size: Chunks per embedding checkpoint
+            encode_batch_size: Batch size passed to SentenceTransformer.encode
+            sample_size: Stratified sample of this many complaints across the target
+                categories (as in Task 2); None keeps every complaint
+            seed: Random seed for the sample
+            num_shards: Split the FAISS index into this many shards
+            work_dir: Checkpoint directory (defaults to output_dir/.build)
+            publish: Publish the build as a new version (hot-reloadable)
+            use_embedding_cache: Reuse embeddings of unchanged chunk texts from
+                earlier builds (see embedding_cache)
+            embedding_cache_dir: Cache location (defaults to output_dir/.embedding_cache)
+            embedding_cache_max_bytes: Size bound of the cache (None = unbounded)
+            index_type: FAISS index type (see index_types.INDEX_TYPES)
+            index_options: Extra keyword arguments for index_types.build_index
+                (nlist, pq_m, hnsw_m, nprobe, ef_search, ...)
+            export_onnx: Also export the embedding model to ONNX (fp32 and int8)
+                for query encoding, verified against the build's embeddings.
+                Needs onnx and onnxruntime; skipped with a warning without them.
+        """
+        self.csv_path = Path(csv_path)
+        self.output_dir = Path(output_dir)
+        self.model_name = model_name
+        self._embedding_model = embedding_model
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_rows = batch_rows
+        self.workers = os.cpu_count() if workers is None else workers
+        self.embed_block_size = embed_block_size
+        self.encode_batch_size = encode_batch_size
+        self.sample_size = sample_size
+        self.seed = seed
+        self.num_shards = num_shards
+        self.work_dir = Path(work_dir) if work_dir else self.output_dir / ".build"
+        self.publish = publish
+        self.index_type = index_type
+        self.index_options = index_options or {}
+        self.export_onnx = export_onnx
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        if use_embedding_cache:
+            self.embedding_cache = EmbeddingCache(
+                embedding_cache_dir or self.output_dir / DEFAULT_CACHE_DIRNAME,
+                model_name,
+                normalize=False,
+                max_bytes=embedding_cache_max_bytes,
+            )
+        self._encoder = None
+        self.stats = StageStats()
+
+    @property
+    def embedding_model(self):
+        if self._embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"Loading embedding model: {self.model_name}...")
+            self._embedding_model = SentenceTransformer(self.model_name)
+        return self._embedding_model
+
+    @property
+    def encoder(self):
+        """Embedding model, behind the embedding cache when it is enabled."""
+        if self._encoder is None:
+            if self.embedding_cache is None:
+                self._encoder = self.embedding_model
+            else:
+                self._encoder = CachedEncoder(self.embedding_cache, lambda: self.embedding_model)
+        return self._encoder
+
+    # ------------------------------------------------------------------
+    # Stage 1: streaming read
+    # ------------------------------------------------------------------
+
+    def _read_columns(self) -> Tuple[List[str], Optional[str]]:
+        import pandas as pd
+
+        header = list(pd.read_csv(self.csv_path, nrows=0).columns)
+        if NARRATIVE_COLUMN not in header or PRODUCT_COLUMN not in header:
+            raise ValueError(
+                f"{self.csv_path} needs '{NARRATIVE_COLUMN}' and '{PRODUCT_COLUMN}' columns"
+            )
+        id_column = next((c for c in COMPLAINT_ID_COLUMNS if c in header), None)
+        wanted = [NARRATIVE_COLUMN, PRODUCT_COLUMN, DATE_COLUMN, WORD_COUNT_COLUMN, id_column]
+        return [c for c in header if c in wanted], id_column
+
+    def sample_rows(self) -> Optional[np.ndarray]:
+        """
+        Choose the CSV row positions of a stratified sample.
+
+        Category sizes are allocated proportionally like the Task 2 notebook;
+        this first pass reads only the Product column.
+
+        Returns:
+            Sorted row positions, or None when no sample size is set
+        """
+        if self.sample_size is None:
+            return None
+        import pandas as pd
+
+        start = time.perf_counter()
+        categories = []
+        for batch in pd.read_csv(self.csv_path, usecols=[PRODUCT_COLUMN], chunksize=self.batch_rows):
+            categories.append(batch[PRODUCT_COLUMN].map(map_to_product_category).to_numpy())
+        categories = np.concatenate(categories) if categories else np.array([], dtype=object)
+        self.stats.add("sample", time.perf_counter() - start, len(categories), "rows")
+
+        available = {c: np.flatnonzero(categories == c) for c in TARGET_CATEGORIES}
+        total = sum(len(rows) for rows in available.values())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+        sizes = {
+            c: max(1, int(self.sample_size * len(rows) / total)) if len(rows) else 0
+            for c, rows in available.items()
+        }
+        largest = max(sizes, key=sizes.get)
+        sizes[largest] += self.sample_size - sum(sizes.values())
+
+        rng = np.random.default_rng(self.seed)
+        selected = [
+            rng.choice(rows, size=min(sizes[c], len(rows)), replace=False)
+            for c, rows in available.items()
+            if len(rows) and sizes[c] > 0
+        ]
+        return np.sort(np.concatenate(selected)).astype(np.int64)
+
+    def stream_complaints(
+        self, selected_rows: Optional[np.ndarray] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield batches of complaint dicts from the CSV, keeping only target categories.
+
+        complaint_id is taken from the CSV when it has one, otherwise it is
+        the row position, as in Task 2.
+        """
+        import pandas as pd
+
+        columns, id_column = self._read_columns()
+        reader = pd.read_csv(self.csv_path, usecols=columns, chunksize=self.batch_rows)
+        row_start = 0
+        while True:
+            start = time.perf_counter()
+            batch = next(reader, None)
+            if batch is None:
+                break
+            rows_read = len(batch)
+            positions = np.arange(row_start, row_start + rows_read)
+            row_start += rows_read
+
+            if selected_rows is not None:
+                in_sample = np.isin(positions, selected_rows)
+                batch, positions = batch[in_sample], positions[in_sample]
+            categories = batch[PRODUCT_COLUMN].map(map_to_product_category)
+            keep = (categories.isin(TARGET_CATEGORIES) & batch[NARRATIVE_COLUMN].notna()).to_numpy()
+
+            complaints = []
+            for position, category, values in zip(
+                positions[keep], categories[keep], batch[keep].to_dict("records")
+            ):
+                date = values.get(DATE_COLUMN)
+                word_count = values.get(WORD_COUNT_COLUMN)
+                complaints.append({
+                    "complaint_id": str(values[id_column]) if id_column else str(position),
+                    "narrative": values[NARRATIVE_COLUMN],
+                    "product_category": category,
+                    "product": values[PRODUCT_COLUMN],
+                    "date_received": str(date) if pd.notna(date) else None,
+                    "cleaned_word_count": word_count if pd.notna(word_count) else None,
+                })
+            self.stats.add("read", time.perf_counter() - start, rows_read, "rows")
+            yield complaints
+
+    # ------------------------------------------------------------------
+    # Stage 2: parallel chunking
+    # ------------------------------------------------------------------
+
+    def stream_chunks(
+        self, batches: Iterator[List[Dict[str, Any]]]
+    ) -> Iterator[Tuple[List[str], List[Dict[str, Any]], int]]:
+        """
+        Chunk complaint batches on a process pool, yielding results in input order.
+
+        At most two batches per worker are in flight, so memory stays bounded
+        while the CSV is still being read.
+
+        Yields:
+            Tuples of (chunk texts, chunk metadata, complaints in the batch)
+        """
+        if self.workers == 0:
+            splitter = make_text_splitter(self.chunk_size, self.chunk_overlap)
+            for complaints in batches:
+                start = time.perf_counter()
+                chunks, metadata = chunk_complaints(complaints, splitter)
+                self.stats.add("chunk", time.perf_counter() - start, len(chunks), "chunks")
+                yield chunks, metadata, len(complaints)
+            return
+
+        pending: Deque[Tuple[Future, int]] = collections.deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+
+            def collect():
+                future, num_complaints = pending.popleft()
+                start = time.perf_counter()
+                chunks, metadata = future.result()
+                self.stats.add("chunk", time.perf_counter() - start, len(chunks), "chunks")
+                return chunks, metadata, num_complaints
+
+            for complaints in batches:
+                start = time.perf_counter()
+                pending.append((
+                    pool.submit(_chunk_batch, complaints, self.chunk_size, self.chunk_overlap),
+                    len(complaints),
+                ))
+                self.stats.add("chunk", time.perf_counter() - start)
+                if len(pending) >= 2 * self.workers:
+                    yield collect()
+            while pending:
+                yield collect()
+
+    # ------------------------------------------------------------------
+    # Stage 3: checkpointed embedding
+    # ------------------------------------------------------------------
+
+    def _config_fingerprint(self, selected_rows: Optional[np.ndarray]) -> str:
+        config = {
+            "csv": _file_fingerprint(self.csv_path),
+            "model_name": self.model_name,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "embed_block_size": self.embed_block_size,
+            "sample": (
+                hashlib.sha256(selected_rows.tobytes()).hexdigest()
+                if selected_rows is not None else None
+            ),
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    def _open_checkpoint(self, fingerprint: str) -> int:
+        """Return the number of embedding blocks already done for this configuration."""
+        state_path = self.work_dir / CHECKPOINT_FILENAME
+        if state_path.exists():
+            with open(state_path, "r") as f:
+                state = json.load(f)
+            if state.get("fingerprint") == fingerprint:
+                return int(state.get("completed_blocks", 0))
+            print("[INFO] Build inputs changed since the last checkpoint; starting over")
+        if self.work_dir.exists():
+            shutil.rmtree(self.work_dir)
+        self.work_dir.mkdir(parents=True)
+        self._save_checkpoint(fingerprint, 0)
+        return 0
+
+    def _save_checkpoint(self, fingerprint: str, completed_blocks: int):
+        tmp_path = self.work_dir / f".{CHECKPOINT_FILENAME}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "fingerprint": fingerprint,
+                    "completed_blocks": completed_blocks,
+                    "updated_at": datetime.now().isoformat(),
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.work_dir / CHECKPOINT_FILENAME)
+
+    def _block_path(self, block: int) -> Path:
+        return self.work_dir / f"embeddings_{block:06d}.npy"
+
+    def _embed_block(self, block: int, chunks: List[str], fingerprint: str, resumed: bool) -> np.ndarray:
+        if resumed:
+            return np.load(self._block_path(block))
+        start = time.perf_counter()
+        embeddings = normalize_embeddings(
+            self.encoder.encode(
+                chunks,
+                batch_size=self.encode_batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+        )
+        self.stats.add("embed", time.perf_counter() - start, len(chunks), "embeddings")
+        tmp_path = self.work_dir / f".embeddings_{block:06d}.npy"
+        np.save(tmp_path, embeddings)
+        os.replace(tmp_path, self._block_path(block))
+        self._save_checkpoint(fingerprint, block + 1)
+        return embeddings
+
+    def _export_onnx(self, build_dir: Path, chunks: List[str], embeddings: np.ndarray):
+        rows = sample_rows(len(chunks))
+        try:
+            export_onnx(
+                self.embedding_model,
+                self.model_name,
+                build_dir,
+                [chunks[row] for row in rows],
+                embeddings[rows],
+            )
+        except ImportError as e:
+            print(f"Warning: ONNX export skipped ({e}); install onnx and onnxruntime to enable it")
+
+    # ------------------------------------------------------------------
+    # Full build
+    # ------------------------------------------------------------------
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the build end to end.
+
+        Returns:
+            The manifest of the written build, with "throughput" and
+            "embedding_cache" (hit/miss stats) entries
+        """
+        build_start = time.perf_counter()
+        print("=" * 80)
+        print(f"BUILDING VECTOR STORE from {self.csv_path}")
+        print("=" * 80)
+
+        selected_rows = self.sample_rows()
+        fingerprint = self._config_fingerprint(selected_rows)
+        completed_blocks = self._open_checkpoint(fingerprint)
+        if completed_blocks:
+            print(f"[INFO] Resuming: {completed_blocks} embedding blocks already checkpointed")
+
+        chunks: List[str] = []
+        metadata: List[Dict[str, Any]] = []
+        blocks: List[np.ndarray] = []
+        num_complaints = 0
+        category_counts: Dict[str, int] = collections.Counter()
+
+        for batch_chunks, batch_metadata, batch_complaints in self.stream_chunks(
+            self.stream_complaints(selected_rows)
+        ):
+            chunks.extend(batch_chunks)
+            metadata.extend(batch_metadata)
+            num_complaints += batch_complaints
+            category_counts.update(
+                m["product_category"] for m in batch_metadata if m["chunk_index"] == 0
+            )
+            # Embed every full block as soon as it is available
+            while len(chunks) - len(blocks) * self.embed_block_size >= self.embed_block_size:
+                block = len(blocks)
+                start = block * self.embed_block_size
+                blocks.append(self._embed_block(
+                    block,
+                    chunks[start:start + self.embed_block_size],
+                    fingerprint,
+                    resumed=block < completed_blocks,
+                ))
+            print(f"  {num_complaints:,} complaints -> {len(chunks):,} chunks, "
+                  f"{len(blocks) * self.embed_block_size:,} embedded")
+
+        if len(chunks) > len(blocks) * self.embed_block_size:
+            block = len(blocks)
+            blocks.append(self._embed_block(
+                block,
+                chunks[block * self.embed_block_size:],
+                fingerprint,
+                resumed=block < completed_blocks,
+            ))
+        if not chunks:
+            raise ValueError(f"No complaints in the target categories found in {self.csv_path}")
+        embeddings = np.concatenate(blocks)
+
+        summary = {
+            "total_complaints_sampled": num_complaints,
+            "target_sample_size": self.sample_size,
+            "category_distribution": dict(category_counts),
+            "total_chunks_created": len(chunks),
+            "embedding_model": self.model_name,
+            "embedding_dimension": int(embeddings.shape[1]),
+            "chunking_params": {
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap,
+            },
+            "index_type": self.index_type,
+            "creation_date": datetime.now().isoformat(),
+        }
+
+        start = time.perf_counter()
+        build_id = new_build_id()
+        build_dir = (
+            self.output_dir / VERSIONS_DIRNAME / build_id if self.publish else self.output_dir
+        )
+        if self.export_onnx:
+            # Before write_vector_store, so the export is covered by the manifest
+            self._export_onnx(build_dir, chunks, embeddings)
+        manifest = write_vector_store(
+            build_dir,
+            chunks,
+            metadata,
+            embeddings,
+            self.model_name,
+            num_shards=self.num_shards,
+            build_id=build_id,
+            attributes={"total_complaints": num_complaints},
+            summary=summary,
+            index_type=self.index_type,
+            index_options=self.index_options,
+        )
+        if self.publish:
+            publish_version(self.output_dir, build_dir)
+        self.stats.add("write", time.perf_counter() - start, len(chunks), "chunks")
+
+        # The build is complete; checkpoints are no longer needed
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+        self.stats.print_report()
+        cache_stats = None
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+            cache_stats = self.embedding_cache.get_stats()
+            if cache_stats["hit_rate"] is not None:
+                print(
+                    f"  cache    {cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses "
+                    f"({cache_stats['hit_rate']:.1%}), {cache_stats['entries']:,} entries, "
+                    f"{cache_stats['evictions']:,} evicted"
+                )
+        print(
+            f"\n[OK] Build {build_id}: {num_complaints:,} complaints, {len(chunks):,} chunks "
+            f"written to {build_dir} in {time.perf_counter() - build_start:.1f}s"
+        )
+        return dict(manifest, throughput=self.stats.report(), embedding_cache=cache_stats)
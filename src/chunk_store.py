@@ -0,0 +1,582 @@
+"""
+Chunk Store Module
+
+Columnar, memory-mapped storage for chunk texts and chunk metadata.
+
+The store replaces the pickled ``{"chunks": [...], "metadata": [...]}`` blob
+with one file per column inside ``vector_store/chunk_store/``:
+
+    store.json            Row count, column schema and store-level attributes
+    text.bin              UTF-8 chunk texts, concatenated
+    text.offsets.npy      int64 byte offsets into text.bin (num_rows + 1)
+    col_<name>.npy        Typed values / category codes for a metadata column
+    col_<name>.bin        UTF-8 blob for free-text metadata columns (+ .offsets.npy)
+
+Every file is memory-mapped on open, so nothing is decoded until a row is
+actually read through the ``chunks`` / ``metadata`` sequence views.
+"""
+
+import json
+import math
+import pickle
+import shutil
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+STORE_DIRNAME = "chunk_store"
+STORE_FORMAT_VERSION = 1
+
+# Low-cardinality string columns (e.g. product_category) are dictionary-encoded
+# when the number of distinct values is at most this fraction of the rows.
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_))
+
+
+def _is_number(value: Any) -> bool:
+    return _is_int(value) or isinstance(value, (float, np.floating))
+
+
+def _is_iso_date(value: str) -> bool:
+    try:
+        return str(np.datetime64(value, "D")) == value
+    except ValueError:
+        return False
+
+
+def _is_canonical_int(value: str) -> bool:
+    return value.isascii() and value.isdigit() and str(int(value)) == value
+
+
+def _load_array(path: Path, mmap: bool) -> np.ndarray:
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def _load_blob(path: Path, mmap: bool) -> np.ndarray:
+    # np.memmap cannot map an empty file
+    if not mmap or path.stat().st_size == 0:
+        return np.fromfile(path, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+class _TextColumn:
+    """Variable-length UTF-8 strings stored as one blob plus an offsets array."""
+
+    kind = "text"
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, as_json: bool = False):
+        self.blob = blob
+        self.offsets = offsets
+        self.as_json = as_json
+
+    @classmethod
+    def encode(cls, values: Iterable[Any], as_json: bool = False) -> "_TextColumn":
+        encoded = [
+            (json.dumps(v) if as_json else v).encode("utf-8") for v in values
+        ]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets, as_json)
+
+    def value(self, row: int) -> Any:
+        start, end = self.offsets[row], self.offsets[row + 1]
+        text = self.blob[start:end].tobytes().decode("utf-8")
+        return json.loads(text) if self.as_json else text
+
+    def save(self, directory: Path, stem: str) -> Dict[str, Any]:
+        self.blob.tofile(directory / f"{stem}.bin")
+        np.save(directory / f"{stem}.offsets.npy", self.offsets)
+        return {"kind": "json" if self.as_json else self.kind}
+
+    @classmethod
+    def load(cls, directory: Path, stem: str, spec: Dict[str, Any], mmap: bool) -> "_TextColumn":
+        return cls(
+            _load_blob(directory / f"{stem}.bin", mmap),
+            _load_array(directory / f"{stem}.offsets.npy", mmap),
+            as_json=spec["kind"] == "json",
+        )
+
+
+class _ArrayColumn:
+    """Fixed-width column backed by a single numpy array."""
+
+    def __init__(self, kind: str, values: np.ndarray, spec: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.values = values
+        self.spec = dict(spec or {}, kind=kind)
+        self.categories: List[Any] = self.spec.get("categories", [])
+
+    def value(self, row: int) -> Any:
+        raw = self.values[row]
+        # kind is one of: int, float, date, category
+        if self.kind == "category":
+            return self.categories[raw] if raw >= 0 else None
+        if self.kind == "date":
+            return None if np.isnat(raw) else str(raw)
+        if self.kind == "float":
+            if math.isnan(raw):
+                return None
+            return int(raw) if self.spec.get("integral") else float(raw)
+        # int
+        return str(int(raw)) if self.spec.get("as_string") else int(raw)
+
+    def save(self, directory: Path, stem: str) -> Dict[str, Any]:
+        np.save(directory / f"{stem}.npy", self.values)
+        return self.spec
+
+    @classmethod
+    def load(cls, directory: Path, stem: str, spec: Dict[str, Any], mmap: bool) -> "_ArrayColumn":
+        return cls(spec["kind"], _load_array(directory / f"{stem}.npy", mmap), spec)
+
+
+def _int_dtype(values: List[int]) -> np.dtype:
+    low, high = (min(values), max(values)) if values else (0, 0)
+    if np.iinfo(np.int32).min <= low and high <= np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def _encode_column(values: List[Any]):
+    """Pick the most compact lossless encoding for one metadata column."""
+    present = [v for v in values if v is not None]
+
+    if present and len(present) == len(values) and all(_is_int(v) for v in present):
+        ints = [int(v) for v in values]
+        return _ArrayColumn("int", np.asarray(ints, dtype=_int_dtype(ints)))
+
+    if present and all(_is_number(v) for v in present):
+        floats = np.asarray([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+        return _ArrayColumn("float", floats, {"integral": all(_is_int(v) for v in present)})
+
+    if all(isinstance(v, str) for v in present):
+        if present and all(_is_iso_date(v) for v in present):
+            dates = np.asarray(
+                [np.datetime64("NaT") if v is None else np.datetime64(v, "D") for v in values],
+                dtype="datetime64[D]",
+            )
+            return _ArrayColumn("date", dates)
+
+        if present and len(present) == len(values) and all(_is_canonical_int(v) for v in present):
+            ints = [int(v) for v in values]
+            if max(ints) <= np.iinfo(np.int64).max:
+                return _ArrayColumn("int", np.asarray(ints, dtype=_int_dtype(ints)), {"as_string": True})
+
+        unique = sorted(set(present))
+        if len(unique) <= max(1, CATEGORY_MAX_UNIQUE_RATIO * len(values)) and len(unique) < 2**31:
+            lookup = {v: i for i, v in enumerate(unique)}
+            dtype = np.int16 if len(unique) < 2**15 else np.int32
+            codes = np.asarray([-1 if v is None else lookup[v] for v in values], dtype=dtype)
+            return _ArrayColumn("category", codes, {"categories": unique})
+
+        if len(present) == len(values):
+            return _TextColumn.encode(values)
+
+    # Mixed or nested values: keep them exact as JSON text
+    return _TextColumn.encode(values, as_json=True)
+
+
+def _column_from_spec(directory: Path, stem: str, spec: Dict[str, Any], mmap: bool):
+    if spec["kind"] in ("text", "json"):
+        return _TextColumn.load(directory, stem, spec, mmap)
+    return _ArrayColumn.load(directory, stem, spec, mmap)
+
+
+class ChunkSequence(Sequence):
+    """Read-only ``Sequence[str]`` view over the chunk texts of a ChunkStore."""
+
+    def __init__(self, store: "ChunkStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.get_text(i) for i in range(*index.indices(len(self)))]
+        return self._store.get_text(self._store._check_row(index))
+
+
+class MetadataSequence(Sequence):
+    """Read-only ``Sequence[dict]`` view; each access decodes one row into a fresh dict."""
+
+    def __init__(self, store: "ChunkStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.get_metadata(i) for i in range(*index.indices(len(self)))]
+        return self._store.get_metadata(self._store._check_row(index))
+
+
+class ChunkStore:
+    """Columnar chunk text + metadata store with per-row lazy decoding."""
+
+    def __init__(
+        self,
+        text: _TextColumn,
+        columns: Dict[str, Any],
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self._text = text
+        self._columns = columns
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.num_rows = len(text.offsets) - 1
+        self.chunks = ChunkSequence(self)
+        self.metadata = MetadataSequence(self)
+
+    @classmethod
+    def from_records(
+        cls,
+        chunks: List[str],
+        metadata: List[Dict[str, Any]],
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> "ChunkStore":
+        """
+        Encode in-memory chunk texts and metadata dicts into columnar form.
+
+        Args:
+            chunks: Chunk texts
+            metadata: One metadata dict per chunk
+            attributes: Store-level values (model_name, embedding_dimension, ...)
+
+        Returns:
+            An in-memory ChunkStore
+        """
+        if len(chunks) != len(metadata):
+            raise ValueError(
+                f"chunks ({len(chunks)}) and metadata ({len(metadata)}) must have the same length"
+            )
+        names: List[str] = []
+        for row in metadata:
+            for key in row:
+                if key not in names:
+                    names.append(key)
+        columns = {
+            name: _encode_column([row.get(name) for row in metadata]) for name in names
+        }
+        return cls(_TextColumn.encode(chunks), columns, attributes)
+
+    @classmethod
+    def open(cls, directory: Path, mmap: bool = True) -> "ChunkStore":
+        """
+        Open a store written by ``save()``.
+
+        Args:
+            directory: The chunk_store directory
+            mmap: Memory-map the column files (default) instead of reading them
+
+        Returns:
+            ChunkStore backed by the files in ``directory``
+        """
+        directory = Path(directory)
+        with open(directory / "store.json", "r") as f:
+            header = json.load(f)
+        if header.get("format_version") != STORE_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported chunk store version {header.get('format_version')} in {directory}"
+            )
+        text = _TextColumn.load(directory, "text", {"kind": "text"}, mmap)
+        columns = {
+            name: _column_from_spec(directory, f"col_{name}", spec, mmap)
+            for name, spec in header["columns"].items()
+        }
+        store = cls(text, columns, header.get("attributes"))
+        if store.num_rows != header["num_rows"]:
+            raise ValueError(
+                f"Chunk store {directory} is corrupt: expected {header['num_rows']} rows, found {store.num_rows}"
+            )
+        return store
+
+    def save(self, directory: Path) -> Path:
+        """
+        Write the store to ``directory``, replacing any previous contents.
+
+        Returns:
+            The directory written
+        """
+        directory = Path(directory)
+        if directory.exists():
+            shutil.rmtree(directory)
+        directory.mkdir(parents=True)
+
+        self._text.save(directory, "text")
+        specs = {
+            name: column.save(directory, f"col_{name}")
+            for name, column in self._columns.items()
+        }
+        header = {
+            "format_version": STORE_FORMAT_VERSION,
+            "num_rows": self.num_rows,
+            "columns": specs,
+            "attributes": self.attributes,
+        }
+        # Written last so a partially written store is never opened
+        with open(directory / "store.json", "w") as f:
+            json.dump(header, f, indent=2, default=str)
+        return directory
+
+    def _check_row(self, row: int) -> int:
+        row = int(row)
+        if row < 0:
+            row += self.num_rows
+        if not 0 <= row < self.num_rows:
+            raise IndexError(f"row {row} out of range for chunk store of {self.num_rows} rows")
+        return row
+
+    def get_text(self, row: int) -> str:
+        """Decode the chunk text of one row."""
+        return self._text.value(row)
+
+    def get_metadata(self, row: int) -> Dict[str, Any]:
+        """Decode the metadata dict of one row."""
+        return {name: column.value(row) for name, column in self._columns.items()}
+
+    def get_field(self, row: int, name: str, default: Any = None) -> Any:
+        """Decode a single metadata field of one row without building the full dict."""
+        column = self._columns.get(name)
+        return default if column is None else column.value(row)
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def column_kind(self, name: str) -> str:
+        return self._columns[name].kind
+
+    def column_values(self, name: str) -> np.ndarray:
+        """
+        Raw typed array of a fixed-width column (category codes, ints, dates, ...).
+
+        Raises:
+            KeyError: If the column does not exist
+            TypeError: If the column is variable-length text
+        """
+        column = self._columns[name]
+        if not isinstance(column, _ArrayColumn):
+            raise TypeError(f"Column {name!r} is {column.kind}, not a fixed-width array")
+        return column.values
+
+    def column_categories(self, name: str) -> List[Any]:
+        """Category labels of a dictionary-encoded column (empty for other kinds)."""
+        column = self._columns[name]
+        return list(getattr(column, "categories", []))
+
+    def find_rows(self, name: str, values: Iterable[Any]) -> np.ndarray:
+        """
+        Return the sorted row ids whose ``name`` field equals one of ``values``.
+
+        Dictionary-encoded and integer columns are matched on their arrays
+        without decoding rows; other kinds fall back to a per-row scan.
+        Integer columns also match canonical integer strings ("101" finds 101),
+        so ids recorded as text (e.g. delta tombstones) find integer ids.
+        """
+        column = self._columns.get(name)
+        wanted = set(values)
+        if column is None or not wanted:
+            return np.zeros(0, dtype=np.int64)
+        if column.kind == "category":
+            codes = [code for code, label in enumerate(column.categories) if label in wanted]
+            return np.flatnonzero(np.isin(column.values, codes))
+        if column.kind == "int":
+            if column.spec.get("as_string"):
+                ints = [int(v) for v in wanted if isinstance(v, str) and _is_canonical_int(v)]
+            else:
+                ints = [
+                    int(v) for v in wanted
+                    if _is_int(v) or (isinstance(v, str) and _is_canonical_int(v))
+                ]
+            return np.flatnonzero(np.isin(column.values, ints))
+        return np.asarray(
+            [row for row in range(self.num_rows) if column.value(row) in wanted], dtype=np.int64
+        )
+
+    def nbytes(self) -> int:
+        """Total bytes of all column arrays (mapped or resident)."""
+        total = self._text.blob.nbytes + self._text.offsets.nbytes
+        for column in self._columns.values():
+            if isinstance(column, _TextColumn):
+                total += column.blob.nbytes + column.offsets.nbytes
+            else:
+                total += column.values.nbytes
+        return total
+
+
+class ConcatChunkStore:
+    """
+    Read-only view presenting several chunk stores as one, rows in part order.
+
+    Used to put appended delta segments behind the base store without
+    rewriting it. Supports the same read API as ChunkStore.
+    """
+
+    def __init__(self, parts: Sequence[ChunkStore]):
+        if not parts:
+            raise ValueError("ConcatChunkStore needs at least one part")
+        self.parts = list(parts)
+        sizes = [part.num_rows for part in self.parts]
+        self.row_starts = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.num_rows = int(self.row_starts[-1])
+        self.attributes: Dict[str, Any] = dict(self.parts[0].attributes)
+        self.chunks = ChunkSequence(self)
+        self.metadata = MetadataSequence(self)
+        self._values_cache: Dict[str, np.ndarray] = {}
+
+    def _locate(self, row: int) -> Tuple[ChunkStore, int]:
+        part = int(np.searchsorted(self.row_starts, row, side="right") - 1)
+        return self.parts[part], int(row - self.row_starts[part])
+
+    _check_row = ChunkStore._check_row
+
+    def get_text(self, row: int) -> str:
+        part, local = self._locate(row)
+        return part.get_text(local)
+
+    def get_metadata(self, row: int) -> Dict[str, Any]:
+        part, local = self._locate(row)
+        return part.get_metadata(local)
+
+    def get_field(self, row: int, name: str, default: Any = None) -> Any:
+        part, local = self._locate(row)
+        return part.get_field(local, name, default)
+
+    @property
+    def column_names(self) -> List[str]:
+        names: List[str] = []
+        for part in self.parts:
+            names.extend(name for name in part.column_names if name not in names)
+        return names
+
+    def column_kind(self, name: str) -> str:
+        kinds = {part.column_kind(name) for part in self.parts if name in part.column_names}
+        if not kinds:
+            raise KeyError(name)
+        return kinds.pop() if len(kinds) == 1 else "json"
+
+    def column_values(self, name: str) -> np.ndarray:
+        """
+        Concatenated typed array of a fixed-width column.
+
+        Category codes are re-mapped onto column_categories(). The result is
+        cached, so the concatenation cost is paid once per view.
+
+        Raises:
+            KeyError: If no part has the column
+            TypeError: If the parts encode the column differently
+        """
+        if name not in self._values_cache:
+            kind = self.column_kind(name)
+            if kind in ("text", "json") or any(
+                name not in part.column_names for part in self.parts
+            ):
+                raise TypeError(f"Column {name!r} is not a fixed-width array in every part")
+            arrays = [part.column_values(name) for part in self.parts]
+            if kind == "category":
+                lookup = {label: code for code, label in enumerate(self.column_categories(name))}
+                arrays = [
+                    np.asarray(
+                        [lookup[label] for label in part.column_categories(name)] + [-1],
+                        dtype=np.int32,
+                    )[values]
+                    for part, values in zip(self.parts, arrays)
+                ]
+            self._values_cache[name] = np.concatenate(arrays)
+        return self._values_cache[name]
+
+    def column_categories(self, name: str) -> List[Any]:
+        labels = set()
+        for part in self.parts:
+            if name in part.column_names:
+                labels.update(part.column_categories(name))
+        return sorted(labels)
+
+    def find_rows(self, name: str, values: Iterable[Any]) -> np.ndarray:
+        values = list(values)
+        return np.concatenate(
+            [part.find_rows(name, values) + start for part, start in zip(self.parts, self.row_starts)]
+        ).astype(np.int64)
+
+    def nbytes(self) -> int:
+        return sum(part.nbytes() for part in self.parts)
+
+
+def read_pickle_store(pickle_path: Path) -> ChunkStore:
+    """
+    Unpickle a Task 2 ``chunk_metadata.pkl`` into an in-memory ChunkStore.
+
+    Args:
+        pickle_path: Path to chunk_metadata.pkl
+
+    Returns:
+        ChunkStore holding the pickle's chunks, metadata and attributes
+    """
+    with open(pickle_path, "rb") as f:
+        metadata_dict = pickle.load(f)
+
+    attributes = {
+        key: value
+        for key, value in metadata_dict.items()
+        if key not in ("chunks", "metadata")
+    }
+    return ChunkStore.from_records(
+        metadata_dict.get("chunks", []), metadata_dict.get("metadata", []), attributes
+    )
+
+
+def convert_pickle_to_chunk_store(
+    pickle_path: Path, output_dir: Optional[Path] = None
+) -> Path:
+    """
+    Convert a Task 2 ``chunk_metadata.pkl`` into a columnar chunk store.
+
+    Args:
+        pickle_path: Path to chunk_metadata.pkl
+        output_dir: Target directory (defaults to chunk_store/ next to the pickle)
+
+    Returns:
+        Path of the written chunk store directory
+    """
+    pickle_path = Path(pickle_path)
+    if output_dir is None:
+        output_dir = pickle_path.parent / STORE_DIRNAME
+    return read_pickle_store(pickle_path).save(output_dir)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Convert vector_store/chunk_metadata.pkl to vector_store/chunk_store/."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert chunk_metadata.pkl to a columnar chunk store")
+    parser.add_argument(
+        "vector_store_dir",
+        nargs="?",
+        type=Path,
+        default=Path(__file__).resolve().parent.parent / "vector_store",
+    )
+    args = parser.parse_args(argv)
+
+    pickle_path = args.vector_store_dir / "chunk_metadata.pkl"
+    if not pickle_path.exists():
+        print(f"[ERROR] {pickle_path} not found")
+        return 1
+
+    print(f"Converting {pickle_path}...")
+    output_dir = convert_pickle_to_chunk_store(pickle_path)
+    store = ChunkStore.open(output_dir)
+    print(f"[OK] Wrote {store.num_rows:,} rows to {output_dir} ({store.nbytes() / 1e6:.1f} MB)")
+    for name in store.column_names:
+        print(f"  - {name}: {store.column_kind(name)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Concurrency Module
+
+Concurrency model for serving queries from one process (e.g. several Gradio
+users sharing one RAGPipeline):
+
+    shared state    Store snapshots (index, chunk store, secondary indexes)
+                    are immutable once published and swapped atomically on
+                    hot reload. Caches and latency stats take their own locks.
+                    FAISS searches pass per-call SearchParameters, so
+                    concurrent searches never modify the index.
+    models          torch forward passes may run concurrently, but Hugging
+                    Face fast tokenizers may not ("Already borrowed" errors).
+                    The query encoder is locked per call (a few ms), and the
+                    generator locks only tokenization, so several generations
+                    can decode at once.
+    query pool      Queries run on a bounded pool of worker threads. Callers
+                    beyond the workers plus the pending bound are rejected
+                    instead of queueing without limit.
+    thread budget   FAISS (OpenMP) and torch (intra-op) each start their own
+                    thread team per calling thread, so N concurrent queries
+                    with default settings run N x cores threads and thrash.
+                    ThreadBudget caps each worker at its share of the cores.
+                    A query's stages run one after another, so a worker can use
+                    its whole share in either library.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Queries executed at once; 1 runs queries one at a time with every core
+DEFAULT_QUERY_WORKERS = 1
+# Queries accepted beyond the running ones, per worker
+DEFAULT_PENDING_PER_WORKER = 4
+
+
+class ThreadBudget:
+    """Split of a CPU thread budget between query workers, FAISS and torch."""
+
+    def __init__(
+        self,
+        query_workers: int = DEFAULT_QUERY_WORKERS,
+        total_threads: Optional[int] = None,
+        faiss_threads: Optional[int] = None,
+        torch_threads: Optional[int] = None,
+    ):
+        """
+        Args:
+            query_workers: Queries executed concurrently
+            total_threads: Threads all workers may use together (default: CPU count)
+            faiss_threads: OpenMP threads per FAISS search (default: the
+                worker's share, total_threads // query_workers)
+            torch_threads: torch intra-op threads per model call (default: the
+                worker's share)
+        """
+        if query_workers < 1:
+            raise ValueError(f"query_workers must be at least 1, got {query_workers}")
+        self.query_workers = query_workers
+        self.total_threads = total_threads or os.cpu_count() or 1
+        share = max(1, self.total_threads // query_workers)
+        self.faiss_threads = faiss_threads or share
+        self.torch_threads = torch_threads or share
+
+    def apply(self):
+        """
+        Apply the limits to the calling thread.
+
+        OpenMP thread counts are per calling thread, so this runs in every query
+        worker; the torch setting is process-wide.
+        """
+        import faiss
+        import torch
+
+        faiss.omp_set_num_threads(self.faiss_threads)
+        if torch.get_num_threads() != self.torch_threads:
+            torch.set_num_threads(self.torch_threads)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "query_workers": self.query_workers,
+            "total_threads": self.total_threads,
+            "faiss_threads": self.faiss_threads,
+            "torch_threads": self.torch_threads,
+        }
+
+
+class QueryExecutor:
+    """Bounded pool of query worker threads running under a ThreadBudget."""
+
+    def __init__(self, budget: ThreadBudget, max_pending: Optional[int] = None):
+        """
+        Args:
+            budget: Thread budget (its query_workers sizes the pool)
+            max_pending: Queries accepted while all workers are busy (default:
+                DEFAULT_PENDING_PER_WORKER per worker); further ones are rejected
+        """
+        self.budget = budget
+        self.max_workers = budget.query_workers
+        self.max_pending = (
+            max_pending if max_pending is not None else DEFAULT_PENDING_PER_WORKER * self.max_workers
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="rag-query",
+            initializer=self._init_worker,
+        )
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _init_worker(self):
+        self._local.is_worker = True
+        self.budget.apply()
+
+    def in_worker(self) -> bool:
+        """True when called from one of this pool's worker threads."""
+        return getattr(self._local, "is_worker", False)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs) on the pool.
+
+        Raises:
+            RuntimeError: If max_workers + max_pending queries are already in flight
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise RuntimeError(
+                f"Too many concurrent queries ({self.max_workers} running, "
+                f"{self.max_pending} pending); please try again shortly"
+            )
+        with self._stats_lock:
+            self.in_flight += 1
+        try:
+            return self._executor.submit(self._call, fn, args, kwargs)
+        except BaseException:
+            self._release(completed=False)
+            raise
+
+    def _call(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        # Release the slot before the result is published, so a caller that got
+        # its result already sees the slot free
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._release(completed=True)
+
+    def _release(self, completed: bool):
+        with self._stats_lock:
+            self.in_flight -= 1
+            if completed:
+                self.completed += 1
+        self._slots.release()
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn on the pool and wait for its result (inline when already on a worker)."""
+        if self.in_worker():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return dict(
+                self.budget.to_dict(),
+                max_pending=self.max_pending,
+                in_flight=self.in_flight,
+                completed=self.completed,
+                rejected=self.rejected,
+            )
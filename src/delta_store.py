@@ -0,0 +1,496 @@
+"""
+Delta Store Module
+
+Incremental updates to a vector store build without re-running Task 2.
+
+New complaints are chunked and embedded on their own and written as a small
+delta segment (a flat FAISS index plus a chunk store) next to the build.
+Withdrawn complaint_ids are recorded as tombstones. Readers see the base
+build, every delta segment and the tombstones as one store (see
+open_live_view), and a compaction job later folds everything into a new
+base build that is published like any other version.
+
+Layout inside a build directory:
+
+    delta/delta.json                    Sequence number, segment list and tombstones
+    delta/segments/<seq>/delta.index    Flat FAISS index of one appended batch
+    delta/segments/<seq>/chunk_store/   Chunk texts/metadata of that batch
+    delta/segments/<seq>/bm25/          Lexical index of that batch
+
+delta.json is replaced atomically, so a reader sees either the old or the new
+set of segments. Appends, withdrawals and compaction assume one writer
+process per vector store.
+"""
+
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from .chunk_store import ChunkStore, ConcatChunkStore, STORE_DIRNAME
+from .embedding_cache import DEFAULT_CACHE_DIRNAME, CachedEncoder, EmbeddingCache
+from .index_types import LOSSY_INDEX_TYPES, detect_index_type
+from .lexical_index import write_lexical_index
+from .sharded_index import ShardedIndex, read_shard_layout
+from .store_builder import (
+    build_flat_index,
+    chunk_complaints,
+    normalize_embeddings,
+    write_vector_store,
+)
+from .store_manifest import (
+    DELTA_DIRNAME,
+    VERSIONS_DIRNAME,
+    new_build_id,
+    publish_version,
+    resolve_active_dir,
+)
+
+DELTA_STATE_FILENAME = "delta.json"
+SEGMENTS_DIRNAME = "segments"
+SEGMENT_INDEX_FILENAME = "delta.index"
+
+
+def read_delta_state(store_dir: Path) -> Dict[str, Any]:
+    """Return the delta state of a build (empty state if nothing was appended)."""
+    state_path = Path(store_dir) / DELTA_DIRNAME / DELTA_STATE_FILENAME
+    if not state_path.exists():
+        return {"sequence": 0, "segments": [], "tombstones": []}
+    with open(state_path, "r") as f:
+        return json.load(f)
+
+
+def _write_delta_state(store_dir: Path, state: Dict[str, Any]):
+    delta_dir = Path(store_dir) / DELTA_DIRNAME
+    delta_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = delta_dir / f".{DELTA_STATE_FILENAME}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, delta_dir / DELTA_STATE_FILENAME)
+
+
+def _segment_dir(store_dir: Path, segment: str) -> Path:
+    return Path(store_dir) / DELTA_DIRNAME / SEGMENTS_DIRNAME / segment
+
+
+class LiveIndex:
+    """
+    Index view that never returns tombstoned rows.
+
+    Searches over-fetch by the number of removed rows that rank among the
+    hits, so the result is still the exact top-k over the remaining rows
+    while tombstones outside the top-k cost nothing.
+    """
+
+    def __init__(self, index: Any, removed_rows: np.ndarray):
+        self.index = index
+        self.removed_rows = np.unique(np.asarray(removed_rows, dtype=np.int64))
+        self.d = index.d
+        self.metric_type = index.metric_type
+        # Row ids still span the removed rows, so ntotal keeps counting them
+        self.ntotal = index.ntotal
+
+    @property
+    def num_live(self) -> int:
+        return self.ntotal - len(self.removed_rows)
+
+    def search(self, queries: np.ndarray, k: int, params: Any = None) -> Tuple[np.ndarray, np.ndarray]:
+        fetch = min(k, self.ntotal)
+        while True:
+            if params is None:
+                distances, labels = self.index.search(queries, fetch)
+            else:
+                distances, labels = self.index.search(queries, fetch, params=params)
+            # The top k + r hits hold the top k live rows once at most r of them
+            # are removed; a larger fetch only adds hits, so this converges
+            needed = k + int(np.isin(labels, self.removed_rows).sum(axis=1).max(initial=0))
+            if needed <= fetch or fetch >= self.ntotal:
+                break
+            fetch = min(needed, self.ntotal)
+
+        pad_distance = -np.inf if self.metric_type == faiss.METRIC_INNER_PRODUCT else np.inf
+        out_distances = np.full((len(labels), k), pad_distance, dtype=np.float32)
+        out_labels = np.full((len(labels), k), -1, dtype=np.int64)
+        keep = (labels >= 0) & ~np.isin(labels, self.removed_rows)
+        for row in range(len(labels)):
+            kept = np.flatnonzero(keep[row])[:k]
+            out_distances[row, : len(kept)] = distances[row, kept]
+            out_labels[row, : len(kept)] = labels[row, kept]
+        return out_distances, out_labels
+
+    def reconstruct(self, row: int) -> np.ndarray:
+        return self.index.reconstruct(row)
+
+    def reconstruct_batch(self, rows: np.ndarray) -> np.ndarray:
+        return self.index.reconstruct_batch(rows)
+
+    def reconstruct_n(self, start: int, n: int) -> np.ndarray:
+        return self.index.reconstruct_n(start, n)
+
+
+def open_live_view(
+    base_index: Any,
+    base_store: ChunkStore,
+    store_dir: Path,
+    state: Optional[Dict[str, Any]] = None,
+) -> Tuple[Any, Any, int]:
+    """
+    Combine a base build with its delta segments and tombstones.
+
+    Delta rows get global row ids after the base rows, in segment order.
+    Without any delta the base objects are returned unchanged.
+
+    Args:
+        base_index: FAISS index (or ShardedIndex) of the base build
+        base_store: Chunk store of the base build
+        store_dir: Build directory
+        state: Delta state to open (defaults to the current delta.json)
+
+    Returns:
+        Tuple of (index, chunk store, delta sequence number)
+    """
+    state = state if state is not None else read_delta_state(store_dir)
+    index, store = base_index, base_store
+    if state["segments"]:
+        indexes, stores = [base_index], [base_store]
+        for segment in state["segments"]:
+            segment_dir = _segment_dir(store_dir, segment)
+            indexes.append(faiss.read_index(str(segment_dir / SEGMENT_INDEX_FILENAME)))
+            stores.append(ChunkStore.open(segment_dir / STORE_DIRNAME))
+        store = ConcatChunkStore(stores)
+        index = ShardedIndex(indexes, store.row_starts[:-1])
+
+    if state["tombstones"]:
+        removed = store.find_rows("complaint_id", state["tombstones"])
+        if len(removed):
+            index = LiveIndex(index, removed)
+    return index, store, state["sequence"]
+
+
+class DeltaStore:
+    """Appends, withdrawals and compaction for the active build of a vector store."""
+
+    def __init__(
+        self,
+        vector_store_dir: Optional[Path] = None,
+        embedding_model: Any = None,
+        splitter: Any = None,
+        use_embedding_cache: bool = True,
+    ):
+        """
+        Initialize the delta store.
+
+        Args:
+            vector_store_dir: Path to vector store directory. Defaults to project_root/vector_store
+            embedding_model: Embedding model for new chunks (loaded on first append
+                if omitted; must be the model the build was embedded with)
+            splitter: Text splitter (defaults to the Task 2 chunking parameters)
+            use_embedding_cache: Look chunks up in the vector store's embedding cache
+                (shared with store_builder builds) before embedding them
+        """
+        from .vector_store_loader import VectorStoreLoader
+
+        loader = VectorStoreLoader(vector_store_dir)
+        self.vector_store_dir = loader.vector_store_dir
+        self.model_name = loader.resolve_model_name()
+        self.splitter = splitter
+        self._embedding_model = embedding_model
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        if use_embedding_cache:
+            self.embedding_cache = EmbeddingCache(
+                self.vector_store_dir / DEFAULT_CACHE_DIRNAME, self.model_name
+            )
+        self._lock = threading.Lock()
+
+    @property
+    def store_dir(self) -> Path:
+        """Directory of the currently active build."""
+        return resolve_active_dir(self.vector_store_dir)
+
+    @property
+    def embedding_model(self):
+        if self._embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._embedding_model = SentenceTransformer(self.model_name)
+        return self._embedding_model
+
+    @property
+    def encoder(self):
+        """Embedding model, behind the embedding cache when it is enabled."""
+        if self.embedding_cache is None:
+            return self.embedding_model
+        return CachedEncoder(self.embedding_cache, lambda: self.embedding_model)
+
+    def status(self) -> Dict[str, Any]:
+        """Return the active build directory and its delta state."""
+        store_dir = self.store_dir
+        state = read_delta_state(store_dir)
+        return {
+            "store_dir": str(store_dir),
+            "sequence": state["sequence"],
+            "segments": len(state["segments"]),
+            "tombstones": len(state["tombstones"]),
+        }
+
+    def append(self, complaints: Iterable[Dict[str, Any]]) -> int:
+        """
+        Chunk, embed and append new complaints as one delta segment.
+
+        Args:
+            complaints: Complaint dicts (see store_builder.chunk_complaints)
+
+        Returns:
+            Number of chunks appended
+        """
+        complaints = list(complaints)
+        chunks, metadata = chunk_complaints(complaints, self.splitter)
+        if not chunks:
+            return 0
+        embeddings = normalize_embeddings(
+            self.encoder.encode(chunks, batch_size=32, convert_to_numpy=True)
+        )
+
+        with self._lock:
+            store_dir = self.store_dir
+            base_attributes = _base_attributes(store_dir)
+            dimension = base_attributes.get("embedding_dimension")
+            if dimension and dimension != embeddings.shape[1]:
+                raise ValueError(
+                    f"New embeddings have dimension {embeddings.shape[1]}, "
+                    f"the vector store uses {dimension}"
+                )
+
+            state = read_delta_state(store_dir)
+            sequence = state["sequence"] + 1
+            segment = f"{sequence:06d}"
+            segment_dir = _segment_dir(store_dir, segment)
+            if segment_dir.exists():
+                shutil.rmtree(segment_dir)  # left over from an interrupted append
+            segment_dir.mkdir(parents=True)
+            faiss.write_index(
+                build_flat_index(embeddings), str(segment_dir / SEGMENT_INDEX_FILENAME)
+            )
+            ChunkStore.from_records(
+                chunks,
+                metadata,
+                {"model_name": self.model_name, "embedding_dimension": embeddings.shape[1]},
+            ).save(segment_dir / STORE_DIRNAME)
+            write_lexical_index(segment_dir, chunks)
+            # Publishing the new state is the commit point of the append
+            _write_delta_state(
+                store_dir,
+                dict(state, sequence=sequence, segments=state["segments"] + [segment]),
+            )
+
+        print(
+            f"[OK] Appended {len(complaints):,} complaints as {len(chunks):,} chunks "
+            f"(delta segment {segment})"
+        )
+        return len(chunks)
+
+    def withdraw(self, complaint_ids: Iterable[Any]) -> int:
+        """
+        Tombstone complaints so they are no longer retrieved.
+
+        Tombstones hide every chunk of a complaint_id, in the base build and in
+        delta segments; compaction removes the rows for good.
+
+        Returns:
+            Number of complaint_ids newly tombstoned
+        """
+        with self._lock:
+            store_dir = self.store_dir
+            state = read_delta_state(store_dir)
+            tombstones = list(state["tombstones"])
+            existing = set(tombstones)
+            new_ids = [
+                cid for cid in dict.fromkeys(str(c) for c in complaint_ids) if cid not in existing
+            ]
+            if not new_ids:
+                return 0
+            _write_delta_state(
+                store_dir,
+                dict(state, sequence=state["sequence"] + 1, tombstones=tombstones + new_ids),
+            )
+        print(f"[OK] Withdrew {len(new_ids):,} complaints")
+        return len(new_ids)
+
+    def compact(self, num_shards: Optional[int] = None) -> Optional[str]:
+        """
+        Fold all delta segments and tombstones into a new base build.
+
+        The new build keeps the base build's index type. Vectors are copied
+        from the index, except for lossy types (ivf_pq, sq8), whose chunks are
+        re-embedded (embedding cache first) so they are quantized only once.
+        The build is written under versions/ and published with
+        publish_version(), so loaders swap to it on their next reload();
+        queries keep using the old build meanwhile. Segments appended and
+        complaints withdrawn while compaction runs are carried over into the
+        new build's delta. A flat-layout store switches to the versioned
+        layout on its first compaction.
+
+        Args:
+            num_shards: Shards for the new build (defaults to the current layout)
+
+        Returns:
+            The new build id, or None if there was nothing to compact
+        """
+        with self._lock:
+            store_dir = self.store_dir
+            state = read_delta_state(store_dir)
+        if not state["segments"] and not state["tombstones"]:
+            print("[INFO] No delta to compact")
+            return None
+
+        from .vector_store_loader import VectorStoreLoader
+
+        loader = VectorStoreLoader(self.vector_store_dir)
+        base_index, _ = loader._read_index(store_dir)
+        base_store = loader._read_chunks(store_dir)
+        index, store, _ = open_live_view(base_index, base_store, store_dir, state)
+
+        keep = np.ones(store.num_rows, dtype=bool)
+        if isinstance(index, LiveIndex):
+            keep[index.removed_rows] = False
+        rows = np.flatnonzero(keep)
+        print(
+            f"Compacting {len(state['segments'])} delta segments and "
+            f"{len(state['tombstones'])} tombstones: {store.num_rows - len(rows):,} rows "
+            f"removed, {len(rows):,} rows kept..."
+        )
+        chunks = [store.get_text(row) for row in rows]
+        metadata = [store.get_metadata(row) for row in rows]
+        index_type = detect_index_type(base_index)
+        if index_type in LOSSY_INDEX_TYPES:
+            # Reconstructed vectors are already quantized and would lose recall
+            # with every compaction; take the originals from the embedding cache
+            print(
+                f"[INFO] {index_type} index stores quantized vectors; re-embedding "
+                f"{len(chunks):,} chunks (embedding cache first)"
+            )
+            embeddings = normalize_embeddings(
+                self.encoder.encode(chunks, batch_size=32, convert_to_numpy=True)
+            )
+        else:
+            embeddings = index.reconstruct_n(0, index.ntotal)[rows]
+
+        if num_shards is None:
+            layout = read_shard_layout(store_dir)
+            num_shards = layout["num_shards"] if layout else 1
+        build_id = new_build_id()
+        build_dir = self.vector_store_dir / VERSIONS_DIRNAME / build_id
+        write_vector_store(
+            build_dir,
+            chunks,
+            metadata,
+            embeddings,
+            self.model_name,
+            num_shards=num_shards,
+            build_id=build_id,
+            attributes={
+                k: v for k, v in base_store.attributes.items()
+                if k not in ("creation_date", "total_chunks")
+            },
+            index_type=index_type,
+        )
+
+        with self._lock:
+            latest = read_delta_state(store_dir)
+            pending_segments = [s for s in latest["segments"] if s not in state["segments"]]
+            pending_tombstones = [t for t in latest["tombstones"] if t not in state["tombstones"]]
+            for segment in pending_segments:
+                shutil.copytree(_segment_dir(store_dir, segment), _segment_dir(build_dir, segment))
+            if pending_segments or pending_tombstones:
+                _write_delta_state(
+                    build_dir,
+                    {
+                        "sequence": latest["sequence"],
+                        "segments": pending_segments,
+                        "tombstones": pending_tombstones,
+                    },
+                )
+            publish_version(self.vector_store_dir, build_dir)
+
+        print(f"[OK] Published compacted build {build_id} ({len(rows):,} vectors)")
+        return build_id
+
+
+def _base_attributes(store_dir: Path) -> Dict[str, Any]:
+    header_path = Path(store_dir) / STORE_DIRNAME / "store.json"
+    if not header_path.exists():
+        return {}
+    with open(header_path, "r") as f:
+        return json.load(f).get("attributes", {})
+
+
+def read_complaints_csv(csv_path: Path) -> List[Dict[str, Any]]:
+    """
+    Read new complaints from a CSV in the Task 1 output format.
+
+    Requires a complaint_id (or "Complaint ID") column and a narrative column;
+    Product, Date received and cleaned_word_count are used when present.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    id_column = next((c for c in ("complaint_id", "Complaint ID") if c in df.columns), None)
+    if id_column is None or "narrative" not in df.columns:
+        raise ValueError(f"{csv_path} needs a complaint_id and a narrative column")
+
+    complaints = []
+    for values in df.to_dict("records"):
+        if pd.isna(values["narrative"]):
+            continue
+        date = values.get("Date received")
+        word_count = values.get("cleaned_word_count")
+        complaints.append({
+            "complaint_id": str(values[id_column]),
+            "narrative": values["narrative"],
+            "product_category": values.get("product_category"),
+            "product": values.get("Product"),
+            "date_received": str(date) if date is not None and pd.notna(date) else None,
+            "cleaned_word_count": (
+                word_count if word_count is not None and pd.notna(word_count) else None
+            ),
+        })
+    return complaints
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: append, withdraw, compact or show status."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental vector store updates")
+    parser.add_argument("--vector-store-dir", type=Path, default=None)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    append = subparsers.add_parser("append", help="Append new complaints from a CSV")
+    append.add_argument("csv_path", type=Path)
+    withdraw = subparsers.add_parser("withdraw", help="Tombstone complaint_ids")
+    withdraw.add_argument("complaint_ids", nargs="+")
+    compact = subparsers.add_parser("compact", help="Fold deltas into a new base build")
+    compact.add_argument("--num-shards", type=int, default=None)
+    subparsers.add_parser("status", help="Show the delta state of the active build")
+
+    args = parser.parse_args(argv)
+    store = DeltaStore(args.vector_store_dir)
+
+    if args.command == "append":
+        store.append(read_complaints_csv(args.csv_path))
+    elif args.command == "withdraw":
+        store.withdraw(args.complaint_ids)
+    elif args.command == "compact":
+        store.compact(num_shards=args.num_shards)
+    print(json.dumps(store.status(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
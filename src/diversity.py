@@ -0,0 +1,70 @@
+"""
+Diversity Module
+
+Maximal marginal relevance (MMR) reranking: picks results that are relevant
+to the query but not near-duplicates of results already picked, so that
+many copies of one complaint template do not fill the prompt.
+
+    score(c) = lambda * sim(query, c) - (1 - lambda) * max over picked p of sim(c, p)
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# 1.0 ranks by relevance only; 0.0 by novelty only
+DEFAULT_MMR_LAMBDA = 0.5
+# Candidates (best-first) the reranker chooses from
+DEFAULT_MMR_CANDIDATES = 20
+
+
+def mmr_select(
+    query: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+    mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+    relevance: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Greedy MMR selection over a candidate pool.
+
+    All pairwise candidate similarities are computed as one matrix product up
+    front; each of the k greedy steps is then a vectorized update of the
+    candidates' running max-similarity to the picked set.
+
+    Args:
+        query: (d,) L2-normalized query vector
+        candidates: (n, d) L2-normalized candidate vectors, best-first
+        k: Number of candidates to pick
+        mmr_lambda: Relevance / novelty trade-off in [0, 1]
+        relevance: Optional (n,) relevance scores (default: candidates @ query)
+
+    Returns:
+        Positions of the picked candidates, in pick order
+    """
+    if not 0.0 <= mmr_lambda <= 1.0:
+        raise ValueError(f"mmr_lambda must be within [0, 1], got {mmr_lambda}")
+    n = len(candidates)
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if relevance is None:
+        relevance = candidates @ query
+    relevance = np.asarray(relevance, dtype=np.float32)
+    similarity = candidates @ candidates.T
+
+    picked = np.empty(k, dtype=np.int64)
+    available = np.ones(n, dtype=bool)
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy
+        scores[~available] = -np.inf
+        # argmax picks the first maximum, so ties keep the input (best-first) order
+        best = int(np.argmax(scores))
+        picked[step] = best
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return picked
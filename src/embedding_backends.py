@@ -0,0 +1,253 @@
+"""
+Embedding Backends Module
+
+Query embedding backends that can stand in for the PyTorch
+SentenceTransformer at serving time:
+
+    torch       SentenceTransformer (default)
+    onnx        ONNX export of the same model, run with ONNX Runtime on CPU
+    onnx_int8   The ONNX export with dynamically int8-quantized weights
+
+The ONNX variants are exported at build time into ``onnx/`` of the build
+directory (model.onnx, model_int8.onnx, the tokenizer files and export.json),
+and each is checked there against the embeddings that went into the index:
+export.json records the minimum cosine similarity over a sample of chunks and
+whether it passed the variant's tolerance. VectorStoreLoader repeats the
+check against the stored index when it loads a variant and falls back to
+torch if the check fails.
+
+ONNX Runtime (``pip install onnxruntime onnx``) is only needed for the ONNX
+backends; serving with torch never imports it.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx_int8")
+ONNX_BACKENDS = ("onnx", "onnx_int8")
+ONNX_DIRNAME = "onnx"
+EXPORT_FILENAME = "export.json"
+MODEL_FILENAMES = {"onnx": "model.onnx", "onnx_int8": "model_int8.onnx"}
+
+# Minimum cosine similarity to the stored vectors is 1 - tolerance
+COSINE_TOLERANCE = {"onnx": 1e-4, "onnx_int8": 0.02}
+# Chunks embedded to verify a backend (spread evenly over the rows)
+VERIFY_SAMPLE_SIZE = 32
+ONNX_OPSET = 17
+
+
+def sample_rows(num_rows: int, size: int = VERIFY_SAMPLE_SIZE) -> np.ndarray:
+    """Evenly spread row ids used to compare a backend against stored vectors."""
+    return np.unique(np.linspace(0, max(num_rows - 1, 0), min(size, num_rows)).astype(np.int64))
+
+
+def cosine_agreement(model: Any, texts: Sequence[str], reference: np.ndarray) -> float:
+    """
+    Minimum cosine similarity between a model's embeddings of texts and reference vectors.
+
+    Args:
+        model: Anything with SentenceTransformer's encode()
+        texts: Texts that reference was computed from
+        reference: (n, d) vectors (normalized or not)
+    """
+    vectors = np.asarray(model.encode(list(texts), convert_to_numpy=True), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    reference = np.asarray(reference, dtype=np.float32)
+    reference = reference / np.maximum(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12)
+    return float(np.min(np.sum(vectors * reference, axis=1)))
+
+
+class OnnxEmbeddingModel:
+    """ONNX Runtime query encoder with SentenceTransformer's encode() interface."""
+
+    def __init__(self, onnx_dir: Path, variant: str = "onnx", num_threads: Optional[int] = None):
+        """
+        Args:
+            onnx_dir: Export directory written by export_onnx
+            variant: "onnx" or "onnx_int8"
+            num_threads: ONNX Runtime intra-op threads (default: runtime's choice)
+
+        Raises:
+            FileNotFoundError: If the variant was not exported
+            ImportError: If onnxruntime is not installed
+        """
+        if variant not in ONNX_BACKENDS:
+            raise ValueError(f"variant must be one of {ONNX_BACKENDS}, got {variant!r}")
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        self.onnx_dir = Path(onnx_dir)
+        self.variant = variant
+        with open(self.onnx_dir / EXPORT_FILENAME, "r") as f:
+            self.export_info: Dict[str, Any] = json.load(f)
+        model_path = self.onnx_dir / MODEL_FILENAMES[variant]
+        if variant not in self.export_info.get("variants", {}) or not model_path.exists():
+            raise FileNotFoundError(f"No {variant} export in {self.onnx_dir}")
+
+        self.model_name = self.export_info["model_name"]
+        self.max_seq_length = self.export_info["max_seq_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.onnx_dir))
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {node.name for node in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.export_info["dimension"])
+
+    def encode(
+        self,
+        sentences: Sequence[str],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        """Sentence embeddings as a (n, d) float32 array (extra keyword arguments are ignored)."""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        sentences = list(sentences)
+        outputs: List[np.ndarray] = []
+        for start in range(0, len(sentences), batch_size):
+            encoded = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {
+                name: encoded[name].astype(np.int64)
+                for name in ("input_ids", "attention_mask", "token_type_ids")
+                if name in self._input_names and name in encoded
+            }
+            outputs.append(self.session.run(None, feeds)[0])
+        vectors = (
+            np.concatenate(outputs).astype(np.float32)
+            if outputs else np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        )
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+
+def _pooling_wrapper(model: Any):
+    """torch module computing the SentenceTransformer embedding from token ids."""
+    import torch
+
+    transformer = model[0].auto_model
+    pooling_mode = "mean"
+    if len(model) > 1:
+        pooling = model[1]
+        # sentence-transformers >= 5 stores the mode; older versions derive it
+        pooling_mode = getattr(pooling, "pooling_mode", None) or pooling.get_pooling_mode_str()
+    if pooling_mode not in ("mean", "cls"):
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling_mode}")
+
+    class SentenceEmbedding(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            tokens = self.transformer(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            )[0]
+            if pooling_mode == "cls":
+                return tokens[:, 0]
+            mask = attention_mask.unsqueeze(-1).to(tokens.dtype)
+            return (tokens * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+
+    return SentenceEmbedding().eval()
+
+
+def export_onnx(
+    model: Any,
+    model_name: str,
+    output_dir: Path,
+    texts: Sequence[str],
+    reference: np.ndarray,
+    quantize: bool = True,
+) -> Dict[str, Any]:
+    """
+    Export a SentenceTransformer to ONNX (and int8), verified against reference vectors.
+
+    Args:
+        model: Loaded SentenceTransformer the build embedded with
+        model_name: Its model name (recorded in export.json)
+        output_dir: Build directory; files go to output_dir/onnx
+        texts: Sample chunk texts
+        reference: Embeddings of texts from the build (the vectors that went into the index)
+        quantize: Also write the int8 dynamically-quantized variant
+
+    Returns:
+        The export.json contents
+
+    Raises:
+        ImportError: If onnx / onnxruntime are not installed
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    onnx_dir = Path(output_dir) / ONNX_DIRNAME
+    onnx_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = model.tokenizer
+    tokenizer.save_pretrained(str(onnx_dir))
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    token_type_ids = sample.get("token_type_ids", torch.zeros_like(sample["input_ids"]))
+    dynamic = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _pooling_wrapper(model),
+            (sample["input_ids"], sample["attention_mask"], token_type_ids),
+            str(onnx_dir / MODEL_FILENAMES["onnx"]),
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["sentence_embedding"],
+            dynamic_axes={
+                "input_ids": dynamic,
+                "attention_mask": dynamic,
+                "token_type_ids": dynamic,
+                "sentence_embedding": {0: "batch"},
+            },
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+    if quantize:
+        quantize_dynamic(
+            str(onnx_dir / MODEL_FILENAMES["onnx"]),
+            str(onnx_dir / MODEL_FILENAMES["onnx_int8"]),
+            weight_type=QuantType.QInt8,
+        )
+
+    info: Dict[str, Any] = {
+        "model_name": model_name,
+        "dimension": int(model.get_sentence_embedding_dimension()),
+        "max_seq_length": int(model.max_seq_length),
+        "verify_sample_size": len(texts),
+        "variants": {},
+    }
+    variants = ONNX_BACKENDS if quantize else ("onnx",)
+    for variant in variants:
+        info["variants"][variant] = {"file": MODEL_FILENAMES[variant]}
+    with open(onnx_dir / EXPORT_FILENAME, "w") as f:
+        json.dump(info, f, indent=2)
+
+    for variant in variants:
+        agreement = cosine_agreement(OnnxEmbeddingModel(onnx_dir, variant), texts, reference)
+        info["variants"][variant].update({
+            "min_cosine": agreement,
+            "tolerance": COSINE_TOLERANCE[variant],
+            "verified": agreement >= 1.0 - COSINE_TOLERANCE[variant],
+        })
+        status = "[OK]" if info["variants"][variant]["verified"] else "Warning:"
+        print(f"{status} {variant} export: min cosine {agreement:.5f} to the build's embeddings")
+    with open(onnx_dir / EXPORT_FILENAME, "w") as f:
+        json.dump(info, f, indent=2)
+    return info
@@ -0,0 +1,313 @@
+"""
+Embedding Cache Module
+
+Content-addressed, on-disk cache of chunk embeddings, so rebuilds and
+incremental appends only embed chunks whose text actually changed.
+
+Entries are keyed by (model name, normalization, SHA-256 of the chunk text).
+Each (model, normalization) pair gets its own namespace directory:
+
+    <cache_dir>/<namespace>/cache.json     Model name, normalization, dimension
+    <cache_dir>/<namespace>/vectors.f32    float32 rows, appended as entries are added
+    <cache_dir>/<namespace>/index.npz      Text digest and last-use tick of every row,
+                                           and the generation of the vector file
+
+When the vectors outgrow ``max_bytes`` the least recently used rows are
+evicted: the kept rows are written to a new vector file (vectors.<gen>.f32)
+and the index naming that generation is the commit point, so a crash at any
+step leaves an index and vector file that belong together.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CACHE_FORMAT_VERSION = 1
+# Default location of the cache inside a vector store directory (hidden, so
+# it is not part of any build manifest)
+DEFAULT_CACHE_DIRNAME = ".embedding_cache"
+DEFAULT_MAX_BYTES = 2 * 1024**3
+# After an eviction the cache is trimmed to this fraction of max_bytes, so
+# evictions (which rewrite the vector file) are not triggered on every add
+EVICTION_LOW_WATERMARK = 0.8
+
+_DIGEST_BYTES = 16
+
+
+def text_digest(text: str) -> bytes:
+    """Content address of one chunk text."""
+    return hashlib.sha256(text.encode("utf-8")).digest()[:_DIGEST_BYTES]
+
+
+def namespace_id(model_name: str, normalize: bool) -> str:
+    """Directory name for the entries of one (model, normalization) pair."""
+    key = f"{model_name}\0normalize={bool(normalize)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+class EmbeddingCache:
+    """Size-bounded, LRU-evicted embedding cache for one model and normalization."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        model_name: str,
+        normalize: bool = False,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Open (or create) the cache namespace of a model.
+
+        Args:
+            cache_dir: Root cache directory
+            model_name: Embedding model the vectors come from
+            normalize: Whether the cached vectors are L2-normalized
+            max_bytes: Upper bound on the vector file size (None = unbounded)
+        """
+        self.model_name = model_name
+        self.normalize = bool(normalize)
+        self.max_bytes = max_bytes
+        self.directory = Path(cache_dir) / namespace_id(model_name, normalize)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        header_path = self.directory / "cache.json"
+        self.dimension: Optional[int] = None
+        if header_path.exists():
+            with open(header_path, "r") as f:
+                header = json.load(f)
+            if header.get("format_version") == CACHE_FORMAT_VERSION:
+                self.dimension = header.get("dimension")
+
+        self._keys = np.zeros(0, dtype=f"S{_DIGEST_BYTES}")
+        self._last_used = np.zeros(0, dtype=np.int64)
+        self._generation = 0
+        index_path = self.directory / "index.npz"
+        if self.dimension and index_path.exists():
+            with np.load(index_path) as index:
+                self._keys = index["keys"]
+                self._last_used = index["last_used"]
+                if "generation" in index:
+                    self._generation = int(index["generation"])
+        self._tick = int(self._last_used.max()) if len(self._last_used) else 0
+        self._rows: Dict[bytes, int] = {key: row for row, key in enumerate(self._keys.tolist())}
+
+        # Vector files of other generations are left over from an eviction
+        # that crashed before (or after) committing its index
+        vectors_path = self._vectors_path
+        for path in self.directory.glob("vectors*.f32"):
+            if path != vectors_path:
+                path.unlink()
+        expected = len(self._keys) * self._row_bytes
+        size = vectors_path.stat().st_size if vectors_path.exists() else 0
+        if size > expected:
+            # Vectors appended after the last index write (a crash mid-add)
+            with open(vectors_path, "r+b") as f:
+                f.truncate(expected)
+        elif size < expected:
+            print(f"Warning: Embedding cache {self.directory} is inconsistent; clearing it")
+            self._clear()
+
+    def _vectors_file(self, generation: int) -> Path:
+        name = "vectors.f32" if generation == 0 else f"vectors.{generation}.f32"
+        return self.directory / name
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self._vectors_file(self._generation)
+
+    def _clear(self):
+        self._vectors_path.unlink(missing_ok=True)
+        self._keys = self._keys[:0]
+        self._last_used = self._last_used[:0]
+        self._rows = {}
+        self._write_index()
+
+    @property
+    def _row_bytes(self) -> int:
+        return (self.dimension or 0) * 4
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._keys) * self._row_bytes
+
+    def lookup(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Return the cached vector of each text, or None for misses.
+
+        Hits count as a use for LRU eviction.
+        """
+        digests = [text_digest(text) for text in texts]
+        with self._lock:
+            rows = [self._rows.get(digest) for digest in digests]
+            hit_rows = np.asarray([row for row in rows if row is not None], dtype=np.int64)
+            self.hits += len(hit_rows)
+            self.misses += len(rows) - len(hit_rows)
+            if not len(hit_rows):
+                return [None] * len(texts)
+
+            self._tick += 1
+            self._last_used[hit_rows] = self._tick
+            vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r",
+                shape=(len(self._keys), self.dimension),
+            )
+            found = iter(np.array(vectors[hit_rows]))
+            return [None if row is None else next(found) for row in rows]
+
+    def add(self, texts: Sequence[str], vectors: np.ndarray):
+        """Store vectors for texts (texts already cached are skipped)."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = int(vectors.shape[1])
+                with open(self.directory / "cache.json", "w") as f:
+                    json.dump(
+                        {
+                            "format_version": CACHE_FORMAT_VERSION,
+                            "model_name": self.model_name,
+                            "normalize": self.normalize,
+                            "dimension": self.dimension,
+                        },
+                        f,
+                        indent=2,
+                    )
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match cache ({self.dimension})"
+                )
+
+            new_keys, new_rows = [], []
+            for i, text in enumerate(texts):
+                digest = text_digest(text)
+                if digest not in self._rows:
+                    self._rows[digest] = len(self._keys) + len(new_keys)
+                    new_keys.append(digest)
+                    new_rows.append(i)
+            if not new_keys:
+                return
+
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors[new_rows].tobytes())
+            self._tick += 1
+            self._keys = np.concatenate(
+                [self._keys, np.asarray(new_keys, dtype=self._keys.dtype)]
+            )
+            self._last_used = np.concatenate(
+                [self._last_used, np.full(len(new_keys), self._tick, dtype=np.int64)]
+            )
+            if self.max_bytes is not None and self.nbytes > self.max_bytes:
+                self._evict()  # writes the index
+            else:
+                self._write_index()
+
+    def _evict(self):
+        """Keep the most recently used rows that fit under the low watermark."""
+        keep_rows = int(self.max_bytes * EVICTION_LOW_WATERMARK) // max(self._row_bytes, 1)
+        keep = np.sort(np.argsort(self._last_used, kind="stable")[len(self._keys) - keep_rows:])
+
+        vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r",
+            shape=(len(self._keys), self.dimension),
+        )
+        old_path = self._vectors_path
+        np.ascontiguousarray(vectors[keep]).tofile(self._vectors_file(self._generation + 1))
+        del vectors
+
+        self.evictions += len(self._keys) - len(keep)
+        self._generation += 1
+        self._keys = self._keys[keep]
+        self._last_used = self._last_used[keep]
+        self._rows = {key: row for row, key in enumerate(self._keys.tolist())}
+        # The index naming the new generation commits the eviction
+        self._write_index()
+        old_path.unlink()
+
+    def _write_index(self):
+        tmp_path = self.directory / ".index.tmp.npz"
+        np.savez(
+            tmp_path, keys=self._keys, last_used=self._last_used,
+            generation=np.int64(self._generation),
+        )
+        os.replace(tmp_path, self.directory / "index.npz")
+
+    def flush(self):
+        """Persist last-use ticks of lookups (adds persist immediately)."""
+        with self._lock:
+            if len(self._keys):
+                self._write_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts since opening, plus current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "entries": len(self._keys),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class CachedEncoder:
+    """
+    Drop-in for ``SentenceTransformer.encode`` that consults an EmbeddingCache first.
+
+    The underlying model is only loaded when there is at least one miss, so
+    a fully cached rebuild never loads it.
+    """
+
+    def __init__(self, cache: EmbeddingCache, load_model: Callable[[], Any]):
+        """
+        Args:
+            cache: Cache for the model's vectors
+            load_model: Returns the embedding model (called lazily, once)
+        """
+        self.cache = cache
+        self._load_model = load_model
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self._load_model()
+        return self._model
+
+    def encode(self, sentences: Sequence[str], normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """Encode texts, embedding only those not already in the cache."""
+        if bool(normalize_embeddings) != self.cache.normalize:
+            # Different normalization than the cache holds; don't mix them
+            return self.model.encode(
+                sentences, normalize_embeddings=normalize_embeddings, **kwargs
+            )
+
+        sentences = list(sentences)
+        cached = self.cache.lookup(sentences)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            # Duplicate texts within one call are embedded once
+            unique = list(dict.fromkeys(sentences[i] for i in missing))
+            embedded = np.asarray(
+                self.model.encode(unique, normalize_embeddings=normalize_embeddings, **kwargs),
+                dtype=np.float32,
+            )
+            self.cache.add(unique, embedded)
+            by_text = dict(zip(unique, embedded))
+            for i in missing:
+                cached[i] = by_text[sentences[i]]
+        if not cached:
+            return np.zeros((0, self.cache.dimension or 0), dtype=np.float32)
+        return np.vstack(cached).astype(np.float32, copy=False)
@@ -93,14 +93,16 @@ class RAGEvaluator:
         
         self.results = []
         
-        for i, q_info in enumerate(self.EVALUATION_QUESTIONS, 1):
+        # Retrieve for all questions in one batch, then generate the answers in batches
+        pipeline_results = self.rag_pipeline.query_many(
+            [q_info["question"] for q_info in self.EVALUATION_QUESTIONS]
+        )
+        
+        for i, (q_info, result) in enumerate(zip(self.EVALUATION_QUESTIONS, pipeline_results), 1):
             question = q_info["question"]
             category = q_info["category"]
             
-            print(f"[{i}/{len(self.EVALUATION_QUESTIONS)}] Processing: {question}")
-            
-            # Run RAG pipeline
-            result = self.rag_pipeline.query(question)
+            print(f"[{i}/{len(self.EVALUATION_QUESTIONS)}] Processed: {question}")
             
             # Evaluate quality (manual scoring guide)
             # This would ideally be done by human evaluators
@@ -0,0 +1,170 @@
+"""
+Filtered Search Module
+
+Pre-filtered nearest-neighbour search: the top-k is computed only over the
+rows a metadata filter allows, instead of over-fetching global neighbours and
+discarding the rest afterwards.
+
+The allowed rows are held in a RowFilter (computed once per snapshot and
+filter from the chunk store's columns). Each FAISS index behind the snapshot
+(base shards and delta segments) is searched with an IDSelectorBitmap over
+its slice of the rows, so FAISS never scores other rows. When an approximate
+index (IVF / HNSW) finds fewer than k allowed rows within its search budget,
+the allowed rows of that index are scored exactly instead, so a filtered
+query always returns min(k, allowed rows) results.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from .delta_store import LiveIndex
+from .index_types import detect_index_type
+from .sharded_index import ShardedIndex, get_search_pool, merge_results
+
+
+class RowFilter:
+    """Sorted global row ids allowed by a filter, with cached per-index FAISS selectors."""
+
+    def __init__(self, rows: np.ndarray):
+        self.rows = np.unique(np.asarray(rows, dtype=np.int64))
+        self._selectors: Dict[Tuple[int, int], Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def rows_in(self, start: int, end: int) -> np.ndarray:
+        """Allowed rows within [start, end), as ids relative to start."""
+        lo, hi = np.searchsorted(self.rows, [start, end])
+        return self.rows[lo:hi] - start
+
+    def selector(self, start: int, end: int) -> faiss.IDSelector:
+        """IDSelectorBitmap over the allowed rows of the index covering [start, end)."""
+        key = (start, end)
+        with self._lock:
+            if key not in self._selectors:
+                mask = np.zeros(end - start, dtype=bool)
+                mask[self.rows_in(start, end)] = True
+                # faiss reads bit (id & 7) of byte (id >> 3)
+                self._selectors[key] = faiss.IDSelectorBitmap(np.packbits(mask, bitorder="little"))
+            return self._selectors[key]
+
+    def without(self, removed_rows: np.ndarray) -> "RowFilter":
+        """This filter minus the given rows (returns self if none are allowed)."""
+        if not len(removed_rows) or not np.isin(removed_rows, self.rows).any():
+            return self
+        return RowFilter(np.setdiff1d(self.rows, removed_rows, assume_unique=True))
+
+
+def _leaves(index: Any, start: int = 0) -> List[Tuple[Any, int]]:
+    """FAISS indexes behind a (sharded / delta) view, with the global row id of their first vector."""
+    if isinstance(index, ShardedIndex):
+        leaves = []
+        for shard, shard_start in zip(index.shards, index.row_starts):
+            leaves.extend(_leaves(shard, start + int(shard_start)))
+        return leaves
+    return [(index, start)]
+
+
+def _selector_params(
+    index: faiss.Index, selector: faiss.IDSelector, nprobe: Optional[int], ef_search: Optional[int]
+) -> faiss.SearchParameters:
+    """Search parameters restricting an index to a selector, keeping its ANN knobs."""
+    # SearchParametersIVF/HNSW carry their own defaults, so the index's
+    # configured values must be copied when no knob is given
+    index_type = detect_index_type(index)
+    if index_type.startswith("ivf"):
+        nprobe = nprobe if nprobe is not None else faiss.extract_index_ivf(index).nprobe
+        return faiss.SearchParametersIVF(sel=selector, nprobe=int(nprobe))
+    if index_type == "hnsw":
+        if ef_search is None:
+            ef_search = faiss.downcast_index(index).hnsw.efSearch
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=int(ef_search))
+    return faiss.SearchParameters(sel=selector)
+
+
+def _exact_search(
+    index: faiss.Index, queries: np.ndarray, k: int, local_rows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Score the given rows of an index exactly (cost proportional to len(local_rows))."""
+    vectors = index.reconstruct_batch(local_rows)
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        scores = queries @ vectors.T
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    else:
+        scores = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2)
+        order = np.argsort(scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(scores, order, axis=1).astype(np.float32), local_rows[order]
+
+
+def _search_leaf(
+    index: faiss.Index,
+    start: int,
+    queries: np.ndarray,
+    k: int,
+    row_filter: RowFilter,
+    nprobe: Optional[int],
+    ef_search: Optional[int],
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    local_rows = row_filter.rows_in(start, start + index.ntotal)
+    if not len(local_rows):
+        return None
+    k = min(k, len(local_rows))
+    params = _selector_params(index, row_filter.selector(start, start + index.ntotal), nprobe, ef_search)
+    distances, labels = index.search(queries, k, params=params)
+
+    # ANN search may run out of budget before finding k allowed rows
+    short = (labels < 0).any(axis=1)
+    if short.any():
+        distances[short], labels[short] = _exact_search(index, queries[short], k, local_rows)
+    return distances, np.where(labels >= 0, labels + start, -1)
+
+
+def search_filtered(
+    index: Any,
+    queries: np.ndarray,
+    k: int,
+    row_filter: RowFilter,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k search restricted to the rows of a RowFilter.
+
+    Args:
+        index: FAISS index, ShardedIndex, or delta view (LiveIndex) of a snapshot
+        queries: (n, d) float32 query matrix
+        k: Number of neighbours per query
+        row_filter: Allowed global row ids
+        nprobe: IVF clusters to search (default: each index's own setting)
+        ef_search: HNSW search depth (default: each index's own setting)
+
+    Returns:
+        (distances, labels) of shape (n, k) like faiss.Index.search; every row
+        holds min(k, allowed rows) hits, padded with -1 labels
+    """
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    metric_type = index.metric_type
+    if isinstance(index, LiveIndex):
+        # Tombstoned rows are simply not allowed
+        row_filter = row_filter.without(index.removed_rows)
+        index = index.index
+
+    leaves = _leaves(index)
+    if isinstance(index, ShardedIndex) and len(leaves) > 1:
+        pool = get_search_pool()
+        futures = [
+            pool.submit(_search_leaf, leaf, start, queries, k, row_filter, nprobe, ef_search)
+            for leaf, start in leaves
+        ]
+        per_leaf = [future.result() for future in futures]
+    else:
+        per_leaf = [
+            _search_leaf(leaf, start, queries, k, row_filter, nprobe, ef_search)
+            for leaf, start in leaves
+        ]
+    per_leaf = [result for result in per_leaf if result is not None]
+    return merge_results(per_leaf, len(queries), k, metric_type)
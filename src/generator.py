@@ -4,12 +4,62 @@ Generator Module
 Generates answers using LLM with retrieved context.
 """
 
-from typing import Optional, Dict, Any
+import copy
+import queue
+import threading
+from typing import Optional, Dict, Any, Iterator, List, Sequence
 from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
+from transformers import StoppingCriteria, StoppingCriteriaList
+from transformers.generation.streamers import BaseStreamer
 import torch
 
+try:
+    from transformers.cache_utils import Cache
+except ImportError:  # transformers < 4.36: key/values are plain tuples
+    Cache = None
+
 from .prompt_template import PromptTemplate
 
+# Prompt tokens kept per sequence (GPT-2's context window)
+MAX_INPUT_TOKENS = 1024
+# Prompts generated together by generate_many
+DEFAULT_GENERATION_BATCH_SIZE = 4
+
+
+class _TokenQueue(BaseStreamer):
+    """Streamer passing the token ids model.generate produces (on another thread) to a queue."""
+
+    def __init__(self):
+        self.queue: "queue.Queue[Optional[List[int]]]" = queue.Queue()
+        self._prompt_seen = False
+
+    def put(self, value):
+        # The first call carries the prompt
+        if not self._prompt_seen:
+            self._prompt_seen = True
+            return
+        self.queue.put(value.reshape(-1).tolist())
+
+    def end(self):
+        self.queue.put(None)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        while True:
+            token_ids = self.queue.get()
+            if token_ids is None:
+                return
+            yield token_ids
+
+
+class _StopWhenSet(StoppingCriteria):
+    """Stops generation once the event is set (the stream's consumer went away)."""
+
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
 
 class Generator:
     """Generates answers using LLM with RAG context."""
@@ -18,7 +68,8 @@ class Generator:
         self, 
         model_name: str = "gpt2",
         use_local: bool = True,
-        device: Optional[str] = None
+        device: Optional[str] = None,
+        prefix_cache: bool = True
     ):
         """
         Initialize the generator with an LLM.
@@ -27,18 +78,26 @@ class Generator:
             model_name: HuggingFace model name or path
             use_local: Whether to use local model (True) or API (False)
             device: Device to use ('cuda', 'cpu', or None for auto)
+            prefix_cache: Compute the key/values of PromptTemplate.SYSTEM_ROLE once
+                at load time, so generate() and generate_stream() only prefill
+                the rest of each prompt
         """
         self.model_name = model_name
         self.use_local = use_local
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        # Fast tokenizers are not thread-safe; model.generate itself may run concurrently
+        self._tokenizer_lock = threading.Lock()
+        # Token ids and past key/values of the shared prompt prefix
+        self.prefix_ids: Optional[List[int]] = None
+        self._prefix_cache = None
         
         if use_local:
-            self._load_local_model()
+            self._load_local_model(prefix_cache)
         else:
             # For API-based models (OpenAI, etc.) - implement as needed
             raise NotImplementedError("API-based models not implemented yet")
     
-    def _load_local_model(self):
+    def _load_local_model(self, prefix_cache: bool = True):
         """Load the local LLM model."""
         print(f"Loading generator model: {self.model_name} on {self.device}...")
         
@@ -60,6 +119,8 @@ class Generator:
             self.model.eval()
             
             print(f"[OK] Generator model loaded successfully")
+            if prefix_cache:
+                self.cache_prefix(PromptTemplate.SYSTEM_ROLE)
             
         except Exception as e:
             print(f"Warning: Could not load {self.model_name}: {e}")
@@ -67,6 +128,48 @@ class Generator:
             self.model = None
             self.tokenizer = None
     
+    def cache_prefix(self, prefix: str):
+        """
+        Precompute the past key/values of a prompt prefix shared by all requests.
+        
+        Prompts that start with the prefix's tokens then only run the prefill
+        on the tokens after it; the model's output is unchanged. Skipped (with
+        a warning) when the model's key/values are not transformers Cache
+        objects, as with older transformers versions.
+        
+        Args:
+            prefix: Text every (most) prompts start with
+        """
+        self.prefix_ids = None
+        self._prefix_cache = None
+        if self.model is None or self.tokenizer is None:
+            return
+        try:
+            with self._tokenizer_lock:
+                prefix_ids = self.tokenizer.encode(prefix, max_length=MAX_INPUT_TOKENS, truncation=True)
+            with torch.no_grad():
+                outputs = self.model(torch.tensor([prefix_ids], device=self.device), use_cache=True)
+            if Cache is None or not isinstance(outputs.past_key_values, Cache):
+                # Legacy tuple key/values make generate() drop all but the last
+                # prompt token instead of prefilling the suffix
+                print("Warning: Prompt prefix caching needs transformers Cache support; disabled")
+                return
+            self._prefix_cache = outputs.past_key_values
+            self.prefix_ids = prefix_ids
+            print(f"[OK] Cached key/values of a {len(prefix_ids)}-token prompt prefix")
+        except Exception as e:
+            print(f"Warning: Could not cache the prompt prefix: {e}")
+    
+    def _prefix_cache_kwargs(self, input_ids: torch.Tensor) -> Dict[str, Any]:
+        """model.generate arguments reusing the prefix key/values, if input_ids starts with the prefix."""
+        prefix_ids = self.prefix_ids
+        if prefix_ids is None or len(input_ids[0]) <= len(prefix_ids):
+            return {}
+        if input_ids[0, :len(prefix_ids)].tolist() != prefix_ids:
+            return {}
+        # generate() extends the cache it is given, so every request gets its own copy
+        return {"past_key_values": copy.deepcopy(self._prefix_cache)}
+    
     def generate(
         self, 
         prompt: str, 
@@ -80,7 +183,7 @@ class Generator:
         Args:
             prompt: Complete prompt with context
             max_length: Maximum generation length
-            temperature: Sampling temperature
+            temperature: Sampling temperature (0 for greedy decoding)
             top_p: Nucleus sampling parameter
         
         Returns:
@@ -92,7 +195,10 @@ class Generator:
         
         try:
             # Tokenize input
-            inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=1024, truncation=True)
+            with self._tokenizer_lock:
+                inputs = self.tokenizer.encode(
+                    prompt, return_tensors="pt", max_length=MAX_INPUT_TOKENS, truncation=True
+                )
             inputs = inputs.to(self.device)
             
             # Generate
@@ -100,17 +206,14 @@ class Generator:
                 outputs = self.model.generate(
                     inputs,
                     max_length=len(inputs[0]) + max_length,
-                    temperature=temperature,
-                    top_p=top_p,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    eos_token_id=self.tokenizer.eos_token_id,
-                    repetition_penalty=1.2
+                    **self._prefix_cache_kwargs(inputs),
+                    **self._sampling_kwargs(temperature, top_p)
                 )
             
             # Decode only the generated part
             generated = outputs[0][len(inputs[0]):]
-            answer = self.tokenizer.decode(generated, skip_special_tokens=True)
+            with self._tokenizer_lock:
+                answer = self.tokenizer.decode(generated, skip_special_tokens=True)
             
             # Clean up the answer
             answer = answer.strip()
@@ -121,6 +224,206 @@ class Generator:
             print(f"Error during generation: {e}")
             return self._fallback_generate(prompt)
     
+    def generate_stream(
+        self,
+        prompt: str,
+        max_length: int = 500,
+        temperature: float = 0.7,
+        top_p: float = 0.9
+    ) -> Iterator[str]:
+        """
+        Generate an answer like generate(), yielding the text as it is produced.
+        
+        The model runs on a background thread; every new token is decoded
+        incrementally (only the text it adds is yielded, and tokens that end
+        inside a multi-byte character wait for the rest of it). Closing the
+        iterator early stops the generation.
+        
+        Args:
+            prompt: Complete prompt with context
+            max_length: Maximum generation length
+            temperature: Sampling temperature (0 for greedy decoding)
+            top_p: Nucleus sampling parameter
+        
+        Yields:
+            Successive pieces of the answer text (the fallback answer in one
+            piece if the model is unavailable or produced nothing)
+        """
+        if self.model is None or self.tokenizer is None:
+            yield self._fallback_generate(prompt)
+            return
+        
+        try:
+            with self._tokenizer_lock:
+                inputs = self.tokenizer.encode(
+                    prompt, return_tensors="pt", max_length=MAX_INPUT_TOKENS, truncation=True
+                )
+            inputs = inputs.to(self.device)
+        except Exception as e:
+            print(f"Error during generation: {e}")
+            yield self._fallback_generate(prompt)
+            return
+        
+        streamer = _TokenQueue()
+        stop = threading.Event()
+        errors: List[Exception] = []
+        
+        def run():
+            try:
+                with torch.no_grad():
+                    self.model.generate(
+                        inputs,
+                        max_length=len(inputs[0]) + max_length,
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([_StopWhenSet(stop)]),
+                        **self._prefix_cache_kwargs(inputs),
+                        **self._sampling_kwargs(temperature, top_p)
+                    )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                streamer.end()
+        
+        thread = threading.Thread(target=run, name="rag-generate", daemon=True)
+        thread.start()
+        token_ids: List[int] = []
+        # Text of token_ids[prefix_offset:read_offset] has been yielded; decoding
+        # from a few tokens back keeps spaces and merged bytes right
+        prefix_offset = read_offset = 0
+        emitted = False
+        try:
+            for new_ids in streamer:
+                token_ids.extend(new_ids)
+                with self._tokenizer_lock:
+                    prefix_text = self.tokenizer.decode(
+                        token_ids[prefix_offset:read_offset], skip_special_tokens=True
+                    )
+                    text = self.tokenizer.decode(token_ids[prefix_offset:], skip_special_tokens=True)
+                if len(text) <= len(prefix_text) or text.endswith("\ufffd"):
+                    continue
+                delta = text[len(prefix_text):]
+                prefix_offset, read_offset = read_offset, len(token_ids)
+                if not emitted:
+                    # Like generate(), drop leading whitespace
+                    delta = delta.lstrip()
+                    if not delta:
+                        continue
+                    emitted = True
+                yield delta
+        finally:
+            stop.set()
+        thread.join()
+        
+        if errors:
+            print(f"Error during generation: {errors[0]}")
+        if not emitted:
+            yield self._fallback_generate(prompt)
+    
+    def generate_many(
+        self,
+        prompts: Sequence[str],
+        max_length: int = 500,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        batch_size: int = DEFAULT_GENERATION_BATCH_SIZE
+    ) -> List[str]:
+        """
+        Generate answers for many prompts, batch_size prompts per model call.
+        
+        Prompts of a batch are left-padded to a common length (with an attention
+        mask), so every continuation starts at the same position and is decoded
+        on its own. If a batch fails, its prompts are generated one at a time.
+        Batches prefill whole prompts (the padding precedes the cached prefix).
+        
+        Args:
+            prompts: Complete prompts with context
+            max_length: Maximum generation length per prompt
+            temperature: Sampling temperature (0 for greedy decoding)
+            top_p: Nucleus sampling parameter
+            batch_size: Prompts generated together
+        
+        Returns:
+            One answer per prompt, in input order
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        prompts = list(prompts)
+        if self.model is None or self.tokenizer is None:
+            return [self._fallback_generate(prompt) for prompt in prompts]
+        
+        answers: List[str] = []
+        for offset in range(0, len(prompts), batch_size):
+            batch = prompts[offset:offset + batch_size]
+            if len(batch) == 1:
+                answers.append(self.generate(batch[0], max_length, temperature, top_p))
+                continue
+            try:
+                answers.extend(self._generate_batch(batch, max_length, temperature, top_p))
+            except Exception as e:
+                print(f"Error during batched generation, generating per prompt: {e}")
+                answers.extend(
+                    self.generate(prompt, max_length, temperature, top_p) for prompt in batch
+                )
+        return answers
+    
+    def _generate_batch(
+        self,
+        prompts: List[str],
+        max_length: int,
+        temperature: float,
+        top_p: float
+    ) -> List[str]:
+        """Generate one left-padded batch (see generate_many)."""
+        with self._tokenizer_lock:
+            # Set the attribute rather than passing padding_side=..., which older
+            # transformers versions ignore (right-padding the batch silently)
+            padding_side = self.tokenizer.padding_side
+            self.tokenizer.padding_side = "left"
+            try:
+                inputs = self.tokenizer(
+                    prompts,
+                    return_tensors="pt",
+                    padding=True,
+                    max_length=MAX_INPUT_TOKENS,
+                    truncation=True
+                )
+            finally:
+                self.tokenizer.padding_side = padding_side
+        input_ids = inputs["input_ids"].to(self.device)
+        attention_mask = inputs["attention_mask"].to(self.device)
+        
+        with torch.no_grad():
+            outputs = self.model.generate(
+                input_ids,
+                attention_mask=attention_mask,
+                max_new_tokens=max_length,
+                **self._sampling_kwargs(temperature, top_p)
+            )
+        
+        # Left padding aligns the prompts' ends, so continuations start at the same column;
+        # sequences that stopped early are padded with EOS, which decoding skips
+        with self._tokenizer_lock:
+            decoded = self.tokenizer.batch_decode(
+                outputs[:, input_ids.shape[1]:], skip_special_tokens=True
+            )
+        return [
+            answer.strip() or self._fallback_generate(prompt)
+            for prompt, answer in zip(prompts, decoded)
+        ]
+    
+    def _sampling_kwargs(self, temperature: float, top_p: float) -> Dict[str, Any]:
+        """model.generate decoding settings shared by generate and generate_many."""
+        kwargs: Dict[str, Any] = {
+            "pad_token_id": self.tokenizer.eos_token_id,
+            "eos_token_id": self.tokenizer.eos_token_id,
+            "repetition_penalty": 1.2,
+        }
+        if temperature <= 0:
+            kwargs["do_sample"] = False
+        else:
+            kwargs.update(do_sample=True, temperature=temperature, top_p=top_p)
+        return kwargs
+    
     def _fallback_generate(self, prompt: str) -> str:
         """
         Fallback generation when model is not available.
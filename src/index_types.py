@@ -0,0 +1,180 @@
+"""
+Index Types Module
+
+The FAISS index types a vector store build can use, how to build them, and
+how to tune them per query.
+
+    flat      Exact inner-product search over raw vectors (IndexFlatIP)
+    ivf_flat  Inverted file: search only the ``nprobe`` closest of ``nlist``
+              clusters; raw vectors
+    ivf_pq    Inverted file over product-quantized codes (``pq_m`` bytes per
+              vector), the smallest index
+    hnsw      Graph index; ``ef_search`` trades recall for latency
+    sq8       Exact scan over 8-bit scalar-quantized vectors (4x smaller than flat)
+
+Per-query knobs are passed to ``index.search`` as faiss.SearchParameters, so
+concurrent queries with different settings never interfere.
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq8")
+# Types storing quantized codes: reconstruct() only returns approximations
+LOSSY_INDEX_TYPES = ("ivf_pq", "sq8")
+
+# Defaults written into the index at build time (used when a query passes no knob)
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_CONSTRUCTION = 200
+
+# faiss wants ~39 training points per IVF centroid / PQ codebook entry
+_MIN_POINTS_PER_CENTROID = 39
+
+
+def default_nlist(num_vectors: int) -> int:
+    """Number of IVF clusters: ~4*sqrt(n), limited by the available training points."""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // _MIN_POINTS_PER_CENTROID))
+
+
+def default_pq_m(dimension: int) -> int:
+    """Sub-quantizers for IVF-PQ: the largest divisor of d giving at least 8 dims each."""
+    for m in range(max(1, dimension // 8), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def index_factory_string(
+    index_type: str,
+    num_vectors: int,
+    dimension: int,
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    hnsw_m: int = DEFAULT_HNSW_M,
+) -> str:
+    """Return the faiss.index_factory description of an index type."""
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "sq8":
+        return "SQ8"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m},Flat"
+    nlist = nlist or default_nlist(num_vectors)
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if index_type == "ivf_pq":
+        # 8-bit codebooks need 256 * 39 training points; small builds use fewer bits
+        nbits = max(1, min(8, int(math.log2(max(num_vectors // _MIN_POINTS_PER_CENTROID, 2)))))
+        return f"IVF{nlist},PQ{pq_m or default_pq_m(dimension)}x{nbits}"
+    raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+
+
+def build_index(
+    embeddings: np.ndarray,
+    index_type: str = "flat",
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    hnsw_m: int = DEFAULT_HNSW_M,
+    ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+    nprobe: int = DEFAULT_NPROBE,
+    ef_search: int = DEFAULT_EF_SEARCH,
+) -> faiss.Index:
+    """
+    Train (if needed) and fill an inner-product index of the given type.
+
+    Args:
+        embeddings: (n, d) normalized float32 embeddings
+        index_type: One of INDEX_TYPES
+        nlist: IVF clusters (default: default_nlist(n))
+        pq_m: IVF-PQ sub-quantizers (default: default_pq_m(d))
+        hnsw_m: HNSW graph degree
+        ef_construction: HNSW build-time search depth
+        nprobe: Default IVF clusters searched per query
+        ef_search: Default HNSW search depth per query
+
+    Returns:
+        The populated index
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    num_vectors, dimension = embeddings.shape
+    description = index_factory_string(index_type, num_vectors, dimension, nlist, pq_m, hnsw_m)
+    index = faiss.index_factory(dimension, description, faiss.METRIC_INNER_PRODUCT)
+
+    if index_type == "hnsw":
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+    if not index.is_trained:
+        index.train(embeddings)
+    index.add(embeddings)
+
+    if index_type.startswith("ivf"):
+        ivf = faiss.extract_index_ivf(index)
+        ivf.nprobe = min(nprobe, ivf.nlist)
+        # Keeps reconstruct() working (compaction, resharding, reranking)
+        ivf.make_direct_map()
+    return index
+
+
+def _base_index(index: Any) -> Any:
+    """Unwrap ShardedIndex and delta views down to their first FAISS index."""
+    while not isinstance(index, faiss.Index):
+        if hasattr(index, "shards"):
+            index = index.shards[0]
+        elif hasattr(index, "index"):
+            index = index.index
+        else:
+            break
+    return index
+
+
+def detect_index_type(index: Any) -> str:
+    """Return the INDEX_TYPES name of a loaded (possibly sharded) index."""
+    index = faiss.downcast_index(_base_index(index))
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return "sq8"
+    if isinstance(index, faiss.IndexFlat):
+        return "flat"
+    return type(index).__name__
+
+
+def describe_index(index: Any) -> Dict[str, Any]:
+    """Index type plus its build-time search defaults, for summaries."""
+    index_type = detect_index_type(index)
+    base = _base_index(index)
+    info: Dict[str, Any] = {"index_type": index_type}
+    if index_type.startswith("ivf"):
+        ivf = faiss.extract_index_ivf(base)
+        info.update(nlist=ivf.nlist, nprobe=ivf.nprobe)
+    elif index_type == "hnsw":
+        info.update(ef_search=faiss.downcast_index(base).hnsw.efSearch)
+    return info
+
+
+def make_search_params(
+    index_type: str, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+) -> Optional[faiss.SearchParameters]:
+    """
+    Per-query search parameters for an index type.
+
+    Knobs that do not apply to the index type are ignored, so callers can
+    pass their settings unconditionally.
+
+    Returns:
+        SearchParameters to pass to index.search, or None to use the index defaults
+    """
+    if index_type.startswith("ivf") and nprobe is not None:
+        return faiss.SearchParametersIVF(nprobe=int(nprobe))
+    if index_type == "hnsw" and ef_search is not None:
+        return faiss.SearchParametersHNSW(efSearch=int(ef_search))
+    return None
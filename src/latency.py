@@ -0,0 +1,70 @@
+"""
+Latency Module
+
+Per-stage latency tracking for query serving (embedding, dense search,
+lexical search, fusion, generation, ...).
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+import numpy as np
+
+# Recent samples kept per stage for percentiles
+DEFAULT_WINDOW = 1000
+
+
+class LatencyStats:
+    """Thread-safe rolling window of stage latencies."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+                self._counts[stage] = 0
+            self._samples[stage].append(seconds)
+            self._counts[stage] += 1
+
+    @contextmanager
+    def time(self, stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+        """
+        Time a block as one sample of a stage.
+
+        Args:
+            stage: Stage name
+            timings: Optional per-request dict that also receives the seconds
+                (added to, if the stage runs more than once per request)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.record(stage, seconds)
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Count, mean, p50 and p95 (milliseconds) per stage over the recent window."""
+        with self._lock:
+            samples = {stage: np.asarray(values) * 1000 for stage, values in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            stage: {
+                "count": counts[stage],
+                "mean_ms": float(values.mean()),
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+            }
+            for stage, values in samples.items()
+            if len(values)
+        }
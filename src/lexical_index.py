@@ -0,0 +1,296 @@
+"""
+Lexical Index Module
+
+BM25 inverted index over chunk texts, for exact-term matching (fee names,
+"APR", "Zelle", ...) that dense embeddings tend to blur.
+
+The index is stored next to the FAISS index of a build (and of each delta
+segment) in ``bm25/``, as flat numpy arrays that are memory-mapped on open:
+
+    bm25.json          Parameters (k1, b), document count, average length
+    terms.npy          Sorted vocabulary (fixed-width unicode)
+    offsets.npy        int64 start of each term's postings (num_terms + 1)
+    doc_ids.npy        int32 document (row) ids, grouped by term, ascending
+    tfs.npy            uint16 term frequency of each posting
+    doc_lengths.npy    int32 token count of each document
+
+A LexicalSearcher queries several such indexes (base build plus delta
+segments) as one corpus: document frequencies are summed across parts, so
+scores from different parts are comparable.
+"""
+
+import json
+import re
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LEXICAL_DIRNAME = "bm25"
+LEXICAL_FORMAT_VERSION = 1
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+# Longer tokens are dropped (URLs, hashes); keeps the vocabulary array compact
+MAX_TOKEN_LENGTH = 32
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Common English function words, plus the CFPB redaction placeholders
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i if in into is it "
+    "its me my no not of on or our she so than that the their them then there these they this "
+    "to was we were what when which who will with would you your xx xxx xxxx xxxxxxxx".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens of a text, without stopwords."""
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and len(token) <= MAX_TOKEN_LENGTH
+    ]
+
+
+class BM25Index:
+    """Read-only BM25 postings for one contiguous range of chunk rows."""
+
+    def __init__(
+        self,
+        terms: np.ndarray,
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+    ):
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(doc_lengths)
+        self.avg_doc_length = float(doc_lengths.mean()) if self.num_docs else 0.0
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> "BM25Index":
+        """Tokenize texts (one document per chunk row) and build the postings."""
+        vocabulary: Dict[str, int] = {}
+        term_ids, doc_ids, tfs = array("i"), array("i"), array("H")
+        lengths = array("i")
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text or "")
+            lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                doc_ids.append(doc)
+                tfs.append(min(count, 65535))
+
+        # Renumber terms in sorted order and group postings by term; the stable
+        # sort keeps each term's documents ascending
+        sorted_terms = sorted(vocabulary)
+        width = max((len(term) for term in sorted_terms), default=1)
+        rank = np.empty(len(vocabulary), dtype=np.int64)
+        rank[[vocabulary[term] for term in sorted_terms]] = np.arange(len(sorted_terms))
+        term_ids = rank[np.frombuffer(term_ids, dtype=np.int32)]
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.zeros(len(sorted_terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(sorted_terms)), out=offsets[1:])
+        return cls(
+            np.asarray(sorted_terms, dtype=f"U{width}"),
+            offsets,
+            np.frombuffer(doc_ids, dtype=np.int32)[order],
+            np.frombuffer(tfs, dtype=np.uint16)[order],
+            np.frombuffer(lengths, dtype=np.int32).copy(),
+            k1,
+            b,
+        )
+
+    def save(self, directory: Path):
+        """Write the index arrays and header to a directory."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ("terms", "offsets", "doc_ids", "tfs", "doc_lengths"):
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        with open(directory / "bm25.json", "w") as f:
+            json.dump(
+                {
+                    "format_version": LEXICAL_FORMAT_VERSION,
+                    "k1": self.k1,
+                    "b": self.b,
+                    "num_docs": self.num_docs,
+                    "num_terms": len(self.terms),
+                    "num_postings": len(self.doc_ids),
+                    "avg_doc_length": self.avg_doc_length,
+                },
+                f,
+                indent=2,
+            )
+
+    @classmethod
+    def open(cls, directory: Path, mmap: bool = True) -> "BM25Index":
+        """
+        Open a saved index.
+
+        Raises:
+            FileNotFoundError: If the directory has no index
+            ValueError: If the index was written by an incompatible version
+        """
+        directory = Path(directory)
+        with open(directory / "bm25.json", "r") as f:
+            header = json.load(f)
+        if header.get("format_version") != LEXICAL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported lexical index format: {header.get('format_version')}")
+        mode = "r" if mmap else None
+        arrays = [
+            np.load(directory / f"{name}.npy", mmap_mode=mode)
+            for name in ("terms", "offsets", "doc_ids", "tfs", "doc_lengths")
+        ]
+        return cls(*arrays, k1=header["k1"], b=header["b"])
+
+    def term_ids(self, terms: Sequence[str]) -> np.ndarray:
+        """Vocabulary id of each term, -1 for unknown terms."""
+        if not len(self.terms) or not terms:
+            return np.full(len(terms), -1, dtype=np.int64)
+        positions = np.searchsorted(self.terms, terms)
+        positions = np.minimum(positions, len(self.terms) - 1)
+        found = self.terms[positions] == np.asarray(terms)
+        return np.where(found, positions, -1)
+
+    def document_frequencies(self, terms: Sequence[str]) -> np.ndarray:
+        ids = self.term_ids(terms)
+        return np.where(ids >= 0, self.offsets[ids + 1] - self.offsets[np.maximum(ids, 0)], 0)
+
+    def score(self, terms: Sequence[str], idf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 scores of every document containing at least one term.
+
+        Args:
+            terms: Query terms (deduplicated)
+            idf: Inverse document frequency of each term
+
+        Returns:
+            (doc_ids, scores) of the matching documents, doc_ids ascending
+        """
+        docs, contributions = [], []
+        for term_id, term_idf in zip(self.term_ids(terms), idf):
+            if term_id < 0:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            doc_ids = np.asarray(self.doc_ids[start:end])
+            tfs = np.asarray(self.tfs[start:end], dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_ids] / max(self.avg_doc_length, 1e-9))
+            docs.append(doc_ids)
+            contributions.append(term_idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not docs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        docs = np.concatenate(docs)
+        contributions = np.concatenate(contributions)
+        if len(docs) * 8 >= self.num_docs:
+            # Dense accumulation is cheaper when postings cover much of the corpus
+            totals = np.bincount(docs, weights=contributions, minlength=self.num_docs)
+            matched = np.flatnonzero(totals > 0)
+            return matched, totals[matched].astype(np.float32)
+        matched, inverse = np.unique(docs, return_inverse=True)
+        return matched, np.bincount(inverse, weights=contributions).astype(np.float32)
+
+    def nbytes(self) -> int:
+        return sum(
+            getattr(self, name).nbytes for name in ("terms", "offsets", "doc_ids", "tfs", "doc_lengths")
+        )
+
+
+def write_lexical_index(output_dir: Path, chunks: Iterable[str]) -> BM25Index:
+    """Build and save the BM25 index of a build (or delta segment) directory."""
+    index = BM25Index.build(chunks)
+    index.save(Path(output_dir) / LEXICAL_DIRNAME)
+    return index
+
+
+def open_lexical_index(store_dir: Path, chunks: Sequence[str]) -> BM25Index:
+    """
+    Open the saved BM25 index of a build directory.
+
+    Builds predating lexical indexes get one built in memory from their chunks.
+    """
+    lexical_dir = Path(store_dir) / LEXICAL_DIRNAME
+    if (lexical_dir / "bm25.json").exists():
+        index = BM25Index.open(lexical_dir)
+        if index.num_docs == len(chunks):
+            return index
+        print(f"Warning: {lexical_dir} does not match the chunk store; rebuilding in memory")
+    else:
+        print(f"[INFO] No lexical index in {store_dir}; building one in memory")
+    return BM25Index.build(chunks)
+
+
+class LexicalSearcher:
+    """BM25 search over several lexical indexes covering consecutive row ranges."""
+
+    def __init__(self, parts: Sequence[Tuple[BM25Index, int]]):
+        """
+        Args:
+            parts: (index, global row id of its first document) pairs
+        """
+        self.parts = list(parts)
+        self.num_docs = sum(index.num_docs for index, _ in self.parts)
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        allowed_rows: Optional[np.ndarray] = None,
+        removed_rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k BM25 matches of a query.
+
+        Args:
+            query: Query text
+            k: Number of results
+            allowed_rows: Optional sorted global rows to restrict the search to
+            removed_rows: Optional global rows to exclude (withdrawn complaints)
+
+        Returns:
+            (scores, rows), best first; fewer than k if fewer documents match
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.num_docs:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        df = sum(index.document_frequencies(terms) for index, _ in self.parts)
+        idf = np.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+        rows, scores = [], []
+        for index, row_start in self.parts:
+            part_rows, part_scores = index.score(terms, idf)
+            rows.append(part_rows + row_start)
+            scores.append(part_scores)
+        rows = np.concatenate(rows)
+        scores = np.concatenate(scores)
+
+        keep = np.ones(len(rows), dtype=bool)
+        if allowed_rows is not None:
+            keep &= np.isin(rows, allowed_rows, assume_unique=True)
+        if removed_rows is not None and len(removed_rows):
+            keep &= ~np.isin(rows, removed_rows)
+        rows, scores = rows[keep], scores[keep]
+
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        # Ties broken by row id, so results are deterministic
+        order = np.lexsort((rows, -scores))
+        return scores[order], rows[order].astype(np.int64)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "num_docs": self.num_docs,
+            "num_parts": len(self.parts),
+            "num_terms": sum(len(index.terms) for index, _ in self.parts),
+            "bytes": sum(index.nbytes() for index, _ in self.parts),
+        }
@@ -5,7 +5,12 @@ Designs prompts that position the LLM as a CrediTrust financial analyst
 and ensures evidence-backed responses.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
+
+# Longest and shortest text shared by consecutive chunks that merging detects
+# (builds cut 500-character chunks with a 50-character overlap)
+MAX_CHUNK_OVERLAP = 200
+MIN_CHUNK_OVERLAP = 8
 
 
 class PromptTemplate:
@@ -20,6 +25,45 @@ Your responses must:
 4. Clearly state when the provided context is insufficient to answer
 5. Focus on business insights: trends, patterns, and actionable recommendations"""
 
+    @staticmethod
+    def merge_overlapping(texts: Sequence[str]) -> str:
+        """
+        Join consecutive chunks of one narrative, keeping their overlap once.
+
+        The splitter repeats the end of each chunk at the start of the next
+        one; that shared text (the longest suffix of the merged text that
+        starts the next chunk) is dropped. Chunks without a detectable overlap
+        are joined with a space.
+
+        Args:
+            texts: Chunk texts in narrative (chunk_index) order
+
+        Returns:
+            The merged narrative
+        """
+        merged = ""
+        for text in texts:
+            text = text.strip()
+            if not merged:
+                merged = text
+                continue
+            overlap = 0
+            for size in range(min(MAX_CHUNK_OVERLAP, len(merged), len(text)), MIN_CHUNK_OVERLAP - 1, -1):
+                if merged.endswith(text[:size]):
+                    overlap = size
+                    break
+            merged = merged + text[overlap:] if overlap else f"{merged} {text}"
+        return merged
+
+    @staticmethod
+    def narrative(result: Dict[str, Any]) -> str:
+        """A result's chunk, with any neighbouring chunks the retriever attached merged in."""
+        before = result.get("context_before") or []
+        after = result.get("context_after") or []
+        if not before and not after:
+            return result["chunk"]
+        return PromptTemplate.merge_overlapping([*before, result["chunk"], *after])
+
     @staticmethod
     def format_context(chunks: List[Dict[str, Any]]) -> str:
         """
@@ -27,6 +71,8 @@ Your responses must:
 
         Args:
             chunks: List of retrieved chunk dictionaries with 'chunk' and 'metadata' keys
+                (and optionally 'context_before' / 'context_after' neighbour chunks,
+                merged into the narrative without repeating their overlap)
 
         Returns:
             Formatted context string
@@ -34,7 +80,7 @@ Your responses must:
         context_parts = []
 
         for i, result in enumerate(chunks, 1):
-            chunk = result["chunk"]
+            chunk = PromptTemplate.narrative(result)
             metadata = result.get("metadata", {})
             similarity = result.get("similarity_score", 0.0)
 
@@ -0,0 +1,102 @@
+"""
+Query Cache Module
+
+In-memory LRU cache of normalized query embeddings, so repeated questions
+(e.g. the example questions of the app) skip the embedding model.
+
+Queries are canonicalized before lookup (whitespace collapsed, lower-cased;
+the default all-MiniLM-L6-v2 model is uncased, so case does not change its
+embedding) and keyed together with the embedding model name and backend
+(torch / onnx / onnx_int8), so a model change or a fallback to another
+backend never serves vectors from the previous encoder.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_QUERY_CACHE_SIZE = 1024
+
+
+def canonicalize_query(query: str) -> str:
+    """Collapse whitespace and lower-case a query for cache lookup."""
+    return " ".join(query.split()).lower()
+
+
+class QueryEmbeddingCache:
+    """Thread-safe, size-bounded LRU cache with optional TTL."""
+
+    def __init__(self, max_entries: int = DEFAULT_QUERY_CACHE_SIZE, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximum number of cached vectors (least recently used are evicted)
+            ttl_seconds: Entries older than this are treated as misses (None = no expiry)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(
+        model_name: Optional[str], query: str, backend: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[str], str]:
+        """Cache key of a query embedded with a model on an embedding backend."""
+        return (model_name, backend, canonicalize_query(query))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """Return the cached vector for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None:
+                if time.monotonic() - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, vector: np.ndarray):
+        """Cache a vector (stored read-only, since hits share it)."""
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -2,15 +2,52 @@
 RAG Pipeline Module
 
 Orchestrates the complete RAG pipeline: retrieval + generation.
+
+Queries are safe to issue from many threads at once; they execute on a
+bounded pool of query workers under a FAISS / torch thread budget (see
+concurrency for the full concurrency model).
 """
 
-from typing import Dict, Any, List, Optional
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
 from pathlib import Path
 
+from .concurrency import DEFAULT_QUERY_WORKERS, QueryExecutor, ThreadBudget
 from .vector_store_loader import VectorStoreLoader
 from .retriever import Retriever
+from .query_cache import DEFAULT_QUERY_CACHE_SIZE
+from .diversity import DEFAULT_MMR_CANDIDATES
 from .prompt_template import PromptTemplate
-from .generator import Generator
+from .result_cache import DEFAULT_MAX_DISTANCE, SemanticResultCache
+from .secondary_index import filter_key
+from .generator import DEFAULT_GENERATION_BATCH_SIZE, Generator
+from .latency import LatencyStats
+
+# Components loaded at startup, and the ones each stage of a query needs
+RETRIEVAL_COMPONENTS = ("index", "chunks", "embedding_model")
+GENERATION_COMPONENTS = ("generator",)
+
+GENERATOR_LOADING_MESSAGE = (
+    "The answer generator is still loading. The retrieved complaint evidence is "
+    "shown below; please ask again in a moment for a generated summary."
+)
+NO_RELEVANT_CHUNKS_MESSAGE = (
+    "No complaint narratives were relevant enough to answer this question. "
+    "Try rephrasing it or asking about a specific product or issue."
+)
+
+
+def combine_filters(
+    product_category: Optional[str], filters: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """Merge the product_category shortcut into a filter expression (None if empty)."""
+    combined = dict(filters or {})
+    if product_category:
+        combined["product_category"] = product_category
+    return combined or None
 
 
 class RAGPipeline:
@@ -21,34 +58,311 @@ class RAGPipeline:
         vector_store_dir: Optional[Path] = None,
         top_k: int = 5,
         generator_model: str = "gpt2",
+        index_load_mode: str = "eager",
+        background_load: bool = False,
+        load_workers: int = 4,
+        watch_interval: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        query_cache_ttl: Optional[float] = None,
+        retrieval_mode: str = "dense",
+        collapse_by_complaint: bool = False,
+        merge_siblings: bool = False,
+        mmr_lambda: Optional[float] = None,
+        mmr_candidates: int = DEFAULT_MMR_CANDIDATES,
+        min_similarity: Optional[float] = None,
+        embedding_backend: str = "torch",
+        query_workers: int = DEFAULT_QUERY_WORKERS,
+        max_pending_queries: Optional[int] = None,
+        total_threads: Optional[int] = None,
+        faiss_threads: Optional[int] = None,
+        torch_threads: Optional[int] = None,
+        result_cache_size: int = 0,
+        result_cache_max_distance: float = DEFAULT_MAX_DISTANCE,
+        expand_neighbors: int = 0,
+        generation_batch_size: int = DEFAULT_GENERATION_BATCH_SIZE,
     ):
         """
         Initialize the RAG pipeline.
 
+        The FAISS index, chunk store, embedding model and generator model are
+        loaded concurrently on a thread pool, so startup takes as long as the
+        slowest component rather than the sum of all of them.
+
         Args:
             vector_store_dir: Path to vector store directory
             top_k: Number of chunks to retrieve
             generator_model: LLM model name for generation
+            index_load_mode: FAISS index load mode ("eager" or "mmap"), see VectorStoreLoader
+            background_load: Return immediately and keep loading in the background.
+                Queries then wait only for the components they need.
+            load_workers: Size of the loader thread pool
+            watch_interval: If set, poll the vector store every this many seconds and
+                hot-swap newly published builds (see VectorStoreLoader.reload)
+            nprobe: IVF clusters searched per query (IVF index builds only)
+            ef_search: HNSW search depth per query (HNSW index builds only)
+            query_cache_size: Query embeddings kept in the retriever's LRU cache
+                (0 disables it)
+            query_cache_ttl: Seconds a cached query embedding stays valid
+            retrieval_mode: "dense" (FAISS) or "hybrid" (FAISS + BM25 with rank fusion)
+            collapse_by_complaint: Retrieve at most one chunk per complaint
+            merge_siblings: Collapse by complaint and merge each complaint's chunks
+                into one evidence record (see Retriever.retrieve_many)
+            mmr_lambda: If set, rerank retrieved chunks for diversity (maximal
+                marginal relevance) so near-duplicate complaints do not fill the prompt
+            mmr_candidates: Candidate pool the MMR reranker picks top_k from
+            min_similarity: Minimum cosine similarity of retrieved chunks; weaker
+                chunks are dropped during retrieval and never reach the prompt
+            embedding_backend: Query encoder ("torch", "onnx" or "onnx_int8"),
+                see VectorStoreLoader
+            query_workers: Queries executed concurrently (size of the query pool)
+            max_pending_queries: Queries accepted while all workers are busy;
+                further queries raise RuntimeError (default: 4 per worker)
+            total_threads: CPU threads the query workers share (default: CPU count)
+            faiss_threads: FAISS OpenMP threads per worker (default: the
+                worker's share of total_threads)
+            torch_threads: torch intra-op threads (default: the worker's share
+                of total_threads)
+            result_cache_size: Results kept in the semantic result cache, which
+                answers near-duplicate questions with an earlier answer and
+                sources (0 disables it; see result_cache)
+            result_cache_max_distance: Maximum cosine distance between two
+                questions' embeddings for one to reuse the other's result
+            expand_neighbors: Neighbouring chunks of the same complaint added on
+                each side of every retrieved chunk; the prompt merges them into
+                one narrative without repeating the chunk overlap
+            generation_batch_size: Prompts generated together by query_many
         """
         # Load vector store
-        self.vector_store_loader = VectorStoreLoader(vector_store_dir)
-        if not self.vector_store_loader.load():
+        self.vector_store_loader = VectorStoreLoader(
+            vector_store_dir, index_load_mode=index_load_mode, embedding_backend=embedding_backend
+        )
+        if not self.vector_store_loader.check_files():
             raise RuntimeError(
                 "Failed to load vector store. Ensure Task 2 has been completed."
             )
 
-        # Initialize components
-        self.retriever = Retriever(self.vector_store_loader, top_k=top_k)
-        self.generator = Generator(model_name=generator_model)
+        self.top_k = top_k
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.query_cache_size = query_cache_size
+        self.query_cache_ttl = query_cache_ttl
+        self.retrieval_mode = retrieval_mode
+        self.collapse_by_complaint = collapse_by_complaint
+        self.merge_siblings = merge_siblings
+        self.mmr_lambda = mmr_lambda
+        self.mmr_candidates = mmr_candidates
+        self.min_similarity = min_similarity
+        self.expand_neighbors = expand_neighbors
+        self.generation_batch_size = generation_batch_size
+        self.result_cache: Optional[SemanticResultCache] = None
+        if result_cache_size:
+            self.result_cache = SemanticResultCache(result_cache_size, result_cache_max_distance)
+        # Per-stage query latency (retrieval stages are recorded by the retriever)
+        self.latency = LatencyStats()
+        self.generator_model = generator_model
         self.prompt_template = PromptTemplate()
+        self.component_load_seconds: Dict[str, float] = {}
+        self._retriever: Optional[Retriever] = None
+        self._retriever_lock = threading.Lock()
+        self.thread_budget = ThreadBudget(
+            query_workers,
+            total_threads=total_threads,
+            faiss_threads=faiss_threads,
+            torch_threads=torch_threads,
+        )
+        self.query_executor = QueryExecutor(self.thread_budget, max_pending=max_pending_queries)
+
+        # Initialize components
+        loader = self.vector_store_loader
+        executor = ThreadPoolExecutor(
+            max_workers=load_workers, thread_name_prefix="rag-load"
+        )
+        self._components: Dict[str, Future] = {
+            "index": executor.submit(self._load_component, "index", loader.load_index),
+            "chunks": executor.submit(self._load_component, "chunks", loader.load_chunks),
+            "embedding_model": executor.submit(
+                self._load_component, "embedding_model", loader.load_embedding_model
+            ),
+            "generator": executor.submit(
+                self._load_component,
+                "generator",
+                lambda: Generator(model_name=generator_model),
+            ),
+        }
+        # No more work is submitted; running loads finish on their own
+        executor.shutdown(wait=False)
+
+        if watch_interval:
+            # Reloads are no-ops until the initial load has finished
+            loader.start_watching(watch_interval)
+
+        if background_load:
+            print("[INFO] RAG Pipeline components loading in the background")
+            return
+
+        wait(self._components.values())
+        try:
+            self.wait_for(*self._components)
+            # Build the retriever eagerly so a broken store fails at startup
+            self.retriever
+        except (RuntimeError, ValueError) as e:
+            self.close()
+            raise RuntimeError(
+                f"Failed to load vector store. Ensure Task 2 has been completed. ({e})"
+            ) from e
 
         print("[OK] RAG Pipeline initialized successfully")
 
+    def _load_component(self, name: str, load_fn: Callable[[], Any]) -> Any:
+        """Run one component loader and record how long it took."""
+        start = time.perf_counter()
+        try:
+            return load_fn()
+        finally:
+            self.component_load_seconds[name] = time.perf_counter() - start
+
+    def is_ready(self, *components: str) -> bool:
+        """
+        Check whether components have finished loading successfully.
+
+        Args:
+            components: Component names; all components if none are given
+        """
+        names = components or tuple(self._components)
+        return all(
+            self._components[name].done() and self._components[name].exception() is None
+            for name in names
+        )
+
+    def wait_for(self, *components: str, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Block until the given components are loaded.
+
+        Args:
+            components: Component names ("index", "chunks", "embedding_model", "generator")
+            timeout: Maximum seconds to wait per component
+
+        Returns:
+            The loaded component objects, in the order requested
+
+        Raises:
+            RuntimeError: If a component failed to load
+        """
+        loaded = []
+        for name in components:
+            try:
+                loaded.append(self._components[name].result(timeout=timeout))
+            except Exception as e:
+                raise RuntimeError(f"Failed to load {name}: {e}") from e
+        return loaded
+
+    @property
+    def retriever(self) -> Retriever:
+        """Retriever over the loaded vector store (waits for retrieval components)."""
+        if self._retriever is None:
+            self.wait_for(*RETRIEVAL_COMPONENTS)
+            with self._retriever_lock:
+                if self._retriever is None:
+                    self.vector_store_loader.check_consistency()
+                    self._retriever = Retriever(
+                        self.vector_store_loader,
+                        top_k=self.top_k,
+                        nprobe=self.nprobe,
+                        ef_search=self.ef_search,
+                        query_cache_size=self.query_cache_size,
+                        query_cache_ttl=self.query_cache_ttl,
+                        retrieval_mode=self.retrieval_mode,
+                        latency=self.latency,
+                        collapse_by_complaint=self.collapse_by_complaint,
+                        merge_siblings=self.merge_siblings,
+                        mmr_lambda=self.mmr_lambda,
+                        mmr_candidates=self.mmr_candidates,
+                        min_similarity=self.min_similarity,
+                        expand_neighbors=self.expand_neighbors,
+                    )
+        return self._retriever
+
+    @property
+    def generator(self) -> Generator:
+        """Answer generator (waits for the generator model to load)."""
+        return self.wait_for(*GENERATION_COMPONENTS)[0]
+
+    def _answer(
+        self,
+        question: str,
+        retrieved_chunks: List[Dict[str, Any]],
+        wait_for_generator: bool,
+        timings: Dict[str, float],
+    ) -> Dict[str, Any]:
+        """Build the prompt from retrieved chunks and generate the answer (see query())."""
+        return self._answer_many([question], [retrieved_chunks], wait_for_generator, [timings])[0]
+
+    def _prepare(
+        self, question: str, retrieved_chunks: List[Dict[str, Any]], timings: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """Result of a question with its prompt built and its answer still to generate (None)."""
+        if not retrieved_chunks:
+            # Nothing (relevant enough) was retrieved: no prompt, no generation
+            answer, prompt = NO_RELEVANT_CHUNKS_MESSAGE, None
+        else:
+            answer = None
+            prompt = self.prompt_template.build_prompt_with_metadata(
+                question, retrieved_chunks
+            )
+        return {
+            "answer": answer,
+            "retrieved_chunks": retrieved_chunks,
+            "prompt": prompt,
+            "question": question,
+            "generated": False,
+            "timings": timings,
+            "cached": False,
+        }
+
+    def _answer_many(
+        self,
+        questions: List[str],
+        retrieved: List[List[Dict[str, Any]]],
+        wait_for_generator: bool,
+        timings: List[Dict[str, float]],
+    ) -> List[Dict[str, Any]]:
+        """Build prompts and generate the answers of several questions in batches."""
+        results = [
+            self._prepare(question, retrieved_chunks, question_timings)
+            for question, retrieved_chunks, question_timings in zip(questions, retrieved, timings)
+        ]
+
+        pending = [result for result in results if result["prompt"] is not None]
+        if not pending:
+            return results
+        if not (wait_for_generator or self.is_ready(*GENERATION_COMPONENTS)):
+            for result in pending:
+                result["answer"] = GENERATOR_LOADING_MESSAGE
+            return results
+
+        generation_timings: Dict[str, float] = {}
+        with self.latency.time("generation", generation_timings):
+            answers = self.generator.generate_many(
+                [result["prompt"] for result in pending],
+                batch_size=self.generation_batch_size,
+            )
+        for result, answer in zip(pending, answers):
+            result["answer"] = answer
+            result["generated"] = True
+            # Every question of a batch waited for the whole batch
+            result["timings"]["generation"] = generation_timings["generation"]
+        return results
+
     def query(
         self,
         question: str,
         product_category: Optional[str] = None,
         top_k: Optional[int] = None,
+        wait_for_generator: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+        min_similarity: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Process a user question through the RAG pipeline.
@@ -57,42 +371,333 @@ class RAGPipeline:
             question: User's question
             product_category: Optional product category filter
             top_k: Optional override for number of chunks to retrieve
+            wait_for_generator: If False and the generator is still loading, return
+                the retrieved chunks with a placeholder answer instead of blocking
+            filters: Optional filter expression (date range, category set, product, ...),
+                see Retriever.retrieve_many; combined with product_category
+            min_similarity: Optional override of the pipeline's minimum chunk similarity
 
         Returns:
             Dictionary containing:
-                - answer: Generated answer
+                - answer: Generated answer (NO_RELEVANT_CHUNKS_MESSAGE if no chunk
+                  qualified)
                 - retrieved_chunks: List of retrieved chunks with metadata
-                - prompt: Full prompt used for generation
+                - prompt: Full prompt used for generation (None if no chunk qualified)
+                - generated: False if generation was skipped because the generator
+                  was not ready yet or no chunk qualified
+                - timings: Seconds spent per stage (embed, dense_search,
+                  lexical_search, fusion, mmr, generation)
+                - cached: True if the answer and sources were reused from a
+                  near-duplicate earlier question (see result_cache_size);
+                  cache_similarity then holds the two questions' similarity
+
+        Raises:
+            RuntimeError: If the query pool is full (see max_pending_queries)
         """
-        # Step 1: Retrieve relevant chunks
-        if product_category:
-            retrieved_chunks = self.retriever.retrieve_with_filter(
-                question, product_category=product_category, top_k=top_k
+        return self.query_executor.run(
+            self._query, question, product_category, top_k, wait_for_generator, filters, min_similarity
+        )
+
+    def _query(
+        self,
+        question: str,
+        product_category: Optional[str],
+        top_k: Optional[int],
+        wait_for_generator: bool,
+        filters: Optional[Dict[str, Any]],
+        min_similarity: Optional[float],
+    ) -> Dict[str, Any]:
+        timings: Dict[str, float] = {}
+        cached, retrieved_chunks, cache_entry = self._retrieve(
+            question, combine_filters(product_category, filters), top_k, min_similarity, timings
+        )
+        if cached is not None:
+            return cached
+        result = self._answer(question, retrieved_chunks, wait_for_generator, timings)
+        self._cache_result(cache_entry, result)
+        return result
+
+    def _retrieve(
+        self,
+        question: str,
+        filters: Optional[Dict[str, Any]],
+        top_k: Optional[int],
+        min_similarity: Optional[float],
+        timings: Dict[str, float],
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], Optional[tuple]]:
+        """
+        Retrieve the chunks of one question, unless the result cache answers it.
+
+        Returns:
+            (cached result or None, retrieved chunks, result cache entry
+            (embedding, store version, key) to cache the result under, or None
+            without a result cache)
+        """
+        if self.result_cache is None:
+            retrieved_chunks = self.retriever.retrieve_many(
+                [question], top_k=top_k, filters=[filters], timings=timings, min_similarity=min_similarity,
+            )[0]
+            return None, retrieved_chunks, None
+
+        retriever = self.retriever
+        with self.latency.time("embed", timings):
+            query_embeddings = retriever.encode_queries([question])
+        # Results are only interchangeable between identical retrieval settings
+        cache_key = (
+            filter_key(filters) if filters else None,
+            top_k if top_k is not None else self.top_k,
+            min_similarity if min_similarity is not None else self.min_similarity,
+        )
+        # One snapshot for the lookup, the retrieval and the cached entry, so a
+        # hot swap in between cannot file a result under the wrong version
+        snapshot = self.vector_store_loader.get_snapshot()
+        version = snapshot.version
+        with self.latency.time("result_cache", timings):
+            hit = self.result_cache.get(query_embeddings[0], version, cache_key)
+        if hit is not None:
+            result, similarity = hit
+            cached = dict(
+                result,
+                retrieved_chunks=list(result["retrieved_chunks"]),
+                question=question,
+                timings=timings,
+                cached=True,
+                cache_similarity=similarity,
             )
-        else:
-            retrieved_chunks = self.retriever.retrieve(question, top_k=top_k)
+            return cached, cached["retrieved_chunks"], None
+
+        retrieved_chunks = retriever.retrieve_many(
+            [question], top_k=top_k, filters=[filters], timings=timings,
+            min_similarity=min_similarity, query_embeddings=query_embeddings, snapshot=snapshot,
+        )[0]
+        return None, retrieved_chunks, (query_embeddings[0], version, cache_key)
+
+    def _cache_result(self, cache_entry: Optional[tuple], result: Dict[str, Any]):
+        """Keep a result in the result cache (see _retrieve)."""
+        # Placeholder answers (generator still loading) are not worth keeping
+        if cache_entry is not None and (result["generated"] or result["prompt"] is None):
+            vector, version, cache_key = cache_entry
+            self.result_cache.put(
+                vector, version, cache_key, dict(result, retrieved_chunks=list(result["retrieved_chunks"]))
+            )
+
+    def query_stream(
+        self,
+        question: str,
+        product_category: Optional[str] = None,
+        top_k: Optional[int] = None,
+        wait_for_generator: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+        min_similarity: Optional[float] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process a user question like query(), streaming the answer as it is generated.
+
+        The query runs on the query pool like query(); updates are handed over
+        as they are produced. Closing the iterator early stops the generation.
+
+        Args:
+            question: User's question
+            product_category: See query()
+            top_k: See query()
+            wait_for_generator: See query()
+            filters: See query()
+            min_similarity: See query()
+
+        Yields:
+            Result dictionaries in query() format whose answer holds the text
+            generated so far: the first as soon as the sources are retrieved
+            (answer "" while generation is pending), then one per new piece of
+            answer text. Each also holds:
+                - delta: Answer text added since the previous update
+                - done: True on the last update, which has the complete answer
+            timings additionally hold time_to_sources and time_to_first_token
+            (seconds since the query started).
+
+        Raises:
+            RuntimeError: If the query pool is full (see max_pending_queries)
+        """
+        args = (question, product_category, top_k, wait_for_generator, filters, min_similarity)
+        if self.query_executor.in_worker():
+            yield from self._query_stream(*args)
+            return
+
+        updates: "queue.Queue[Tuple[Optional[Dict[str, Any]], Optional[BaseException]]]" = queue.Queue()
+        abandoned = threading.Event()
+
+        def produce():
+            try:
+                for update in self._query_stream(*args):
+                    if abandoned.is_set():
+                        break
+                    updates.put((update, None))
+            except Exception as e:
+                updates.put((None, e))
+            else:
+                updates.put((None, None))
 
-        # Step 2: Build prompt
-        prompt = self.prompt_template.build_prompt_with_metadata(
-            question, retrieved_chunks
+        self.query_executor.submit(produce)
+        try:
+            while True:
+                update, error = updates.get()
+                if error is not None:
+                    raise error
+                if update is None:
+                    return
+                yield update
+        finally:
+            abandoned.set()
+
+    def _query_stream(
+        self,
+        question: str,
+        product_category: Optional[str],
+        top_k: Optional[int],
+        wait_for_generator: bool,
+        filters: Optional[Dict[str, Any]],
+        min_similarity: Optional[float],
+    ) -> Iterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        cached, retrieved_chunks, cache_entry = self._retrieve(
+            question, combine_filters(product_category, filters), top_k, min_similarity, timings
         )
+        if cached is not None:
+            self._record_since("time_to_sources", start, timings)
+            yield dict(cached, delta=cached["answer"], done=True)
+            return
 
-        # Step 3: Generate answer
-        answer = self.generator.generate(prompt)
+        result = self._prepare(question, retrieved_chunks, timings)
+        if result["prompt"] is not None and not (wait_for_generator or self.is_ready(*GENERATION_COMPONENTS)):
+            result["answer"] = GENERATOR_LOADING_MESSAGE
+        self._record_since("time_to_sources", start, timings)
+        if result["answer"] is not None:
+            # Nothing to generate
+            self._cache_result(cache_entry, result)
+            yield dict(result, delta=result["answer"], done=True)
+            return
 
-        return {
-            "answer": answer,
-            "retrieved_chunks": retrieved_chunks,
-            "prompt": prompt,
-            "question": question,
-        }
+        yield dict(result, answer="", delta="", done=False)
+        generator = self.generator
+        answer = ""
+        first_token = True
+        with self.latency.time("generation", timings):
+            for delta in generator.generate_stream(result["prompt"]):
+                if first_token:
+                    # Once, even if the first pieces are empty
+                    self._record_since("time_to_first_token", start, timings)
+                    first_token = False
+                answer += delta
+                yield dict(result, answer=answer, delta=delta, done=False)
+        if not answer.strip():
+            # Same fallback as Generator.generate for an empty answer
+            delta = generator._fallback_generate(result["prompt"])
+            answer += delta
+            yield dict(result, answer=answer, delta=delta, done=False)
+        result.update(answer=answer.strip(), generated=True)
+        self._cache_result(cache_entry, result)
+        yield dict(result, delta="", done=True)
+
+    def _record_since(self, stage: str, start: float, timings: Dict[str, float]):
+        """Record the seconds since start as a latency stage of this query."""
+        seconds = time.perf_counter() - start
+        self.latency.record(stage, seconds)
+        timings[stage] = seconds
+
+    def query_many(
+        self,
+        questions: Sequence[str],
+        product_categories: Optional[Sequence[Optional[str]]] = None,
+        top_k: Optional[int] = None,
+        wait_for_generator: bool = True,
+        filters: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        min_similarity: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Process many questions, retrieving for all of them in one batch.
+
+        Retrieval uses Retriever.retrieve_many (one embedding call and one index
+        search); answers are then generated generation_batch_size prompts at a
+        time with Generator.generate_many.
+
+        Args:
+            questions: User questions
+            product_categories: Optional per-question product category filters,
+                aligned with questions (None entries are unfiltered)
+            top_k: Optional override for number of chunks to retrieve
+            wait_for_generator: See query()
+            filters: Optional per-question filter expressions, aligned with questions
+            min_similarity: See query()
+
+        Returns:
+            One result dictionary per question, in input order (same format as query())
+
+        Raises:
+            RuntimeError: If the query pool is full (see max_pending_queries)
+        """
+        return self.query_executor.run(
+            self._query_many, list(questions), product_categories, top_k,
+            wait_for_generator, filters, min_similarity,
+        )
+
+    def _query_many(
+        self,
+        questions: List[str],
+        product_categories: Optional[Sequence[Optional[str]]],
+        top_k: Optional[int],
+        wait_for_generator: bool,
+        filters: Optional[Sequence[Optional[Dict[str, Any]]]],
+        min_similarity: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        categories = product_categories if product_categories is not None else [None] * len(questions)
+        expressions = filters if filters is not None else [None] * len(questions)
+        retrieval_timings: Dict[str, float] = {}
+        retrieved = self.retriever.retrieve_many(
+            questions,
+            top_k=top_k,
+            filters=[combine_filters(c, f) for c, f in zip(categories, expressions)],
+            timings=retrieval_timings,
+            min_similarity=min_similarity,
+        )
+
+        # Retrieval stages were shared by the whole batch
+        return self._answer_many(
+            questions, retrieved, wait_for_generator, [dict(retrieval_timings) for _ in questions]
+        )
+
+    def close(self):
+        """Stop watching for new builds and shut down the query pool."""
+        self.vector_store_loader.stop_watching()
+        self.query_executor.shutdown(wait=False)
 
     def get_pipeline_info(self) -> Dict[str, Any]:
         """Get information about the pipeline configuration."""
         summary = self.vector_store_loader.get_summary()
+        components = {}
+        for name, future in self._components.items():
+            error = future.exception() if future.done() else None
+            components[name] = {
+                "ready": future.done() and error is None,
+                "load_seconds": self.component_load_seconds.get(name),
+                "error": str(error) if error else None,
+            }
         return {
             "vector_store": summary,
-            "retriever_top_k": self.retriever.top_k,
-            "generator_model": self.generator.model_name,
+            "retriever_top_k": self.top_k,
+            "generator_model": self.generator_model,
             "total_chunks": len(self.vector_store_loader.chunks),
+            "store_version": summary.get("store_version"),
+            "components": components,
+            "query_cache": self._retriever.get_cache_stats() if self._retriever else None,
+            "result_cache": self.result_cache.get_stats() if self.result_cache else None,
+            "retrieval_mode": self.retrieval_mode,
+            "collapse_by_complaint": self.collapse_by_complaint or self.merge_siblings,
+            "merge_siblings": self.merge_siblings,
+            "mmr_lambda": self.mmr_lambda,
+            "min_similarity": self.min_similarity,
+            "expand_neighbors": self.expand_neighbors,
+            "generation_batch_size": self.generation_batch_size,
+            "embedding_backend": summary.get("embedding_backend"),
+            "query_pool": self.query_executor.get_stats(),
+            "latency": self.latency.get_stats(),
         }
@@ -0,0 +1,156 @@
+"""
+Result Cache Module
+
+Semantic cache of complete pipeline results (answer, sources, prompt), so
+rephrasings of an earlier question ("credit card fraud complaints?" /
+"complaints about fraudulent credit card charges") skip retrieval and
+generation.
+
+Entries are looked up by query embedding: a cached result is reused when
+the new query's normalized vector is within max_distance cosine distance
+(1 - cosine similarity) of the cached query's vector, and it was computed
+with the same retrieval settings (filters, top_k, minimum similarity) on
+the same store version. Entries of older store versions are dropped as soon
+as a newer version is seen.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_RESULT_CACHE_SIZE = 256
+# Cosine distance within which two questions count as the same question
+DEFAULT_MAX_DISTANCE = 0.08
+
+
+class SemanticResultCache:
+    """Thread-safe, size-bounded LRU cache of results keyed by query embedding."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_RESULT_CACHE_SIZE,
+        max_distance: float = DEFAULT_MAX_DISTANCE,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of cached results (least recently used are evicted)
+            max_distance: Maximum cosine distance between a query and a cached
+                query for the cached result to be reused (0 = identical embeddings only)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if not 0.0 <= max_distance < 1.0:
+            raise ValueError(f"max_distance must be within [0, 1), got {max_distance}")
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        # entry id -> (partition key, vector, result), in LRU order
+        self._entries: "OrderedDict[int, Tuple[Hashable, np.ndarray, Dict[str, Any]]]" = OrderedDict()
+        self._partitions: Dict[Hashable, List[int]] = {}
+        # Stacked vectors per partition, rebuilt after the partition changes
+        self._matrices: Dict[Hashable, Tuple[List[int], np.ndarray]] = {}
+        self._version: Optional[str] = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, vector: np.ndarray, version: str, key: Hashable
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find the cached result of the nearest cached query.
+
+        Args:
+            vector: L2-normalized query embedding
+            version: Store version the result must have been computed on
+            key: Hashable retrieval settings (filters, top_k, ...) that must match
+
+        Returns:
+            (result, cosine similarity of the cached query), or None on a miss
+        """
+        with self._lock:
+            self._set_version(version)
+            ids, matrix = self._partition_matrix(key)
+            if ids:
+                similarities = matrix @ vector
+                best = int(np.argmax(similarities))
+                similarity = float(similarities[best])
+                if similarity >= 1.0 - self.max_distance:
+                    entry_id = ids[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return self._entries[entry_id][2], similarity
+            self.misses += 1
+            return None
+
+    def put(self, vector: np.ndarray, version: str, key: Hashable, result: Dict[str, Any]):
+        """Cache a result computed for vector on the given store version."""
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        with self._lock:
+            if self._version is None:
+                self._version = version
+            elif version != self._version:
+                # Computed on a store version that has since been replaced
+                return
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (key, vector, result)
+            self._partitions.setdefault(key, []).append(entry_id)
+            self._matrices.pop(key, None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _set_version(self, version: str):
+        """Drop every entry when a newer store version shows up."""
+        if version == self._version:
+            return
+        if self._version is not None and self._entries:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._partitions.clear()
+            self._matrices.clear()
+        self._version = version
+
+    def _partition_matrix(self, key: Hashable) -> Tuple[List[int], np.ndarray]:
+        if key not in self._matrices:
+            ids = list(self._partitions.get(key, ()))
+            vectors = [self._entries[entry_id][1] for entry_id in ids]
+            self._matrices[key] = (ids, np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32))
+        return self._matrices[key]
+
+    def _remove(self, entry_id: int):
+        key = self._entries.pop(entry_id)[0]
+        ids = self._partitions[key]
+        ids.remove(entry_id)
+        if not ids:
+            del self._partitions[key]
+        self._matrices.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+            self._matrices.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_distance": self.max_distance,
+        }
@@ -0,0 +1,96 @@
+"""
+Retrieved Chunk Module
+
+Compact result object for one retrieval hit. It stores the row id, score
+and rank, and decodes the chunk text and metadata from the snapshot's chunk
+store only when they are read. It is also a Mapping with the keys of the
+former result dicts, so ``hit["chunk"]``, ``hit["metadata"]`` and
+``hit.get("similarity_score")`` keep working. Fields can be assigned
+(``hit["context_before"] = ...``) while the retriever post-processes fresh
+hits (sibling merging, neighbour expansion); callers should treat returned
+hits as read-only, since cached results share them.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+# Keys every hit has; mode-specific fields (fusion_score, best_chunk, ...) follow them
+BASE_KEYS = ("chunk", "metadata", "similarity_score", "rank")
+
+
+class RetrievedChunk(Mapping):
+    """One retrieval hit, resolved lazily against the chunk store it came from."""
+
+    __slots__ = ("row", "similarity_score", "rank", "_store", "_text", "_metadata", "_extra")
+
+    def __init__(
+        self,
+        store: Any,
+        row: int,
+        similarity_score: float,
+        rank: int,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            store: ChunkStore (or ConcatChunkStore) of the snapshot that was searched.
+                The hit keeps it alive, so text stays consistent across hot reloads.
+            row: Global row id of the chunk
+            similarity_score: Cosine similarity to the query
+            rank: Rank (1-indexed)
+            extra: Optional additional fields (hybrid fusion fields, merge fields)
+        """
+        self._store = store
+        self.row = row
+        self.similarity_score = similarity_score
+        self.rank = rank
+        self._text: Optional[str] = None
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._extra = extra
+
+    @property
+    def chunk(self) -> str:
+        if self._text is None:
+            self._text = self._store.get_text(self.row)
+        return self._text
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = self._store.get_metadata(self.row)
+        return self._metadata
+
+    def __getitem__(self, key: str) -> Any:
+        if key in BASE_KEYS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        """Set a field (used by the retriever, e.g. to replace the chunk text with merged sibling text)."""
+        if key == "chunk":
+            self._text = value
+        elif key == "metadata":
+            self._metadata = value
+        elif key in BASE_KEYS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from BASE_KEYS
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(BASE_KEYS) + (len(self._extra) if self._extra is not None else 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of all fields (decodes text and metadata)."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"RetrievedChunk(row={self.row}, rank={self.rank}, similarity_score={self.similarity_score:.4f})"
@@ -4,81 +4,240 @@ Retriever Module
 Implements semantic retrieval of complaint chunks using the vector store.
 """
 
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Sequence
 import numpy as np
 from sklearn.preprocessing import normalize
 from sentence_transformers import SentenceTransformer
 
-from .vector_store_loader import VectorStoreLoader
+from .diversity import DEFAULT_MMR_CANDIDATES, mmr_select
+from .filtered_search import RowFilter, search_filtered
+from .index_types import make_search_params
+from .latency import LatencyStats
+from .prompt_template import PromptTemplate
+from .query_cache import DEFAULT_QUERY_CACHE_SIZE, QueryEmbeddingCache
+from .retrieved_chunk import RetrievedChunk
+from .vector_store_loader import StoreSnapshot, VectorStoreLoader
+
+# "dense": FAISS only; "hybrid": FAISS + BM25, fused with reciprocal rank fusion
+RETRIEVAL_MODES = ("dense", "hybrid")
+# Reciprocal rank fusion constant: score = sum over rankings of 1 / (RRF_K + rank)
+RRF_K = 60
+# Candidates taken from each ranking before fusion
+DEFAULT_HYBRID_CANDIDATES = 50
+# Collapsing by complaint first fetches this many candidates per result, and
+# doubles the fetch for queries that still have fewer than top_k complaints
+COLLAPSE_OVERFETCH = 4
+# Most sibling chunks merged into one evidence record (nearest to the best chunk)
+MAX_MERGED_CHUNKS = 8
 
 
 class Retriever:
     """Retrieves semantically relevant complaint chunks for user queries."""
     
-    def __init__(self, vector_store_loader: VectorStoreLoader, top_k: int = 5):
+    def __init__(
+        self,
+        vector_store_loader: VectorStoreLoader,
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        query_cache_ttl: Optional[float] = None,
+        retrieval_mode: str = "dense",
+        hybrid_candidates: int = DEFAULT_HYBRID_CANDIDATES,
+        latency: Optional[LatencyStats] = None,
+        collapse_by_complaint: bool = False,
+        merge_siblings: bool = False,
+        mmr_lambda: Optional[float] = None,
+        mmr_candidates: int = DEFAULT_MMR_CANDIDATES,
+        min_similarity: Optional[float] = None,
+        expand_neighbors: int = 0,
+    ):
         """
         Initialize the retriever.
         
         Args:
             vector_store_loader: Loaded VectorStoreLoader instance
             top_k: Number of top chunks to retrieve (default: 5)
+            nprobe: IVF clusters to search per query (IVF indexes only;
+                default: the value stored in the index)
+            ef_search: HNSW search depth per query (HNSW indexes only;
+                default: the value stored in the index)
+            query_cache_size: Normalized query vectors kept in the LRU query
+                cache (0 disables the cache)
+            query_cache_ttl: Seconds a cached query vector stays valid (None = no expiry)
+            retrieval_mode: Default mode, one of RETRIEVAL_MODES
+            hybrid_candidates: Candidates taken from the dense and the lexical
+                ranking before fusion (hybrid mode)
+            latency: Per-stage latency recorder (a new one by default)
+            collapse_by_complaint: Return at most one chunk (the best) per complaint_id
+            merge_siblings: Collapse by complaint and merge each complaint's sibling
+                chunks into one evidence record
+            mmr_lambda: If set, rerank for diversity with maximal marginal relevance
+                (1.0 = relevance only, lower values penalize near-duplicates more)
+            mmr_candidates: Best candidates the MMR reranker picks top_k from
+            min_similarity: If set, never return chunks whose cosine similarity
+                to the query is below this value (fewer than top_k results, or
+                none, when not enough chunks qualify)
+            expand_neighbors: Attach this many neighbouring chunks of the same
+                complaint on each side of every result (context_before /
+                context_after), so the prompt sees the text around a match
         """
         if not vector_store_loader.is_loaded():
             raise ValueError("Vector store must be loaded before initializing Retriever")
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"retrieval_mode must be one of {RETRIEVAL_MODES}, got {retrieval_mode!r}")
         
         self.vector_store = vector_store_loader
-        self.index = vector_store_loader.index
-        self.chunks = vector_store_loader.chunks
-        self.metadata = vector_store_loader.metadata
         self.embedding_model = vector_store_loader.embedding_model
+        # Fast tokenizers are not thread-safe; concurrent queries take turns encoding
+        self._encode_lock = threading.Lock()
         self.top_k = top_k
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.query_cache: Optional[QueryEmbeddingCache] = None
+        if query_cache_size:
+            self.query_cache = QueryEmbeddingCache(query_cache_size, query_cache_ttl)
+        self.retrieval_mode = retrieval_mode
+        self.hybrid_candidates = hybrid_candidates
+        self.latency = latency or LatencyStats()
+        self.collapse_by_complaint = collapse_by_complaint
+        self.merge_siblings = merge_siblings
+        self.mmr_lambda = mmr_lambda
+        self.mmr_candidates = mmr_candidates
+        self.min_similarity = min_similarity
+        self.expand_neighbors = expand_neighbors
+
+    # The index and chunk rows always come from the loader's current snapshot.
+    # Methods that use more than one of them must take the snapshot once
+    # (self.vector_store.get_snapshot()) so a hot reload cannot mix builds.
+    @property
+    def index(self):
+        return self.vector_store.get_snapshot().index
+
+    @property
+    def chunks(self):
+        return self.vector_store.get_snapshot().chunks
+
+    @property
+    def metadata(self):
+        return self.vector_store.get_snapshot().metadata
+
+    def encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        L2-normalized float32 embeddings of queries, in one model call.
+
+        Queries found in the query cache skip the model; repeated queries
+        within the call are embedded once.
+        """
+        queries = list(queries)
+        if self.query_cache is None:
+            embeddings = self._encode(queries)
+            return normalize(embeddings, norm='l2', axis=1).astype('float32')
+
+        model_name = self.vector_store.model_name
+        backend = getattr(self.vector_store, "active_embedding_backend", None)
+        keys = [self.query_cache.make_key(model_name, query, backend) for query in queries]
+        vectors: List[Optional[np.ndarray]] = [self.query_cache.get(key) for key in keys]
+        missing: Dict[Any, str] = {}
+        for key, query, vector in zip(keys, queries, vectors):
+            if vector is None:
+                missing.setdefault(key, query)
+        if missing:
+            embeddings = self._encode(list(missing.values()))
+            embeddings = normalize(embeddings, norm='l2', axis=1).astype('float32')
+            embedded = dict(zip(missing, embeddings))
+            for key, vector in embedded.items():
+                self.query_cache.put(key, vector)
+            vectors = [embedded[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        return np.vstack(vectors).astype('float32', copy=False)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        with self._encode_lock:
+            return self.embedding_model.encode(texts, convert_to_numpy=True)
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Query cache counters (None if the cache is disabled)."""
+        return self.query_cache.get_stats() if self.query_cache is not None else None
+
+    def _search(
+        self,
+        snapshot: StoreSnapshot,
+        query_vectors: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ):
+        """Search the snapshot's index with the per-query ANN knobs of its index type."""
+        params = make_search_params(
+            snapshot.index_type,
+            nprobe=nprobe if nprobe is not None else self.nprobe,
+            ef_search=ef_search if ef_search is not None else self.ef_search,
+        )
+        if params is None:
+            return snapshot.index.search(query_vectors, k)
+        return snapshot.index.search(query_vectors, k, params=params)
     
-    def retrieve(self, query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    def retrieve(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        collapse_by_complaint: Optional[bool] = None,
+        merge_siblings: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        min_similarity: Optional[float] = None,
+        expand_neighbors: Optional[int] = None,
+    ) -> List[RetrievedChunk]:
         """
         Retrieve top-k most relevant chunks for a query.
         
         Args:
             query: User question/query string
             top_k: Number of chunks to retrieve (overrides default if provided)
+            nprobe: Override the retriever's IVF nprobe for this query
+            ef_search: Override the retriever's HNSW efSearch for this query
+            filters: Optional filter expression (see secondary_index), e.g.
+                {"date_received": {"from": "2023-10-01", "to": "2023-12-31"}}
+            mode: Override the retriever's retrieval mode ("dense" or "hybrid")
+            collapse_by_complaint: Override the retriever's collapse_by_complaint
+            merge_siblings: Override the retriever's merge_siblings
+            mmr_lambda: Override the retriever's MMR lambda
+            min_similarity: Override the retriever's minimum similarity
+            expand_neighbors: Override the retriever's neighbour expansion
         
         Returns:
-            List of dictionaries containing:
+            List of RetrievedChunk hits (read-only mappings, decoded from the
+            store on access; row holds the chunk's row id) with keys:
                 - chunk: The text chunk
                 - metadata: Associated metadata (complaint_id, product_category, etc.)
                 - similarity_score: Cosine similarity score
                 - rank: Rank (1-indexed)
+            Hybrid results also carry fusion_score, dense_rank, lexical_rank and
+            lexical_score (ranks/score are None when a ranking missed the chunk).
+            Merged results also carry best_chunk (the matching chunk) and
+            num_chunks (chunks merged into chunk). Expanded results also carry
+            context_before and context_after: texts of the neighbouring chunks
+            of the same complaint, in narrative order (see
+            PromptTemplate.merge_overlapping).
         """
-        if top_k is None:
-            top_k = self.top_k
-        
-        # Embed the query
-        query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
-        
-        # Normalize for cosine similarity (FAISS IndexFlatIP with normalized vectors)
-        query_embedding_normalized = normalize(query_embedding, norm='l2', axis=1).astype('float32')
-        
-        # Search the index
-        distances, indices = self.index.search(query_embedding_normalized, top_k)
-        
-        # Build results
-        results = []
-        for rank, (distance, idx) in enumerate(zip(distances[0], indices[0]), 1):
-            if idx < len(self.chunks) and idx < len(self.metadata):
-                results.append({
-                    'chunk': self.chunks[idx],
-                    'metadata': self.metadata[idx],
-                    'similarity_score': float(distance),
-                    'rank': rank
-                })
-        
-        return results
+        return self.retrieve_many(
+            [query], top_k=top_k, filters=[filters], nprobe=nprobe, ef_search=ef_search, mode=mode,
+            collapse_by_complaint=collapse_by_complaint, merge_siblings=merge_siblings,
+            mmr_lambda=mmr_lambda, min_similarity=min_similarity, expand_neighbors=expand_neighbors,
+        )[0]
     
     def retrieve_with_filter(
         self, 
         query: str, 
         product_category: Optional[str] = None,
-        top_k: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+        top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[RetrievedChunk]:
         """
         Retrieve chunks with optional product category filter.
         
@@ -86,38 +245,409 @@ class Retriever:
             query: User question/query string
             product_category: Filter by product category (Credit Cards, Personal Loans, etc.)
             top_k: Number of chunks to retrieve (overrides default if provided)
+            nprobe: Override the retriever's IVF nprobe for this query
+            ef_search: Override the retriever's HNSW efSearch for this query
         
         Returns:
             List of retrieved chunks (same format as retrieve())
         """
-        # Retrieve more candidates if filtering
-        retrieve_k = (top_k or self.top_k) * 3 if product_category else (top_k or self.top_k)
+        filters = {"product_category": product_category} if product_category else None
+        return self.retrieve(query, top_k=top_k, nprobe=nprobe, ef_search=ef_search, filters=filters)
+
+    def retrieve_many(
+        self,
+        queries: Sequence[str],
+        top_k: Optional[int] = None,
+        filters: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        mode: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        collapse_by_complaint: Optional[bool] = None,
+        merge_siblings: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        min_similarity: Optional[float] = None,
+        query_embeddings: Optional[np.ndarray] = None,
+        expand_neighbors: Optional[int] = None,
+        snapshot: Optional[StoreSnapshot] = None,
+    ) -> List[List[RetrievedChunk]]:
+        """
+        Retrieve top-k chunks for many queries with one encode and batched index searches.
+
+        Filtered queries are pre-filtered: the search only considers rows
+        matching the filter, so they return exactly top_k results whenever
+        the filter matches at least top_k chunks.
         
-        # Embed and search
-        query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
-        query_embedding_normalized = normalize(query_embedding, norm='l2', axis=1).astype('float32')
-        distances, indices = self.index.search(query_embedding_normalized, retrieve_k)
+        Args:
+            queries: Query strings
+            top_k: Number of chunks to retrieve per query (overrides default if provided)
+            filters: Optional per-query filter expressions, aligned with queries.
+                Each is None (no filter) or a dict of field -> value, list of
+                accepted values, or {"from": .., "to": ..} range, e.g.
+                {"product_category": ["Credit Cards"], "date_received": {"from": "2023-10-01"}}.
+                Filters are resolved to row ids through the snapshot's secondary
+                indexes and pushed into the FAISS search.
+            nprobe: Override the retriever's IVF nprobe for these queries
+            ef_search: Override the retriever's HNSW efSearch for these queries
+            mode: Override the retriever's retrieval mode ("dense" or "hybrid")
+            timings: Optional dict that receives the seconds spent per stage
+                (embed, dense_search, lexical_search, fusion, mmr)
+            collapse_by_complaint: Return the top_k best complaints rather than
+                chunks: one result (the best chunk) per complaint_id. Candidates
+                are over-fetched and grouped through the snapshot's precomputed
+                row -> complaint array.
+            merge_siblings: Collapse by complaint and replace each result's chunk
+                with the complaint's chunks (up to MAX_MERGED_CHUNKS around the
+                best one) in narrative order
+            mmr_lambda: Rerank the best mmr_candidates (after fusion and collapsing)
+                with maximal marginal relevance, using their vectors reconstructed
+                from the index; None uses the retriever's setting
+            min_similarity: Drop candidates below this cosine similarity as soon
+                as they are searched, before collapsing, fusion, MMR and deeper
+                re-searches (FAISS returns candidates best-first, so a top-k
+                search whose last hit is below the threshold has found every
+                qualifying chunk); None uses the retriever's setting
+            query_embeddings: Optional (n, d) normalized embeddings of queries
+                (from encode_queries), so callers that already embedded them
+                skip the embedding model
+            expand_neighbors: Attach up to this many previous / next chunks of
+                each result's complaint (context_before / context_after). The
+                neighbours are found through the snapshot's precomputed row ->
+                complaint array, one lookup per chunk. Merged results already
+                hold their complaint's chunks and are not expanded. None uses
+                the retriever's setting
+            snapshot: Store snapshot to search (defaults to the loader's current
+                one), so a caller that already took a snapshot keeps all of
+                its work on the same build
         
-        # Filter by product category if specified
-        results = []
-        for rank, (distance, idx) in enumerate(zip(distances[0], indices[0]), 1):
-            if idx < len(self.chunks) and idx < len(self.metadata):
-                metadata = self.metadata[idx]
-                
-                # Apply filter
-                if product_category and metadata.get('product_category') != product_category:
-                    continue
-                
-                results.append({
-                    'chunk': self.chunks[idx],
-                    'metadata': metadata,
-                    'similarity_score': float(distance),
-                    'rank': rank
-                })
-                
-                # Stop when we have enough results
-                if len(results) >= (top_k or self.top_k):
-                    break
+        Returns:
+            One result list per query, in input order (same format as retrieve())
+        """
+        queries = list(queries)
+        if top_k is None:
+            top_k = self.top_k
+        mode = mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"mode must be one of {RETRIEVAL_MODES}, got {mode!r}")
+        if merge_siblings is None:
+            merge_siblings = self.merge_siblings
+        if collapse_by_complaint is None:
+            collapse_by_complaint = self.collapse_by_complaint
+        collapse_by_complaint = collapse_by_complaint or merge_siblings
+        if mmr_lambda is None:
+            mmr_lambda = self.mmr_lambda
+        if min_similarity is None:
+            min_similarity = self.min_similarity
+        if expand_neighbors is None:
+            expand_neighbors = self.expand_neighbors
+        if filters is None:
+            filters = [None] * len(queries)
+        elif len(filters) != len(queries):
+            raise ValueError(f"Got {len(filters)} filters for {len(queries)} queries")
+        if not queries:
+            return []
+        if snapshot is None:
+            snapshot = self.vector_store.get_snapshot()
+        # Results kept after fusion / collapsing: the MMR pool, or just top_k
+        pool = top_k if mmr_lambda is None else max(top_k, self.mmr_candidates)
+        # Hybrid fusion takes a deeper candidate list from each ranking
+        candidate_k = max(pool, self.hybrid_candidates) if mode == "hybrid" else pool
+        row_groups = None
+        if collapse_by_complaint:
+            row_groups = snapshot.secondary_indexes.complaint_ranges.row_groups
+            candidate_k = min(candidate_k * COLLAPSE_OVERFETCH, max(snapshot.index.ntotal, 1))
+        
+        # Embed all (uncached) queries in one batch, normalized for cosine similarity
+        if query_embeddings is None:
+            with self.latency.time("embed", timings):
+                query_embeddings = self.encode_queries(queries)
+        
+        row_filters = [snapshot.row_filter(f) if f else None for f in filters]
+        with self.latency.time("dense_search", timings):
+            dense = self._dense_search(
+                snapshot, query_embeddings, row_filters, range(len(queries)), candidate_k,
+                nprobe, ef_search, min_similarity,
+            )
+            if mode == "dense" and row_groups is not None:
+                # Re-search, with twice the depth, queries whose candidates held
+                # fewer complaints than the pool while more rows were left
+                k = candidate_k
+                pending = [
+                    row for row in range(len(queries))
+                    if self._short_of_complaints(row_groups, dense[row][1], k, pool)
+                ]
+                while pending and k < snapshot.index.ntotal:
+                    k = min(k * 2, snapshot.index.ntotal)
+                    dense.update(self._dense_search(
+                        snapshot, query_embeddings, row_filters, pending, k,
+                        nprobe, ef_search, min_similarity,
+                    ))
+                    pending = [
+                        row for row in pending
+                        if self._short_of_complaints(row_groups, dense[row][1], k, pool)
+                    ]
+        
+        if mode == "dense":
+            ranked = []
+            for row in range(len(queries)):
+                distances, indices = dense[row]
+                if row_groups is not None:
+                    keep = self._collapse(row_groups, indices, pool)
+                else:
+                    keep = np.flatnonzero(indices >= 0)[:pool]
+                ranked.append(keep)
+            if mmr_lambda is not None:
+                with self.latency.time("mmr", timings):
+                    ranked = [
+                        keep[self._mmr(snapshot, query_embeddings[row], dense[row][1][keep], top_k, mmr_lambda)]
+                        for row, keep in enumerate(ranked)
+                    ]
+            results = [
+                self._collect(snapshot, dense[row][0][keep], dense[row][1][keep], merge_siblings)
+                for row, keep in enumerate(ranked)
+            ]
+            return self._expand(snapshot, results, expand_neighbors, merge_siblings, timings)
+        
+        with self.latency.time("lexical_search", timings):
+            lexical = [
+                snapshot.lexical_index.search(
+                    query,
+                    candidate_k,
+                    allowed_rows=row_filter.rows if row_filter is not None else None,
+                    removed_rows=snapshot.removed_rows,
+                )
+                for query, row_filter in zip(queries, row_filters)
+            ]
+        with self.latency.time("fusion", timings):
+            fused = [
+                self._fuse(
+                    snapshot, query_embeddings[row], dense[row], lexical[row], pool,
+                    row_groups, min_similarity,
+                )
+                for row in range(len(queries))
+            ]
+        if mmr_lambda is not None:
+            with self.latency.time("mmr", timings):
+                fused = [
+                    [best[position] for position in self._mmr(
+                        snapshot, query_embeddings[row], [idx for idx, _ in best], top_k, mmr_lambda
+                    )]
+                    for row, best in enumerate(fused)
+                ]
+        results = [
+            self._collect_fused(snapshot, best, merge_siblings)
+            for row, best in enumerate(fused)
+        ]
+        return self._expand(snapshot, results, expand_neighbors, merge_siblings, timings)
+
+    def _expand(
+        self,
+        snapshot: StoreSnapshot,
+        results: List[List[RetrievedChunk]],
+        window: int,
+        merge_siblings: bool,
+        timings: Optional[Dict[str, float]],
+    ) -> List[List[RetrievedChunk]]:
+        """Attach up to window neighbouring chunks on each side of every result."""
+        hits = [hit for query_results in results for hit in query_results]
+        if window <= 0 or merge_siblings or not hits:
+            return results
+        with self.latency.time("expand", timings):
+            complaints = snapshot.secondary_indexes.complaint_ranges
+            rows = np.fromiter((hit.row for hit in hits), dtype=np.int64, count=len(hits))
+            before: List[List[int]] = [[] for _ in hits]
+            after: List[List[int]] = [[] for _ in hits]
+            for neighbours, step in ((before, -1), (after, 1)):
+                current = rows
+                for _ in range(window):
+                    current = complaints.neighbour_rows(current, step)
+                    if len(snapshot.removed_rows):
+                        # A deleted chunk ends the expansion on that side
+                        current = np.where(np.isin(current, snapshot.removed_rows), -1, current)
+                    for position in np.flatnonzero(current >= 0).tolist():
+                        neighbours[position].append(int(current[position]))
+            for hit, previous, following in zip(hits, before, after):
+                hit["context_before"] = [snapshot.chunks[row] for row in reversed(previous)]
+                hit["context_after"] = [snapshot.chunks[row] for row in following]
+        return results
+
+    def _dense_search(
+        self,
+        snapshot: StoreSnapshot,
+        query_embeddings: np.ndarray,
+        row_filters: Sequence[Optional[RowFilter]],
+        rows: Sequence[int],
+        k: int,
+        nprobe: Optional[int],
+        ef_search: Optional[int],
+        min_similarity: Optional[float] = None,
+    ) -> Dict[int, Any]:
+        """
+        FAISS top-k of the given queries, as {query row: (distances, indices)}.
+
+        Hits below min_similarity get index -1, like FAISS padding.
+        """
+        # Queries sharing a filter (or no filter) are searched as one matrix;
+        # filtered groups search only the rows their filter allows
+        # (row filters are cached per snapshot, so equal filters share one object)
+        groups: Dict[Optional[RowFilter], List[int]] = {}
+        for row in rows:
+            groups.setdefault(row_filters[row], []).append(row)
+        found = {}
+        for row_filter, group in groups.items():
+            if row_filter is None:
+                distances, indices = self._search(
+                    snapshot, query_embeddings[group], k, nprobe, ef_search
+                )
+            else:
+                distances, indices = search_filtered(
+                    snapshot.index,
+                    query_embeddings[group],
+                    k,
+                    row_filter,
+                    nprobe=nprobe if nprobe is not None else self.nprobe,
+                    ef_search=ef_search if ef_search is not None else self.ef_search,
+                )
+            if min_similarity is not None:
+                indices = np.where(distances >= min_similarity, indices, -1)
+            for i, row in enumerate(group):
+                found[row] = (distances[i], indices[i])
+        return found
+
+    @staticmethod
+    def _collapse(row_groups: np.ndarray, indices: np.ndarray, limit: int) -> np.ndarray:
+        """Positions of the best (first) hit of each complaint in a ranked row array."""
+        positions = np.flatnonzero((indices >= 0) & (indices < len(row_groups)))
+        _, first = np.unique(row_groups[indices[positions]], return_index=True)
+        return positions[np.sort(first)][:limit]
+
+    @classmethod
+    def _short_of_complaints(cls, row_groups: np.ndarray, indices: np.ndarray, k: int, top_k: int) -> bool:
+        """True if a full k-deep search found fewer than top_k distinct complaints."""
+        # A search that returned fewer than k rows has exhausted its filter
+        return int((indices >= 0).sum()) == k and len(cls._collapse(row_groups, indices, top_k)) < top_k
+
+    @staticmethod
+    def _merge_siblings(snapshot: StoreSnapshot, row: int, result: RetrievedChunk) -> RetrievedChunk:
+        """Replace a result's chunk by its complaint's live chunks, in row (narrative) order."""
+        complaints = snapshot.secondary_indexes.complaint_ranges
+        siblings = complaints.group_rows(int(complaints.row_groups[row]))
+        if len(snapshot.removed_rows):
+            siblings = siblings[~np.isin(siblings, snapshot.removed_rows)]
+        if len(siblings) > MAX_MERGED_CHUNKS:
+            # Window of siblings around the best chunk
+            center = int(np.searchsorted(siblings, row))
+            start = min(max(center - MAX_MERGED_CHUNKS // 2, 0), len(siblings) - MAX_MERGED_CHUNKS)
+            siblings = siblings[start:start + MAX_MERGED_CHUNKS]
+        result['best_chunk'] = result['chunk']
+        result['chunk'] = PromptTemplate.merge_overlapping([snapshot.chunks[int(sibling)] for sibling in siblings])
+        result['num_chunks'] = len(siblings)
+        return result
+
+    @staticmethod
+    def _mmr(
+        snapshot: StoreSnapshot,
+        query_embedding: np.ndarray,
+        rows: Sequence[int],
+        top_k: int,
+        mmr_lambda: float,
+    ) -> np.ndarray:
+        """Positions (into rows, best-first candidates) of the MMR picks, in pick order."""
+        if len(rows) <= 1:
+            return np.arange(min(len(rows), top_k))
+        vectors = snapshot.index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+        return mmr_select(query_embedding, vectors, top_k, mmr_lambda)
+
+    @staticmethod
+    def _fuse(
+        snapshot: StoreSnapshot,
+        query_embedding: np.ndarray,
+        dense: Any,
+        lexical: Any,
+        limit: int,
+        row_groups: Optional[np.ndarray] = None,
+        min_similarity: Optional[float] = None,
+    ) -> List[Any]:
+        """
+        Reciprocal rank fusion of one query's dense and lexical rankings.
+
+        With row_groups, only the best-fused chunk of each complaint is kept;
+        with min_similarity, chunks below it are dropped (lexical-only hits are
+        scored against the query from their stored vectors).
+
+        Returns:
+            Up to limit (row, fusion fields) pairs, best first
+        """
+        fused: Dict[int, Dict[str, Any]] = {}
+        distances, indices = dense
+        dense_rank = 0
+        for distance, idx in zip(distances, indices):
+            if idx >= 0:
+                dense_rank += 1
+                fused[int(idx)] = {
+                    "fusion_score": 1.0 / (RRF_K + dense_rank),
+                    "dense_rank": dense_rank,
+                    "similarity_score": float(distance),
+                    "lexical_rank": None,
+                    "lexical_score": None,
+                }
+        for lexical_rank, (score, idx) in enumerate(zip(*lexical), 1):
+            entry = fused.setdefault(int(idx), {
+                "fusion_score": 0.0, "dense_rank": None, "similarity_score": None,
+            })
+            entry["fusion_score"] += 1.0 / (RRF_K + lexical_rank)
+            entry["lexical_rank"] = lexical_rank
+            entry["lexical_score"] = float(score)
+
+        lexical_only = [idx for idx, entry in fused.items() if entry["similarity_score"] is None]
+        if lexical_only:
+            # Found only lexically: score the stored vectors against the query
+            vectors = snapshot.index.reconstruct_batch(np.asarray(lexical_only, dtype=np.int64))
+            for idx, similarity in zip(lexical_only, vectors @ query_embedding):
+                fused[idx]["similarity_score"] = float(similarity)
+        if min_similarity is not None:
+            fused = {idx: entry for idx, entry in fused.items() if entry["similarity_score"] >= min_similarity}
         
+        best = sorted(fused.items(), key=lambda item: (-item[1]["fusion_score"], item[0]))
+        if row_groups is not None:
+            keep = Retriever._collapse(row_groups, np.asarray([idx for idx, _ in best], dtype=np.int64), limit)
+            best = [best[position] for position in keep]
+        return best[:limit]
+
+    @staticmethod
+    def _collect_fused(
+        snapshot: StoreSnapshot,
+        best: Sequence[Any],
+        merge_siblings: bool = False,
+    ) -> List[RetrievedChunk]:
+        """Turn fused (row, fusion fields) pairs into results."""
+        results = []
+        for rank, (idx, entry) in enumerate(best, 1):
+            similarity = entry.pop("similarity_score")
+            result = RetrievedChunk(snapshot.chunk_store, idx, similarity, rank, extra=entry)
+            if merge_siblings:
+                Retriever._merge_siblings(snapshot, idx, result)
+            results.append(result)
         return results
 
+    @classmethod
+    def _collect(
+        cls,
+        snapshot: StoreSnapshot,
+        distances: np.ndarray,
+        indices: np.ndarray,
+        merge_siblings: bool = False,
+    ) -> List[RetrievedChunk]:
+        """Turn one row of search output into results (text and metadata decoded on access)."""
+        results = []
+        num_rows = snapshot.chunk_store.num_rows
+        for rank, (distance, idx) in enumerate(zip(distances.tolist(), indices.tolist()), 1):
+            # FAISS pads with -1 when the index holds fewer than k vectors
+            if not 0 <= idx < num_rows:
+                continue
+            result = RetrievedChunk(snapshot.chunk_store, idx, distance, rank)
+            if merge_siblings:
+                cls._merge_siblings(snapshot, idx, result)
+            results.append(result)
+        
+        return results
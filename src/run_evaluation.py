@@ -25,8 +25,11 @@ def main():
     vector_store_dir = Path(__file__).parent.parent / "vector_store"
     index_path = vector_store_dir / "complaint_embeddings.index"
     metadata_path = vector_store_dir / "chunk_metadata.pkl"
+    chunk_store_path = vector_store_dir / "chunk_store" / "store.json"
 
-    if not index_path.exists() or not metadata_path.exists():
+    if not index_path.exists() or not (
+        metadata_path.exists() or chunk_store_path.exists()
+    ):
         print("[WARNING] Vector store not found. Cannot run evaluation.")
         print("\n" + "=" * 80)
         print("PREREQUISITE: Task 2 Must Be Completed First")
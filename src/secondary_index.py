@@ -0,0 +1,304 @@
+"""
+Secondary Index Module
+
+Lookup structures over a snapshot's metadata columns, built once when the
+snapshot is opened, that turn a metadata filter into the set of matching
+row ids without decoding any metadata row:
+
+    sorted columns   date_received (and, on demand, other date / numeric
+                     columns): values sorted once, ranges answered with
+                     np.searchsorted
+    bitmaps          one packed bitmap per label of product_category,
+                     product (and, on demand, other dictionary-encoded
+                     columns); label sets are OR-ed, fields AND-ed
+    complaint ranges complaint_id -> [first_row, last_row] runs (chunks of a
+                     complaint are stored consecutively), and a row -> complaint
+                     group array for collapsing results by complaint
+
+Filter expressions are dicts of field -> condition, all of which must hold:
+
+    {"product_category": "Credit Cards"}                    one value
+    {"product": ["Credit card", "Prepaid card"]}            any of several values
+    {"date_received": {"from": "2023-01-01", "to": "2023-03-31"}}   inclusive range
+                                                            (either bound optional)
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Columns indexed when a snapshot is opened; other columns are indexed on first use
+DATE_COLUMN = "date_received"
+BITMAP_COLUMNS = ("product_category", "product")
+COMPLAINT_ID_COLUMN = "complaint_id"
+
+RANGE_KEYS = ("from", "to")
+
+
+def _is_range(condition: Any) -> bool:
+    return isinstance(condition, dict)
+
+
+def _as_values(condition: Any) -> List[Any]:
+    if isinstance(condition, (list, tuple, set, frozenset)):
+        return list(condition)
+    return [condition]
+
+
+def filter_key(filters: Dict[str, Any]) -> Tuple:
+    """Hashable, order-independent form of a filter expression (for caching)."""
+    key = []
+    for name, condition in filters.items():
+        if _is_range(condition):
+            key.append((name, "range", tuple(sorted(condition.items()))))
+        else:
+            key.append((name, "in", tuple(sorted(set(_as_values(condition)), key=repr))))
+    return tuple(sorted(key, key=repr))
+
+
+class SortedColumn:
+    """Row ids of a date / numeric column ordered by value, for range lookups."""
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values)
+        if values.dtype.kind == "M":
+            present = ~np.isnat(values)
+        elif values.dtype.kind == "f":
+            present = ~np.isnan(values)
+        else:
+            present = np.ones(len(values), dtype=bool)
+        rows = np.flatnonzero(present)
+        order = np.argsort(values[rows], kind="stable")
+        self.rows = rows[order]
+        self.values = values[rows][order]
+
+    def _bound(self, value: Any) -> Any:
+        if self.values.dtype.kind == "M":
+            return np.datetime64(value, "D")
+        return value
+
+    def range_rows(self, low: Any = None, high: Any = None) -> np.ndarray:
+        """Sorted row ids with low <= value <= high (None = unbounded)."""
+        start = 0 if low is None else np.searchsorted(self.values, self._bound(low), side="left")
+        end = len(self.values) if high is None else np.searchsorted(
+            self.values, self._bound(high), side="right"
+        )
+        return np.sort(self.rows[start:end])
+
+
+class CategoryBitmaps:
+    """One packed bitmap per label of a dictionary-encoded column."""
+
+    def __init__(self, codes: np.ndarray, labels: Sequence[Any]):
+        codes = np.asarray(codes)
+        self.num_rows = len(codes)
+        self.bitmaps: Dict[Any, np.ndarray] = {
+            label: np.packbits(codes == code) for code, label in enumerate(labels)
+        }
+
+    def bitmap(self, labels: Iterable[Any]) -> np.ndarray:
+        """OR of the bitmaps of the given labels (unknown labels match nothing)."""
+        result = np.zeros((self.num_rows + 7) // 8, dtype=np.uint8)
+        for label in labels:
+            if label in self.bitmaps:
+                result |= self.bitmaps[label]
+        return result
+
+
+class ComplaintRanges:
+    """complaint_id -> runs of consecutive rows holding that complaint's chunks."""
+
+    def __init__(self, ids: np.ndarray):
+        ids = np.asarray(ids)
+        if not len(ids):
+            self.ids = ids
+            self.first_rows = self.last_rows = np.zeros(0, dtype=np.int64)
+            self.run_groups = self.row_groups = np.zeros(0, dtype=np.int32)
+            return
+        starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+        ends = np.concatenate([starts[1:], [len(ids)]]) - 1
+        order = np.argsort(ids[starts], kind="stable")
+        self.ids = ids[starts][order]
+        self.first_rows = starts[order].astype(np.int64)
+        self.last_rows = ends[order].astype(np.int64)
+        # Group = dense number of a distinct complaint id (runs are sorted by id,
+        # so a complaint split into several runs gets one group)
+        self.run_groups = np.cumsum(
+            np.concatenate([[False], self.ids[1:] != self.ids[:-1]])
+        ).astype(np.int32)
+        # row -> group, so result collapsing is one fancy-index instead of
+        # per-row metadata lookups (runs in row order tile every row)
+        in_row_order = np.argsort(self.first_rows)
+        self.row_groups = np.repeat(
+            self.run_groups[in_row_order],
+            (self.last_rows - self.first_rows + 1)[in_row_order],
+        )
+
+    @property
+    def num_groups(self) -> int:
+        return int(self.run_groups[-1]) + 1 if len(self.run_groups) else 0
+
+    def ranges(self, complaint_ids: Iterable[Any]) -> List[Tuple[int, int]]:
+        """[first_row, last_row] runs of the given complaint ids, in row order."""
+        found = []
+        for complaint_id in complaint_ids:
+            try:
+                key = np.asarray(complaint_id, dtype=self.ids.dtype)
+            except (TypeError, ValueError):
+                continue
+            lo, hi = np.searchsorted(self.ids, key, side="left"), np.searchsorted(self.ids, key, side="right")
+            found.extend(zip(self.first_rows[lo:hi].tolist(), self.last_rows[lo:hi].tolist()))
+        return sorted(found)
+
+    def group_rows(self, group: int) -> np.ndarray:
+        """Sorted row ids of all chunks of one group (see row_groups)."""
+        lo = np.searchsorted(self.run_groups, group, side="left")
+        hi = np.searchsorted(self.run_groups, group, side="right")
+        runs = sorted(zip(self.first_rows[lo:hi].tolist(), self.last_rows[lo:hi].tolist()))
+        if not runs:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(first, last + 1) for first, last in runs])
+
+    def neighbour_rows(self, rows: np.ndarray, step: int) -> np.ndarray:
+        """
+        Row of the chunk step positions before / after each row in its complaint.
+
+        A complaint's chunks occupy consecutive rows in chunk_index order, so
+        the neighbour is row + step if that row belongs to the same complaint:
+        one array lookup per row, no metadata scan.
+
+        Args:
+            rows: Row ids (-1 entries stay -1)
+            step: -1 for the previous chunk, 1 for the next one (or further)
+
+        Returns:
+            Neighbour row per input row, -1 where the complaint has none
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        neighbours = rows + step
+        valid = (rows >= 0) & (neighbours >= 0) & (neighbours < len(self.row_groups))
+        valid[valid] = self.row_groups[neighbours[valid]] == self.row_groups[rows[valid]]
+        return np.where(valid, neighbours, -1)
+
+    def rows(self, complaint_ids: Iterable[Any]) -> np.ndarray:
+        """Sorted row ids of all chunks of the given complaints."""
+        runs = self.ranges(complaint_ids)
+        if not runs:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(first, last + 1) for first, last in runs])
+
+
+class SecondaryIndexes:
+    """Secondary indexes over one snapshot's chunk store."""
+
+    def __init__(self, chunk_store: Any):
+        """
+        Build the default indexes (date_received, product_category, product,
+        complaint_id) for the columns the store has.
+
+        Args:
+            chunk_store: ChunkStore or ConcatChunkStore of the snapshot
+        """
+        self.chunk_store = chunk_store
+        self.num_rows = chunk_store.num_rows
+        self._sorted: Dict[str, Optional[SortedColumn]] = {}
+        self._bitmaps: Dict[str, Optional[CategoryBitmaps]] = {}
+        self._complaints: Optional[ComplaintRanges] = None
+        self._lock = threading.Lock()
+
+        self.sorted_column(DATE_COLUMN)
+        for name in BITMAP_COLUMNS:
+            self.category_bitmaps(name)
+        if self._fixed_width(COMPLAINT_ID_COLUMN, ("int",)) is not None:
+            # (free-text ids are only indexed if a filter asks for them)
+            self.complaint_ranges
+
+    def _fixed_width(self, name: str, kinds: Sequence[str]) -> Optional[np.ndarray]:
+        store = self.chunk_store
+        if name not in store.column_names:
+            return None
+        try:
+            if store.column_kind(name) not in kinds:
+                return None
+            return np.asarray(store.column_values(name))
+        except TypeError:
+            return None
+
+    def sorted_column(self, name: str) -> Optional[SortedColumn]:
+        """Sorted index of a date / numeric column (None for other kinds)."""
+        with self._lock:
+            if name not in self._sorted:
+                values = self._fixed_width(name, ("date", "int", "float"))
+                self._sorted[name] = SortedColumn(values) if values is not None else None
+            return self._sorted[name]
+
+    def category_bitmaps(self, name: str) -> Optional[CategoryBitmaps]:
+        """Bitmaps of a dictionary-encoded column (None for other kinds)."""
+        with self._lock:
+            if name not in self._bitmaps:
+                codes = self._fixed_width(name, ("category",))
+                self._bitmaps[name] = (
+                    CategoryBitmaps(codes, self.chunk_store.column_categories(name))
+                    if codes is not None else None
+                )
+            return self._bitmaps[name]
+
+    @property
+    def complaint_ranges(self) -> ComplaintRanges:
+        """complaint_id -> row runs (ids are compared as stored, e.g. "123")."""
+        with self._lock:
+            if self._complaints is None:
+                ids = self._fixed_width(COMPLAINT_ID_COLUMN, ("int",))
+                if ids is None:
+                    # Free-text ids: compare as strings
+                    ids = np.asarray(
+                        [self.chunk_store.get_field(row, COMPLAINT_ID_COLUMN) for row in range(self.num_rows)],
+                        dtype=str,
+                    )
+                self._complaints = ComplaintRanges(ids)
+            return self._complaints
+
+    def _mask(self, rows: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def _condition_bitmap(self, name: str, condition: Any) -> np.ndarray:
+        if _is_range(condition):
+            unknown = set(condition) - set(RANGE_KEYS)
+            if unknown:
+                raise ValueError(f"Range filter on {name!r} has unknown keys {sorted(unknown)}")
+            column = self.sorted_column(name)
+            if column is None:
+                raise ValueError(f"Column {name!r} does not support range filters")
+            return self._mask(column.range_rows(condition.get("from"), condition.get("to")))
+
+        values = _as_values(condition)
+        bitmaps = self.category_bitmaps(name)
+        if bitmaps is not None:
+            return bitmaps.bitmap(values)
+        if name == COMPLAINT_ID_COLUMN:
+            return self._mask(self.complaint_ranges.rows(values))
+        column = self.sorted_column(name)
+        if column is not None:
+            return self._mask(np.concatenate(
+                [column.range_rows(value, value) for value in values] or [np.zeros(0, dtype=np.int64)]
+            ))
+        # Free-text columns: the chunk store's own matcher
+        return self._mask(self.chunk_store.find_rows(name, values))
+
+    def resolve(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Sorted row ids matching every condition of a filter expression.
+
+        Args:
+            filters: Field -> value, list of values, or {"from": .., "to": ..} range
+
+        Raises:
+            ValueError: If a range is requested on a column that has no order
+        """
+        bitmap = np.full((self.num_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        for name, condition in filters.items():
+            bitmap &= self._condition_bitmap(name, condition)
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.num_rows)).astype(np.int64)
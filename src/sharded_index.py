@@ -0,0 +1,216 @@
+"""
+Sharded Index Module
+
+Presents several FAISS shard indexes as one index. A search fans out to all
+shards in parallel on a thread pool (FAISS releases the GIL while searching)
+and the per-shard top-k lists are merged with a heap into one global top-k.
+All sharded indexes share one module-level pool, so views built per snapshot
+(hot reloads, delta segments) do not each leave threads behind.
+
+Each shard covers a contiguous range of global row ids, so shard-local ids
+are translated back to rows of the shared chunk store.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+SHARDS_FILENAME = "shards.json"
+SHARDS_DIRNAME = "shards"
+
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+
+
+def get_search_pool() -> ThreadPoolExecutor:
+    """Shard search pool shared by all ShardedIndex instances (one thread per core)."""
+    global _search_pool
+    if _search_pool is None:
+        with _search_pool_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(
+                    max_workers=os.cpu_count() or 1, thread_name_prefix="shard-search"
+                )
+    return _search_pool
+
+
+def shard_ranges(num_rows: int, num_shards: int) -> List[Tuple[int, int]]:
+    """Split ``num_rows`` rows into ``num_shards`` contiguous, near-equal ranges."""
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+    bounds = np.linspace(0, num_rows, num_shards + 1).round().astype(int)
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def read_shard_layout(store_dir: Path) -> Optional[Dict[str, Any]]:
+    """Return the parsed shards.json of a build, or None for a single-index build."""
+    layout_path = Path(store_dir) / SHARDS_FILENAME
+    if not layout_path.exists():
+        return None
+    with open(layout_path, "r") as f:
+        return json.load(f)
+
+
+def merge_results(
+    per_shard: Sequence[Tuple[np.ndarray, np.ndarray]],
+    num_queries: int,
+    k: int,
+    metric_type: int = faiss.METRIC_INNER_PRODUCT,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge sorted per-shard (distances, labels) results into one top-k per query.
+
+    Labels must already be global row ids; -1 entries are ignored. Rows with
+    fewer than k hits are padded with -1 labels and -inf/+inf distances.
+    """
+    # Inner-product scores are better when larger, L2 distances when smaller
+    larger_is_better = metric_type == faiss.METRIC_INNER_PRODUCT
+    pad_distance = -np.inf if larger_is_better else np.inf
+    distances = np.full((num_queries, k), pad_distance, dtype=np.float32)
+    labels = np.full((num_queries, k), -1, dtype=np.int64)
+    sort_key = (lambda hit: -hit[0]) if larger_is_better else (lambda hit: hit[0])
+
+    for row in range(num_queries):
+        # Each shard's list is already sorted, so a k-way heap merge suffices
+        streams = [
+            ((float(d), int(i)) for d, i in zip(shard_d[row], shard_i[row]) if i >= 0)
+            for shard_d, shard_i in per_shard
+        ]
+        merged = itertools.islice(heapq.merge(*streams, key=sort_key), k)
+        for rank, (distance, label) in enumerate(merged):
+            distances[row, rank] = distance
+            labels[row, rank] = label
+    return distances, labels
+
+
+class ShardedIndex:
+    """Read-only, FAISS-compatible view over a list of shard indexes."""
+
+    def __init__(
+        self,
+        shards: Sequence[faiss.Index],
+        row_starts: Sequence[int],
+    ):
+        """
+        Args:
+            shards: Shard indexes, all with the same dimension and metric
+            row_starts: Global row id of the first vector of each shard
+        """
+        if not shards:
+            raise ValueError("ShardedIndex needs at least one shard")
+        if len(shards) != len(row_starts):
+            raise ValueError("shards and row_starts must have the same length")
+        dimensions = {shard.d for shard in shards}
+        if len(dimensions) != 1:
+            raise ValueError(f"Shard dimensions differ: {sorted(dimensions)}")
+
+        self.shards = list(shards)
+        self.row_starts = np.asarray(row_starts, dtype=np.int64)
+        self.d = self.shards[0].d
+        self.metric_type = self.shards[0].metric_type
+        self.ntotal = int(sum(shard.ntotal for shard in self.shards))
+
+    @property
+    def num_shards(self) -> int:
+        return len(self.shards)
+
+    def _search_shard(self, shard_id: int, queries: np.ndarray, k: int, params: Any):
+        shard = self.shards[shard_id]
+        if shard.ntotal == 0:
+            return None
+        if params is None:
+            distances, labels = shard.search(queries, min(k, shard.ntotal))
+        else:
+            distances, labels = shard.search(queries, min(k, shard.ntotal), params=params)
+        # Shift shard-local ids to global row ids, keeping -1 padding as is
+        labels = np.where(labels >= 0, labels + self.row_starts[shard_id], -1)
+        return distances, labels
+
+    def search(self, queries: np.ndarray, k: int, params: Any = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search every shard in parallel and merge into a global top-k.
+
+        Args:
+            queries: (n, d) float32 query matrix
+            k: Number of neighbours per query
+            params: Optional faiss.SearchParameters forwarded to each shard
+
+        Returns:
+            (distances, labels) arrays of shape (n, k), like faiss.Index.search,
+            with global row ids and -1 padding when fewer than k vectors exist
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        pool = get_search_pool()
+        futures = [
+            pool.submit(self._search_shard, shard_id, queries, k, params)
+            for shard_id in range(self.num_shards)
+        ]
+        per_shard = [result for result in (f.result() for f in futures) if result is not None]
+        return merge_results(per_shard, len(queries), k, self.metric_type)
+
+    def locate(self, row: int) -> Tuple[int, int]:
+        """Return (shard id, shard-local id) of a global row id."""
+        shard_id = int(np.searchsorted(self.row_starts, row, side="right") - 1)
+        return shard_id, int(row - self.row_starts[shard_id])
+
+    def reconstruct(self, row: int) -> np.ndarray:
+        """Return the stored vector of a global row id."""
+        shard_id, local_id = self.locate(row)
+        return self.shards[shard_id].reconstruct(local_id)
+
+    def reconstruct_batch(self, rows: Sequence[int]) -> np.ndarray:
+        """Return the stored vectors of global row ids, one batched call per shard."""
+        rows = np.asarray(rows, dtype=np.int64)
+        vectors = np.zeros((len(rows), self.d), dtype=np.float32)
+        shard_ids = np.searchsorted(self.row_starts, rows, side="right") - 1
+        for shard_id in np.unique(shard_ids):
+            positions = np.flatnonzero(shard_ids == shard_id)
+            vectors[positions] = self.shards[shard_id].reconstruct_batch(
+                rows[positions] - self.row_starts[shard_id]
+            )
+        return vectors
+
+    def reconstruct_n(self, start: int, n: int) -> np.ndarray:
+        """Return the stored vectors of global rows [start, start + n), one bulk call per shard."""
+        vectors = np.zeros((n, self.d), dtype=np.float32)
+        end = start + n
+        for shard, shard_start in zip(self.shards, self.row_starts.tolist()):
+            lo, hi = max(start, shard_start), min(end, shard_start + shard.ntotal)
+            if lo < hi:
+                vectors[lo - start:hi - start] = shard.reconstruct_n(lo - shard_start, hi - lo)
+        return vectors
+
+
+def read_sharded_index(
+    store_dir: Path, layout: Dict[str, Any], io_flags: int = 0
+) -> ShardedIndex:
+    """
+    Read all shard indexes listed in a build's shards.json.
+
+    Args:
+        store_dir: Build directory
+        layout: Parsed shards.json
+        io_flags: faiss.read_index flags (e.g. for memory-mapping)
+
+    Returns:
+        ShardedIndex over the shards, in row order
+    """
+    shards, row_starts = [], []
+    for shard in layout["shards"]:
+        index = faiss.read_index(str(Path(store_dir) / shard["index"]), io_flags)
+        expected = shard["row_end"] - shard["row_start"]
+        if index.ntotal != expected:
+            raise ValueError(
+                f"Shard {shard['index']} has {index.ntotal:,} vectors, expected {expected:,}"
+            )
+        shards.append(index)
+        row_starts.append(shard["row_start"])
+    return ShardedIndex(shards, row_starts)
@@ -0,0 +1,391 @@
+"""
+Store Builder Module
+
+Writes vector store builds in the layout VectorStoreLoader reads: the FAISS
+index (optionally split into shards), the columnar chunk store and a
+manifest tying them together.
+
+Sharded layout (num_shards > 1):
+
+    shards.json             Shard list: index file + [row_start, row_end) per shard
+    shards/shard_000.index  One FAISS index per contiguous range of global rows
+    chunk_store/            Chunk texts/metadata for all rows, in global row order
+"""
+
+import json
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+from .chunk_store import ChunkStore, STORE_DIRNAME
+from .index_types import INDEX_TYPES, build_index, detect_index_type
+from .lexical_index import write_lexical_index
+from .sharded_index import SHARDS_DIRNAME, SHARDS_FILENAME, shard_ranges
+from .store_manifest import write_manifest
+
+INDEX_FILENAME = "complaint_embeddings.index"
+
+# Chunking parameters used by Task 2 (see sampling_summary.json)
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_CHUNK_OVERLAP = 50
+TARGET_CATEGORIES = ["Credit Cards", "Personal Loans", "Savings Accounts", "Money Transfers"]
+
+
+def map_to_product_category(product: Any) -> str:
+    """Map CFPB product names to CrediTrust product categories (as in Task 2)."""
+    product_lower = str(product).lower()
+
+    if "credit card" in product_lower or "prepaid card" in product_lower:
+        return "Credit Cards"
+    elif "loan" in product_lower and ("personal" in product_lower or "payday" in product_lower):
+        return "Personal Loans"
+    elif "checking" in product_lower or "savings" in product_lower:
+        return "Savings Accounts"
+    elif (
+        "money transfer" in product_lower
+        or "money service" in product_lower
+        or "virtual currency" in product_lower
+    ):
+        return "Money Transfers"
+    else:
+        return "Other"
+
+
+def make_text_splitter(
+    chunk_size: int = DEFAULT_CHUNK_SIZE, chunk_overlap: int = DEFAULT_CHUNK_OVERLAP
+):
+    """Return the RecursiveCharacterTextSplitter configuration used by Task 2."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", ". ", " ", ""],
+    )
+
+
+def chunk_complaints(
+    complaints: Iterable[Dict[str, Any]], splitter=None
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Split complaint narratives into chunks with Task 2 metadata.
+
+    Args:
+        complaints: Dicts with complaint_id and narrative, plus optional
+            product_category, product, date_received and cleaned_word_count.
+            product_category is derived from product when missing.
+        splitter: Text splitter (defaults to make_text_splitter())
+
+    Returns:
+        Tuple of (chunk texts, metadata dict per chunk)
+    """
+    splitter = splitter or make_text_splitter()
+    chunks, metadata = [], []
+    for complaint in complaints:
+        narrative = str(complaint["narrative"])
+        text_chunks = splitter.split_text(narrative)
+        category = complaint.get("product_category") or map_to_product_category(
+            complaint.get("product")
+        )
+        word_count = complaint.get("cleaned_word_count")
+        for chunk_index, chunk_text in enumerate(text_chunks):
+            chunks.append(chunk_text)
+            metadata.append({
+                "complaint_id": str(complaint["complaint_id"]),
+                "product_category": category,
+                "product": complaint.get("product"),
+                "date_received": complaint.get("date_received"),
+                "chunk_index": chunk_index,
+                "total_chunks": len(text_chunks),
+                "original_word_count": (
+                    word_count if word_count is not None else len(narrative.split())
+                ),
+            })
+    return chunks, metadata
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """Return L2-normalized float32 embeddings so inner product equals cosine similarity."""
+    normalized = np.array(embeddings, dtype=np.float32, order="C", copy=True)
+    faiss.normalize_L2(normalized)
+    return normalized
+
+
+def build_flat_index(embeddings: np.ndarray) -> faiss.Index:
+    """Build an exact IndexFlatIP over already normalized embeddings."""
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    return index
+
+
+def write_index(
+    output_dir: Path,
+    embeddings: np.ndarray,
+    num_shards: int = 1,
+    index_type: str = "flat",
+    index_options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Write normalized embeddings as one FAISS index or as ``num_shards`` shards.
+
+    Args:
+        output_dir: Build directory
+        embeddings: (n, d) normalized float32 embeddings in global row order
+        num_shards: Number of shards (1 writes complaint_embeddings.index);
+            an index already in output_dir, in either layout, is replaced
+        index_type: One of index_types.INDEX_TYPES (each shard gets its own index)
+        index_options: Extra keyword arguments for index_types.build_index
+
+    Returns:
+        Dictionary describing the written layout
+    """
+    output_dir = Path(output_dir)
+    index_options = index_options or {}
+    # Drop any index a previous build left in the directory: the loader reads
+    # shards.json before complaint_embeddings.index, and the manifest
+    # checksums every file, so a stale layout would be served or stamped
+    (output_dir / SHARDS_FILENAME).unlink(missing_ok=True)
+    shutil.rmtree(output_dir / SHARDS_DIRNAME, ignore_errors=True)
+    (output_dir / INDEX_FILENAME).unlink(missing_ok=True)
+    if num_shards == 1:
+        index = build_index(embeddings, index_type, **index_options)
+        faiss.write_index(index, str(output_dir / INDEX_FILENAME))
+        return {"num_shards": 1, "index": INDEX_FILENAME, "index_type": index_type}
+
+    (output_dir / SHARDS_DIRNAME).mkdir(parents=True, exist_ok=True)
+    shards = []
+    for shard_id, (row_start, row_end) in enumerate(shard_ranges(len(embeddings), num_shards)):
+        relative = f"{SHARDS_DIRNAME}/shard_{shard_id:03d}.index"
+        index = build_index(embeddings[row_start:row_end], index_type, **index_options)
+        faiss.write_index(index, str(output_dir / relative))
+        shards.append({"index": relative, "row_start": row_start, "row_end": row_end})
+
+    layout = {
+        "num_shards": num_shards,
+        "total_vectors": len(embeddings),
+        "index_type": index_type,
+        "shards": shards,
+    }
+    with open(output_dir / SHARDS_FILENAME, "w") as f:
+        json.dump(layout, f, indent=2)
+    return layout
+
+
+def write_vector_store(
+    output_dir: Path,
+    chunks: Sequence[str],
+    metadata: Sequence[Dict[str, Any]],
+    embeddings: np.ndarray,
+    model_name: str,
+    num_shards: int = 1,
+    build_id: Optional[str] = None,
+    attributes: Optional[Dict[str, Any]] = None,
+    summary: Optional[Dict[str, Any]] = None,
+    index_type: str = "flat",
+    index_options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Write a complete, manifest-stamped vector store build.
+
+    Args:
+        output_dir: Build directory (created if needed)
+        chunks: Chunk texts in global row order
+        metadata: Metadata dict per chunk
+        embeddings: (n, d) raw embeddings, one per chunk (normalized here)
+        model_name: Embedding model used
+        num_shards: Split the index into this many shards
+        build_id: Build id for the manifest (generated if omitted)
+        attributes: Extra chunk store attributes
+        summary: Optional sampling_summary.json contents
+        index_type: FAISS index type (see index_types.INDEX_TYPES)
+        index_options: Extra keyword arguments for index_types.build_index
+
+    Returns:
+        The written manifest
+    """
+    if not (len(chunks) == len(metadata) == len(embeddings)):
+        raise ValueError(
+            f"chunks ({len(chunks)}), metadata ({len(metadata)}) and embeddings "
+            f"({len(embeddings)}) must have the same length"
+        )
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    normalized = normalize_embeddings(embeddings)
+    dimension = normalized.shape[1]
+    layout = write_index(output_dir, normalized, num_shards, index_type, index_options)
+
+    store_attributes = {
+        "model_name": model_name,
+        "embedding_dimension": dimension,
+        "total_chunks": len(chunks),
+        "creation_date": datetime.now().isoformat(),
+    }
+    store_attributes.update(attributes or {})
+    ChunkStore.from_records(list(chunks), list(metadata), store_attributes).save(
+        output_dir / STORE_DIRNAME
+    )
+    write_lexical_index(output_dir, chunks)
+
+    if summary is not None:
+        with open(output_dir / "sampling_summary.json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+    return write_manifest(
+        output_dir,
+        len(normalized),
+        build_id=build_id,
+        extra={
+            "embedding_model": model_name,
+            "embedding_dimension": dimension,
+            "num_shards": layout["num_shards"],
+            "index_type": index_type,
+        },
+    )
+
+
+def reshard_vector_store(
+    source_dir: Path,
+    output_dir: Path,
+    num_shards: int,
+    index_type: Optional[str] = None,
+    index_options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Rewrite an existing build with a different shard count and/or index type.
+
+    Vectors are reconstructed from the source index, so no re-embedding is
+    needed. Rebuilding from a quantized index (ivf_pq, sq8) carries its
+    quantization error over; rebuild from the CSV for full precision.
+    """
+    from .vector_store_loader import VectorStoreLoader
+
+    loader = VectorStoreLoader(source_dir)
+    index = loader.load_index()
+    store = loader.load_chunks()
+    embeddings = index.reconstruct_n(0, index.ntotal)
+    return write_vector_store(
+        output_dir,
+        store.chunks,
+        store.metadata,
+        embeddings,
+        loader.model_name,
+        num_shards=num_shards,
+        attributes={k: v for k, v in store.attributes.items() if k != "creation_date"},
+        index_type=index_type or detect_index_type(index),
+        index_options=index_options,
+    )
+
+
+def _add_index_arguments(parser):
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=None,
+                        help="FAISS index type (build default: flat)")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF clusters")
+    parser.add_argument("--pq-m", type=int, default=None, help="IVF-PQ sub-quantizers")
+    parser.add_argument("--hnsw-m", type=int, default=None, help="HNSW graph degree")
+    parser.add_argument("--nprobe", type=int, default=None, help="Default IVF nprobe")
+    parser.add_argument("--ef-search", type=int, default=None, help="Default HNSW efSearch")
+
+
+def _index_options(args) -> Dict[str, Any]:
+    options = {
+        "nlist": args.nlist,
+        "pq_m": args.pq_m,
+        "hnsw_m": args.hnsw_m,
+        "nprobe": args.nprobe,
+        "ef_search": args.ef_search,
+    }
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for store builds."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build vector store artifacts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Build a vector store from filtered_complaints.csv")
+    build.add_argument("csv_path", type=Path)
+    build.add_argument("output_dir", type=Path)
+    build.add_argument("--model-name", default="sentence-transformers/all-MiniLM-L6-v2")
+    build.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    build.add_argument("--chunk-overlap", type=int, default=DEFAULT_CHUNK_OVERLAP)
+    build.add_argument("--batch-rows", type=int, default=20_000)
+    build.add_argument("--workers", type=int, default=None,
+                       help="Chunking processes (default: CPU count, 0: no pool)")
+    build.add_argument("--embed-block-size", type=int, default=8192,
+                       help="Chunks embedded between checkpoints")
+    build.add_argument("--encode-batch-size", type=int, default=128)
+    build.add_argument("--sample-size", type=int, default=None,
+                       help="Stratified sample size (Task 2 used 12000); default: all complaints")
+    build.add_argument("--seed", type=int, default=42)
+    build.add_argument("--num-shards", type=int, default=1)
+    build.add_argument("--work-dir", type=Path, default=None)
+    build.add_argument("--publish", action="store_true",
+                       help="Publish as a new version under output_dir/versions")
+    build.add_argument("--embedding-cache", type=Path, default=None,
+                       help="Embedding cache directory (default: output_dir/.embedding_cache)")
+    build.add_argument("--no-embedding-cache", action="store_true")
+    build.add_argument("--embedding-cache-max-gb", type=float, default=2.0)
+    build.add_argument("--export-onnx", action="store_true",
+                       help="Also export the embedding model to ONNX / int8 for query encoding")
+    _add_index_arguments(build)
+
+    reshard = subparsers.add_parser("reshard", help="Split an existing flat index into shards")
+    reshard.add_argument("source_dir", type=Path)
+    reshard.add_argument("output_dir", type=Path)
+    reshard.add_argument("--num-shards", type=int, required=True)
+    _add_index_arguments(reshard)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from .build_pipeline import BuildPipeline
+
+        BuildPipeline(
+            args.csv_path,
+            args.output_dir,
+            model_name=args.model_name,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            batch_rows=args.batch_rows,
+            workers=args.workers,
+            embed_block_size=args.embed_block_size,
+            encode_batch_size=args.encode_batch_size,
+            sample_size=args.sample_size,
+            seed=args.seed,
+            num_shards=args.num_shards,
+            work_dir=args.work_dir,
+            publish=args.publish,
+            use_embedding_cache=not args.no_embedding_cache,
+            embedding_cache_dir=args.embedding_cache,
+            embedding_cache_max_bytes=int(args.embedding_cache_max_gb * 1024**3),
+            index_type=args.index_type or "flat",
+            index_options=_index_options(args),
+            export_onnx=args.export_onnx,
+        ).run()
+    elif args.command == "reshard":
+        manifest = reshard_vector_store(
+            args.source_dir,
+            args.output_dir,
+            args.num_shards,
+            index_type=args.index_type,
+            index_options=_index_options(args),
+        )
+        print(
+            f"[OK] Wrote build {manifest['build_id']} to {args.output_dir}: "
+            f"{manifest['vector_count']:,} vectors in {manifest['num_shards']} "
+            f"{manifest['index_type']} shards"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
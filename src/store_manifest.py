@@ -0,0 +1,245 @@
+"""
+Store Manifest Module
+
+Versioning for the vector store: every build is stamped with a manifest
+(build id, per-file checksums and vector count) so a loader can prove that
+the FAISS index and chunk metadata it reads came from the same build.
+
+Two on-disk layouts are supported:
+
+    vector_store/                   Flat layout (one build, as written by Task 2)
+        complaint_embeddings.index
+        chunk_store/ or chunk_metadata.pkl
+        manifest.json
+
+    vector_store/                   Versioned layout (hot-reloadable)
+        CURRENT                     Name of the active version (switched atomically)
+        versions/<build_id>/        One immutable flat-layout build per version
+"""
+
+import hashlib
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+# Appended segments and tombstones of a build (see delta_store); mutable, so
+# not covered by the build's checksums
+DELTA_DIRNAME = "delta"
+MANIFEST_FORMAT_VERSION = 1
+
+# Files that describe a build rather than belong to it
+_UNCHECKED_FILES = {MANIFEST_FILENAME, CURRENT_FILENAME}
+_UNCHECKED_DIRS = {VERSIONS_DIRNAME, DELTA_DIRNAME}
+
+
+def new_build_id() -> str:
+    """Return a sortable, unique build id such as ``20260105T141500-3f2a9c1d``."""
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Stream a file through SHA-256."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _build_files(store_dir: Path) -> List[Path]:
+    files = []
+    for path in sorted(store_dir.rglob("*")):
+        relative = path.relative_to(store_dir)
+        if not path.is_file() or relative.parts[0] in _UNCHECKED_DIRS:
+            continue
+        if relative.name in _UNCHECKED_FILES:
+            continue
+        # Hidden files and directories hold temporary or work-in-progress data
+        if any(part.startswith(".") for part in relative.parts):
+            continue
+        files.append(relative)
+    return files
+
+
+def write_manifest(
+    store_dir: Path,
+    vector_count: int,
+    build_id: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Checksum every file of a build and write its manifest.json.
+
+    Args:
+        store_dir: Flat-layout build directory
+        vector_count: Number of vectors in the FAISS index (= chunk rows)
+        build_id: Build id to record (a new one is generated if omitted)
+        extra: Additional fields (embedding_model, embedding_dimension, ...)
+
+    Returns:
+        The manifest dictionary that was written
+    """
+    store_dir = Path(store_dir)
+    manifest = {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "build_id": build_id or new_build_id(),
+        "created_at": datetime.now().isoformat(),
+        "vector_count": int(vector_count),
+        "files": {
+            relative.as_posix(): {
+                "sha256": file_sha256(store_dir / relative),
+                "bytes": (store_dir / relative).stat().st_size,
+            }
+            for relative in _build_files(store_dir)
+        },
+    }
+    manifest.update(extra or {})
+
+    tmp_path = store_dir / f".{MANIFEST_FILENAME}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, store_dir / MANIFEST_FILENAME)
+    return manifest
+
+
+def read_manifest(store_dir: Path) -> Optional[Dict[str, Any]]:
+    """Return the manifest of a build directory, or None if it has none."""
+    manifest_path = Path(store_dir) / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def verify_manifest(
+    store_dir: Path,
+    manifest: Dict[str, Any],
+    vector_count: Optional[int] = None,
+    chunk_count: Optional[int] = None,
+    check_checksums: bool = True,
+) -> List[str]:
+    """
+    Check a build directory against its manifest.
+
+    Args:
+        store_dir: Build directory
+        manifest: Manifest read from that directory
+        vector_count: Vector count of the loaded index, if already known
+        chunk_count: Row count of the loaded chunk store, if already known
+        check_checksums: Re-hash every file (slow for large indexes)
+
+    Returns:
+        List of problems found; empty if the build is consistent
+    """
+    store_dir = Path(store_dir)
+    problems = []
+    expected = manifest.get("vector_count")
+    if vector_count is not None and vector_count != expected:
+        problems.append(f"index has {vector_count:,} vectors, manifest says {expected:,}")
+    if chunk_count is not None and chunk_count != expected:
+        problems.append(f"chunk store has {chunk_count:,} rows, manifest says {expected:,}")
+
+    for relative, info in manifest.get("files", {}).items():
+        path = store_dir / relative
+        if not path.exists():
+            problems.append(f"missing file {relative}")
+        elif path.stat().st_size != info["bytes"]:
+            problems.append(f"size mismatch for {relative}")
+        elif check_checksums and file_sha256(path) != info["sha256"]:
+            problems.append(f"checksum mismatch for {relative}")
+    return problems
+
+
+def resolve_active_dir(vector_store_dir: Path) -> Path:
+    """
+    Return the directory holding the active build.
+
+    For the versioned layout this is ``versions/<CURRENT>``; otherwise the
+    vector store directory itself.
+    """
+    vector_store_dir = Path(vector_store_dir)
+    current_path = vector_store_dir / CURRENT_FILENAME
+    if current_path.exists():
+        version = current_path.read_text().strip()
+        if version:
+            return vector_store_dir / VERSIONS_DIRNAME / version
+    return vector_store_dir
+
+
+def publish_version(vector_store_dir: Path, build_dir: Path) -> Path:
+    """
+    Install a finished build as the active version of a vector store.
+
+    The build is moved under ``versions/<build_id>/`` and CURRENT is switched
+    with an atomic rename, so a watching loader sees either the old or the new
+    version, never a partially written one.
+
+    Args:
+        vector_store_dir: Root vector store directory
+        build_dir: Flat-layout build with a manifest.json
+
+    Returns:
+        Path of the installed version directory
+    """
+    vector_store_dir = Path(vector_store_dir)
+    manifest = read_manifest(build_dir)
+    if manifest is None:
+        raise ValueError(f"{build_dir} has no {MANIFEST_FILENAME}; call write_manifest() first")
+
+    version_dir = vector_store_dir / VERSIONS_DIRNAME / manifest["build_id"]
+    version_dir.parent.mkdir(parents=True, exist_ok=True)
+    if Path(build_dir).resolve() != version_dir.resolve():
+        os.replace(build_dir, version_dir)
+
+    tmp_path = vector_store_dir / f".{CURRENT_FILENAME}.tmp"
+    tmp_path.write_text(manifest["build_id"] + "\n")
+    os.replace(tmp_path, vector_store_dir / CURRENT_FILENAME)
+    return version_dir
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Write a manifest for an existing (flat-layout) vector store."""
+    import argparse
+
+    import faiss
+
+    parser = argparse.ArgumentParser(description="Stamp a vector store build with manifest.json")
+    parser.add_argument(
+        "vector_store_dir",
+        nargs="?",
+        type=Path,
+        default=Path(__file__).resolve().parent.parent / "vector_store",
+    )
+    parser.add_argument("--build-id", default=None)
+    args = parser.parse_args(argv)
+
+    from .sharded_index import read_shard_layout
+
+    layout = read_shard_layout(args.vector_store_dir)
+    index_path = args.vector_store_dir / "complaint_embeddings.index"
+    if layout is not None:
+        vector_count = layout["total_vectors"]
+    elif index_path.exists():
+        index = faiss.read_index(str(index_path), getattr(faiss, "IO_FLAG_MMAP_IFC", 0))
+        vector_count = index.ntotal
+    else:
+        print(f"[ERROR] {index_path} not found")
+        return 1
+
+    manifest = write_manifest(args.vector_store_dir, vector_count, build_id=args.build_id)
+    print(
+        f"[OK] Wrote {args.vector_store_dir / MANIFEST_FILENAME}: build {manifest['build_id']}, "
+        f"{manifest['vector_count']:,} vectors, {len(manifest['files'])} files"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,26 +4,198 @@ Vector Store Loader Module
 Loads the pre-built FAISS index and associated metadata for RAG retrieval.
 """
 
-import pickle
+import os
 import json
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from sklearn.preprocessing import normalize
 
+from .chunk_store import (
+    ChunkStore,
+    ChunkSequence,
+    MetadataSequence,
+    STORE_DIRNAME,
+    read_pickle_store,
+)
+from .delta_store import SEGMENTS_DIRNAME, LiveIndex, open_live_view, read_delta_state
+from .embedding_backends import (
+    COSINE_TOLERANCE,
+    EMBEDDING_BACKENDS,
+    ONNX_BACKENDS,
+    ONNX_DIRNAME,
+    OnnxEmbeddingModel,
+    cosine_agreement,
+    sample_rows,
+)
+from .filtered_search import RowFilter
+from .lexical_index import LexicalSearcher, open_lexical_index
+from .secondary_index import SecondaryIndexes, filter_key
+from .index_types import describe_index, detect_index_type
+from .sharded_index import ShardedIndex, read_shard_layout, read_sharded_index
+from .store_manifest import DELTA_DIRNAME, read_manifest, resolve_active_dir, verify_manifest
+
+
+# How the FAISS index is brought into memory:
+#   - "eager": faiss.read_index() copies the index into private heap memory
+#   - "mmap":  the index file is memory-mapped read-only, so the vectors live in
+#              the OS page cache and are shared by every process on the host
+INDEX_LOAD_MODES = ("eager", "mmap")
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+INDEX_FILENAME = "complaint_embeddings.index"
+METADATA_FILENAME = "chunk_metadata.pkl"
+# Resolved filters kept per snapshot (each holds its row ids and FAISS selectors)
+ROW_FILTER_CACHE_SIZE = 256
+# Index types whose stored vectors are exact, so backends can be checked against them
+EXACT_INDEX_TYPES = ("flat", "hnsw")
+
+
+class StoreSnapshot:
+    """
+    One consistent version of the vector store: an index plus the chunk rows it points at.
+
+    A snapshot is never modified after creation. Retriever takes the loader's
+    current snapshot once per request, so a hot reload that installs a new
+    snapshot never mixes two builds within one query, and in-flight queries
+    keep the old build alive until they finish.
+
+    ``index`` and ``chunk_store`` include the build's appended delta segments
+    and exclude withdrawn complaints (see delta_store); ``base_index`` and
+    ``base_chunk_store`` are the build as published.
+    """
+
+    def __init__(
+        self,
+        index: faiss.Index,
+        chunk_store: ChunkStore,
+        store_dir: Path,
+        manifest: Optional[Dict[str, Any]] = None,
+        generation: int = 0,
+    ):
+        self.base_index = index
+        self.base_chunk_store = chunk_store
+        self.delta_state = read_delta_state(store_dir)
+        self.index, self.chunk_store, self.delta_sequence = open_live_view(
+            index, chunk_store, store_dir, self.delta_state
+        )
+        self.chunks = self.chunk_store.chunks
+        self.metadata = self.chunk_store.metadata
+        self.store_dir = store_dir
+        self.manifest = manifest
+        self.build_id: Optional[str] = manifest.get("build_id") if manifest else None
+        self.generation = generation
+        # Decides which per-query knobs (nprobe / ef_search) apply
+        self.index_type = detect_index_type(index)
+        # Date / category / complaint lookups for filtered queries
+        self.secondary_indexes = SecondaryIndexes(self.chunk_store)
+        self._row_filters: "OrderedDict[Any, RowFilter]" = OrderedDict()
+        self._row_filters_lock = threading.Lock()
+        self._lexical: Optional[LexicalSearcher] = None
+        self._lexical_lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Build id from the manifest (or a per-process generation), plus the delta sequence."""
+        version = self.build_id or f"unversioned-{self.generation}"
+        if self.delta_sequence:
+            version += f"+delta{self.delta_sequence}"
+        return version
+
+    @property
+    def removed_rows(self) -> np.ndarray:
+        """Rows of withdrawn complaints (excluded from every search)."""
+        if isinstance(self.index, LiveIndex):
+            return self.index.removed_rows
+        return np.zeros(0, dtype=np.int64)
+
+    @property
+    def lexical_index(self) -> LexicalSearcher:
+        """BM25 search over the base build and its delta segments (opened on first use)."""
+        if self._lexical is None:
+            with self._lexical_lock:
+                if self._lexical is None:
+                    parts = [(open_lexical_index(self.store_dir, self.base_chunk_store.chunks), 0)]
+                    stores = getattr(self.chunk_store, "parts", [self.chunk_store])[1:]
+                    row_starts = getattr(self.chunk_store, "row_starts", [0])[1:]
+                    for segment, store, row_start in zip(self.delta_state["segments"], stores, row_starts):
+                        segment_dir = self.store_dir / DELTA_DIRNAME / SEGMENTS_DIRNAME / segment
+                        parts.append((open_lexical_index(segment_dir, store.chunks), int(row_start)))
+                    self._lexical = LexicalSearcher(parts)
+        return self._lexical
+
+    def row_filter(self, filters: Dict[str, Any]) -> RowFilter:
+        """
+        Rows matching a filter expression, resolved through the secondary indexes.
+
+        Recently used filters are cached for the lifetime of the snapshot.
+
+        Args:
+            filters: Filter expression (see secondary_index), e.g.
+                {"product_category": ["Credit Cards"], "date_received": {"from": "2023-01-01"}}
+
+        Returns:
+            RowFilter over the matching, non-withdrawn rows
+        """
+        key = filter_key(filters)
+        with self._row_filters_lock:
+            if key in self._row_filters:
+                self._row_filters.move_to_end(key)
+                return self._row_filters[key]
+        rows = np.setdiff1d(self.secondary_indexes.resolve(filters), self.removed_rows)
+        row_filter = RowFilter(rows)
+        with self._row_filters_lock:
+            self._row_filters[key] = row_filter
+            while len(self._row_filters) > ROW_FILTER_CACHE_SIZE:
+                self._row_filters.popitem(last=False)
+        return row_filter
+
+    def with_latest_delta(self, generation: int) -> "StoreSnapshot":
+        """Return a snapshot of the same base build with its current delta reopened."""
+        return StoreSnapshot(
+            self.base_index, self.base_chunk_store, self.store_dir, self.manifest, generation
+        )
+
 
 class VectorStoreLoader:
     """Loads and manages the FAISS vector store and metadata."""
 
-    def __init__(self, vector_store_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        vector_store_dir: Optional[Path] = None,
+        index_load_mode: str = "eager",
+        verify_checksums: bool = False,
+        embedding_backend: str = "torch",
+    ):
         """
         Initialize the vector store loader.
 
         Args:
             vector_store_dir: Path to vector store directory. Defaults to project_root/vector_store
+            index_load_mode: "eager" to read the index into process memory, or "mmap"
+                to map it read-only from the page cache (zero-copy, shared between
+                worker processes). A memory-mapped index cannot be modified in place.
+            verify_checksums: Re-hash every file against manifest.json on the initial
+                load (hot reloads always verify checksums)
+            embedding_backend: Query encoder, one of EMBEDDING_BACKENDS: "torch"
+                (SentenceTransformer), or the build's "onnx" / "onnx_int8" export
+                (see embedding_backends). ONNX backends fall back to torch if the
+                build has no usable export or its vectors disagree with the index.
         """
+        if index_load_mode not in INDEX_LOAD_MODES:
+            raise ValueError(
+                f"index_load_mode must be one of {INDEX_LOAD_MODES}, got {index_load_mode!r}"
+            )
+        if embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(
+                f"embedding_backend must be one of {EMBEDDING_BACKENDS}, got {embedding_backend!r}"
+            )
+
         if vector_store_dir is None:
             # Determine project root
             current_path = Path(__file__).resolve()
@@ -34,12 +206,43 @@ class VectorStoreLoader:
             vector_store_dir = project_root / "vector_store"
 
         self.vector_store_dir = Path(vector_store_dir)
+        # Directory of the active build (differs from vector_store_dir for the
+        # versioned layout, see store_manifest)
+        self.store_dir = resolve_active_dir(self.vector_store_dir)
+        self.manifest: Optional[Dict[str, Any]] = read_manifest(self.store_dir)
+        self.verify_checksums = verify_checksums
+        self.index_load_mode = index_load_mode
+        self.index_mmapped = False
+        self.index_load_seconds: Optional[float] = None
         self.index: Optional[faiss.Index] = None
-        self.chunks: List[str] = []
-        self.metadata: List[Dict[str, Any]] = []
+        self.chunk_store: Optional[ChunkStore] = None
+        # Sequence views over chunk_store; rows are decoded on access
+        self.chunks: ChunkSequence = []
+        self.metadata: MetadataSequence = []
         self.embedding_model: Optional[SentenceTransformer] = None
+        self.embedding_backend = embedding_backend
+        # Backend actually serving queries (after any fallback to torch)
+        self.active_embedding_backend: Optional[str] = None
+        self.embedding_backend_agreement: Optional[float] = None
         self.model_name: Optional[str] = None
         self.embedding_dimension: Optional[int] = None
+        self.snapshot: Optional[StoreSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watch_stop: Optional[threading.Event] = None
+        self._watch_thread: Optional[threading.Thread] = None
+
+    @property
+    def index_path(self) -> Path:
+        return self.store_dir / INDEX_FILENAME
+
+    @property
+    def chunk_store_dir(self) -> Path:
+        return self.store_dir / STORE_DIRNAME
+
+    @property
+    def metadata_path(self) -> Path:
+        return self.store_dir / METADATA_FILENAME
 
     def load(self) -> bool:
         """
@@ -50,78 +253,473 @@ class VectorStoreLoader:
         """
         try:
             # Check for required files first
-            index_path = self.vector_store_dir / "complaint_embeddings.index"
-            metadata_path = self.vector_store_dir / "chunk_metadata.pkl"
-
-            missing_files = []
-            if not index_path.exists():
-                missing_files.append(str(index_path))
-            if not metadata_path.exists():
-                missing_files.append(str(metadata_path))
-
-            if missing_files:
-                print("\n" + "=" * 80)
-                print("VECTOR STORE FILES NOT FOUND")
-                print("=" * 80)
-                print(f"\nMissing files:")
-                for file in missing_files:
-                    print(f"  [X] {file}")
-                print(f"\nExpected location: {self.vector_store_dir}")
-                print("\nTo create the vector store:")
-                print(
-                    "  1. Complete Task 2: Run notebooks/task-2-embeddings-vectorstore.ipynb"
-                )
-                print("  2. Ensure the notebook generates:")
-                print("     - vector_store/complaint_embeddings.index")
-                print("     - vector_store/chunk_metadata.pkl")
-                print("     - vector_store/sampling_summary.json")
-                print("=" * 80 + "\n")
+            if not self.check_files():
                 return False
 
-            # Load FAISS index
-            print(f"Loading FAISS index from {index_path}...")
-            self.index = faiss.read_index(str(index_path))
+            self.load_index()
+            self.load_chunks()
+            self.load_embedding_model()
+            self.check_consistency()
+            return True
+
+        except Exception as e:
+            print(f"Error loading vector store: {e}")
+            return False
+
+    def check_files(self) -> bool:
+        """
+        Check that the index and chunk metadata exist, printing setup help if not.
+
+        Returns:
+            True if all required files are present
+        """
+        missing_files = []
+        if not self.index_path.exists() and read_shard_layout(self.store_dir) is None:
+            missing_files.append(str(self.index_path))
+        if not self.has_chunk_store() and not self.metadata_path.exists():
+            missing_files.append(f"{self.metadata_path} (or {self.chunk_store_dir})")
+
+        if missing_files:
+            print("\n" + "=" * 80)
+            print("VECTOR STORE FILES NOT FOUND")
+            print("=" * 80)
+            print(f"\nMissing files:")
+            for file in missing_files:
+                print(f"  [X] {file}")
+            print(f"\nExpected location: {self.vector_store_dir}")
+            print("\nTo create the vector store:")
             print(
-                f"[OK] Loaded FAISS index: {self.index.ntotal:,} vectors, dimension {self.index.d}"
+                "  1. Complete Task 2: Run notebooks/task-2-embeddings-vectorstore.ipynb"
             )
+            print("  2. Ensure the notebook generates:")
+            print("     - vector_store/complaint_embeddings.index")
+            print("     - vector_store/chunk_metadata.pkl")
+            print("       (optionally converted with: python -m src.chunk_store)")
+            print("     - vector_store/sampling_summary.json")
+            print("=" * 80 + "\n")
+            return False
+        return True
 
-            # Load metadata
-            print(f"Loading metadata from {metadata_path}...")
-            with open(metadata_path, "rb") as f:
-                metadata_dict = pickle.load(f)
+    def check_consistency(self):
+        """
+        Check that the loaded index, chunks and embedding model belong together.
+
+        With a manifest.json the index and chunk store must match the recorded
+        build exactly; without one (legacy stores) mismatches only print warnings.
+
+        Raises:
+            ValueError: If the store does not match its manifest
+        """
+        if self.manifest is not None:
+            problems = verify_manifest(
+                self.store_dir,
+                self.manifest,
+                vector_count=self.index.ntotal,
+                chunk_count=len(self.chunks),
+                check_checksums=self.verify_checksums,
+            )
+            if problems:
+                raise ValueError(
+                    f"Vector store build {self.manifest.get('build_id')} is inconsistent: "
+                    + "; ".join(problems)
+                )
+            print(f"[OK] Vector store build {self.manifest.get('build_id')} verified")
+        elif len(self.chunks) != self.index.ntotal:
+            print(
+                f"Warning: Mismatch between chunks ({len(self.chunks)}) and index vectors ({self.index.ntotal})"
+            )
 
-            self.chunks = metadata_dict.get("chunks", [])
-            self.metadata = metadata_dict.get("metadata", [])
-            self.model_name = metadata_dict.get(
-                "model_name", "sentence-transformers/all-MiniLM-L6-v2"
+        if self.embedding_model.get_sentence_embedding_dimension() != self.index.d:
+            print(
+                f"Warning: Embedding dimension mismatch: model={self.embedding_model.get_sentence_embedding_dimension()}, index={self.index.d}"
             )
-            self.embedding_dimension = metadata_dict.get("embedding_dimension", 384)
+        if self.active_embedding_backend in ONNX_BACKENDS and self.embedding_backend_agreement is None:
+            self.verify_embedding_backend()
 
-            print(f"[OK] Loaded {len(self.chunks):,} chunks with metadata")
+    def verify_embedding_backend(self) -> Optional[float]:
+        """
+        Check the ONNX query encoder against the vectors stored in the index.
+
+        Re-embeds an evenly spread sample of chunks and compares them with their
+        stored vectors (exact index types only; for quantized indexes the
+        build-time check in export.json stands). Falls back to the torch
+        SentenceTransformer if the minimum cosine similarity is below the
+        backend's tolerance.
 
-            # Load embedding model
-            print(f"Loading embedding model: {self.model_name}...")
-            self.embedding_model = SentenceTransformer(self.model_name)
+        Returns:
+            The minimum cosine similarity, or None if the index is not exact
+        """
+        if detect_index_type(self.index) not in EXACT_INDEX_TYPES:
+            return None
+        rows = sample_rows(self.index.ntotal)
+        reference = self.index.reconstruct_batch(rows)
+        texts = [self.chunk_store.get_text(int(row)) for row in rows]
+        agreement = cosine_agreement(self.embedding_model, texts, reference)
+        self.embedding_backend_agreement = agreement
+        tolerance = COSINE_TOLERANCE[self.active_embedding_backend]
+        if agreement < 1.0 - tolerance:
             print(
-                f"[OK] Embedding model loaded (dimension: {self.embedding_model.get_sentence_embedding_dimension()})"
+                f"Warning: {self.active_embedding_backend} embeddings disagree with the index "
+                f"(min cosine {agreement:.5f} < {1.0 - tolerance}); falling back to torch"
             )
+            self._load_torch_model(self.resolve_model_name())
+        else:
+            print(f"[OK] {self.active_embedding_backend} embeddings match the index (min cosine {agreement:.5f})")
+        return agreement
+
+    def resolve_model_name(self) -> str:
+        """
+        Determine the embedding model name without loading the chunk metadata.
+
+        Reads the chunk store header or sampling_summary.json so the embedding
+        model can start loading in parallel with the chunks.
+        """
+        if self.model_name:
+            return self.model_name
+        if self.has_chunk_store():
+            with open(self.chunk_store_dir / "store.json", "r") as f:
+                attributes = json.load(f).get("attributes", {})
+            if attributes.get("model_name"):
+                return attributes["model_name"]
+        if self.manifest and self.manifest.get("embedding_model"):
+            return self.manifest["embedding_model"]
+        summary_path = self.store_dir / "sampling_summary.json"
+        if summary_path.exists():
+            with open(summary_path, "r") as f:
+                model_name = json.load(f).get("embedding_model")
+            if model_name:
+                return model_name
+        return DEFAULT_EMBEDDING_MODEL
+
+    def load_embedding_model(self) -> Any:
+        """
+        Load the query embedding model of the configured backend.
 
-            # Verify consistency
-            if len(self.chunks) != self.index.ntotal:
+        Returns:
+            The SentenceTransformer or OnnxEmbeddingModel (also stored on
+            self.embedding_model)
+        """
+        model_name = self.resolve_model_name()
+        if self.embedding_backend in ONNX_BACKENDS:
+            try:
+                model = OnnxEmbeddingModel(self.store_dir / ONNX_DIRNAME, self.embedding_backend)
+                variant = model.export_info["variants"][self.embedding_backend]
+                if model.model_name != model_name:
+                    raise ValueError(f"export is of {model.model_name}, the build uses {model_name}")
+                if not variant.get("verified"):
+                    raise ValueError(f"export failed its build-time check (min cosine {variant.get('min_cosine')})")
+            except (ImportError, OSError, ValueError, KeyError) as e:
+                print(f"Warning: {self.embedding_backend} embedding backend unavailable ({e}); using torch")
+            else:
+                self.embedding_model = model
+                self.active_embedding_backend = self.embedding_backend
+                self.embedding_backend_agreement = None
                 print(
-                    f"Warning: Mismatch between chunks ({len(self.chunks)}) and index vectors ({self.index.ntotal})"
+                    f"[OK] Embedding model loaded: {model_name} ({self.embedding_backend}, "
+                    f"dimension: {model.get_sentence_embedding_dimension()})"
                 )
+                return model
+        return self._load_torch_model(model_name)
+
+    def _load_torch_model(self, model_name: str) -> SentenceTransformer:
+        print(f"Loading embedding model: {model_name}...")
+        self.embedding_model = SentenceTransformer(model_name)
+        self.active_embedding_backend = "torch"
+        print(
+            f"[OK] Embedding model loaded (dimension: {self.embedding_model.get_sentence_embedding_dimension()})"
+        )
+        return self.embedding_model
+
+    def has_chunk_store(self) -> bool:
+        """Check if a columnar chunk store exists in the vector store directory."""
+        return (self.chunk_store_dir / "store.json").exists()
 
-            if self.embedding_model.get_sentence_embedding_dimension() != self.index.d:
+    def load_chunks(self) -> ChunkStore:
+        """
+        Load chunk texts and metadata.
+
+        Prefers the memory-mapped columnar chunk store; falls back to unpickling
+        chunk_metadata.pkl and encoding it in memory. Either way ``chunks`` and
+        ``metadata`` become lazy sequence views over the store.
+
+        Returns:
+            The loaded ChunkStore (also stored on self.chunk_store)
+        """
+        store = self._read_chunks(self.store_dir)
+        self.chunk_store = store
+        self.chunks = store.chunks
+        self.metadata = store.metadata
+        self.model_name = store.attributes.get("model_name", DEFAULT_EMBEDDING_MODEL)
+        self.embedding_dimension = store.attributes.get("embedding_dimension", 384)
+        print(f"[OK] Loaded {len(self.chunks):,} chunks with metadata")
+        return store
+
+    def _read_chunks(self, store_dir: Path) -> ChunkStore:
+        chunk_store_dir = store_dir / STORE_DIRNAME
+        if (chunk_store_dir / "store.json").exists():
+            print(f"Loading chunk store from {chunk_store_dir}...")
+            return ChunkStore.open(chunk_store_dir)
+        print(f"Loading metadata from {store_dir / METADATA_FILENAME}...")
+        print(
+            "[INFO] Run 'python -m src.chunk_store' once to convert it to the faster columnar format"
+        )
+        return read_pickle_store(store_dir / METADATA_FILENAME)
+
+    def load_index(self) -> faiss.Index:
+        """
+        Read only the FAISS index from disk, honouring the configured load mode.
+
+        Returns:
+            The loaded FAISS index (also stored on self.index)
+        """
+        print(f"Loading FAISS index from {self.store_dir} ({self.index_load_mode})...")
+        start = time.perf_counter()
+        self.index, self.index_mmapped = self._read_index(self.store_dir)
+        self.index_load_seconds = time.perf_counter() - start
+        shards = (
+            f", {self.index.num_shards} shards" if isinstance(self.index, ShardedIndex) else ""
+        )
+        print(
+            f"[OK] Loaded {detect_index_type(self.index)} FAISS index: {self.index.ntotal:,} vectors, "
+            f"dimension {self.index.d}{shards} "
+            f"({'memory-mapped' if self.index_mmapped else 'in memory'}, {self.index_load_seconds:.2f}s)"
+        )
+        return self.index
+
+    def _read_index(self, store_dir: Path) -> Tuple[faiss.Index, bool]:
+        """
+        Read the FAISS index of a build according to the configured load mode.
+
+        In "mmap" mode the index storage is a read-only view over the mapped
+        file (faiss.IO_FLAG_MMAP_IFC), so no private copy of the vectors is made.
+        Older faiss builds without zero-copy support fall back to an eager read.
+        Sharded builds (shards.json) are returned as a ShardedIndex.
+
+        Returns:
+            Tuple of (index, whether it is memory-mapped)
+        """
+        io_flags, mmapped = 0, False
+        if self.index_load_mode == "mmap":
+            mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+            if mmap_flag is None:
+                print(
+                    "Warning: this faiss build does not support zero-copy mmap loading; "
+                    "falling back to eager load"
+                )
+            else:
+                io_flags, mmapped = mmap_flag | faiss.IO_FLAG_READ_ONLY, True
+
+        layout = read_shard_layout(store_dir)
+        if layout is not None:
+            return read_sharded_index(store_dir, layout, io_flags), mmapped
+        return faiss.read_index(str(store_dir / INDEX_FILENAME), io_flags), mmapped
+
+    def index_files(self) -> List[Path]:
+        """Paths of the index file(s) of the active build."""
+        layout = read_shard_layout(self.store_dir)
+        if layout is not None:
+            return [self.store_dir / shard["index"] for shard in layout["shards"]]
+        return [self.index_path]
+
+    def get_snapshot(self) -> StoreSnapshot:
+        """
+        Return the current store snapshot.
+
+        The first call after load() freezes the loaded index and chunk store
+        into a snapshot; afterwards it changes only when reload() swaps one in.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            with self._snapshot_lock:
+                if self.snapshot is None:
+                    if not self.is_loaded():
+                        raise RuntimeError("Vector store is not loaded")
+                    self.snapshot = StoreSnapshot(
+                        self.index, self.chunk_store, self.store_dir, self.manifest
+                    )
+                snapshot = self.snapshot
+        return snapshot
+
+    def _install_snapshot(self, snapshot: StoreSnapshot):
+        """Atomically make a fully loaded snapshot the current one."""
+        with self._snapshot_lock:
+            # Readers only ever dereference self.snapshot once, so this single
+            # assignment is the swap; the attributes below are informational.
+            self.snapshot = snapshot
+            self.store_dir = snapshot.store_dir
+            self.manifest = snapshot.manifest
+            self.index = snapshot.base_index
+            self.chunk_store = snapshot.base_chunk_store
+            self.chunks = snapshot.base_chunk_store.chunks
+            self.metadata = snapshot.base_chunk_store.metadata
+
+    def check_for_update(self) -> Optional[str]:
+        """
+        Return the version of newer published data, or None if up to date.
+
+        Newer data is either a different published build or new appends and
+        withdrawals (delta) on the current one.
+        """
+        store_dir = resolve_active_dir(self.vector_store_dir)
+        manifest = read_manifest(store_dir)
+        snapshot = self.snapshot
+        current = snapshot.build_id if snapshot else None
+        if manifest is not None and (
+            manifest.get("build_id") != current or store_dir != self.store_dir
+        ):
+            return manifest.get("build_id")
+        if snapshot is not None and store_dir == snapshot.store_dir:
+            sequence = read_delta_state(store_dir)["sequence"]
+            if sequence != snapshot.delta_sequence:
+                return f"{current or 'unversioned'}+delta{sequence}"
+        return None
+
+    def reload(self) -> bool:
+        """
+        Load the currently published build and swap it in if it is new.
+
+        The new index and chunk store are loaded and verified against their
+        manifest (including checksums) before the swap; on any problem the
+        current snapshot stays in place. If only the delta of the current
+        build changed, just the delta segments are reopened.
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        with self._reload_lock:
+            if self.snapshot is None and not self.is_loaded():
+                return False
+            current = self.get_snapshot()
+            if self.check_for_update() is None:
+                return False
+
+            store_dir = resolve_active_dir(self.vector_store_dir)
+            manifest = read_manifest(store_dir)
+            build_id = manifest.get("build_id") if manifest else None
+            if store_dir == current.store_dir and build_id == current.build_id:
+                snapshot = current.with_latest_delta(current.generation + 1)
+                self._install_snapshot(snapshot)
                 print(
-                    f"Warning: Embedding dimension mismatch: model={self.embedding_model.get_sentence_embedding_dimension()}, index={self.index.d}"
+                    f"[OK] Applied vector store delta {current.version} -> {snapshot.version} "
+                    f"({snapshot.chunk_store.num_rows:,} rows)"
                 )
+                return True
 
+            print(f"Loading vector store build {build_id} from {store_dir}...")
+
+            model_name = manifest.get("embedding_model")
+            if model_name and self.model_name and model_name != self.model_name:
+                print(
+                    f"Warning: build {build_id} uses embedding model {model_name}, "
+                    f"but {self.model_name} is loaded; restart required, keeping {current.version}"
+                )
+                return False
+
+            start = time.perf_counter()
+            index, mmapped = self._read_index(store_dir)
+            chunk_store = self._read_chunks(store_dir)
+            problems = verify_manifest(
+                store_dir,
+                manifest,
+                vector_count=index.ntotal,
+                chunk_count=chunk_store.num_rows,
+                check_checksums=True,
+            )
+            if index.d != current.index.d:
+                problems.append(f"index dimension {index.d} != {current.index.d}")
+            if problems:
+                print(
+                    f"Warning: not swapping to build {build_id}: " + "; ".join(problems)
+                )
+                return False
+
+            self.index_mmapped = mmapped
+            self.index_load_seconds = time.perf_counter() - start
+            snapshot = StoreSnapshot(
+                index, chunk_store, store_dir, manifest, current.generation + 1
+            )
+            self._install_snapshot(snapshot)
+            print(
+                f"[OK] Swapped vector store {current.version} -> {snapshot.version} "
+                f"({snapshot.index.ntotal:,} vectors, {self.index_load_seconds:.2f}s)"
+            )
             return True
 
-        except Exception as e:
-            print(f"Error loading vector store: {e}")
-            return False
+    def start_watching(self, interval: float = 30.0):
+        """
+        Poll for newly published builds and hot-swap them in on a daemon thread.
+
+        Args:
+            interval: Seconds between checks
+        """
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        self._watch_stop = threading.Event()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop,
+            args=(interval, self._watch_stop),
+            name="vector-store-watch",
+            daemon=True,
+        )
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        """Stop the watcher thread started by start_watching()."""
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+        self._watch_thread = None
+
+    def _watch_loop(self, interval: float, stop: threading.Event):
+        while not stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Warning: vector store reload failed: {e}")
+
+    def get_index_memory(self) -> Dict[str, Any]:
+        """
+        Report where the FAISS index lives in memory.
+
+        Returns:
+            Dictionary with:
+                - load_mode: Requested load mode ("eager" or "mmap")
+                - mmapped: Whether the index is actually memory-mapped
+                - index_file_bytes: Size of the index file on disk
+                - resident_bytes: Bytes of the index held in this process's memory.
+                  For an eager load this is private heap; for an mmap load it is the
+                  number of mapped pages currently resident (shared page cache), or
+                  None when the platform does not expose it.
+                - mapped_bytes: Bytes of the index file mapped into the address space
+                  (0 for an eager load)
+                - load_seconds: Time spent reading the index
+        """
+        index_files = [path for path in self.index_files() if path.exists()]
+        file_bytes = sum(path.stat().st_size for path in index_files)
+        stats = {
+            "load_mode": self.index_load_mode,
+            "mmapped": self.index_mmapped,
+            "index_file_bytes": file_bytes,
+            "resident_bytes": 0,
+            "mapped_bytes": 0,
+            "load_seconds": self.index_load_seconds,
+        }
+        if self.index is None:
+            return stats
+
+        if self.index_mmapped:
+            usage = [_mapped_file_usage(path) for path in index_files]
+            if all(mapped is not None for mapped, _ in usage):
+                stats["mapped_bytes"] = sum(mapped for mapped, _ in usage)
+                stats["resident_bytes"] = sum(resident for _, resident in usage)
+            else:
+                stats["mapped_bytes"] = file_bytes
+                stats["resident_bytes"] = None
+        else:
+            # The serialized index is a near-exact image of the in-memory structures
+            stats["resident_bytes"] = file_bytes
+        return stats
 
     def get_summary(self) -> Dict[str, Any]:
         """
@@ -130,18 +728,64 @@ class VectorStoreLoader:
         Returns:
             Dictionary with summary statistics
         """
-        summary_path = self.vector_store_dir / "sampling_summary.json"
+        summary_path = self.store_dir / "sampling_summary.json"
         if summary_path.exists():
             with open(summary_path, "r") as f:
-                return json.load(f)
+                summary = json.load(f)
         else:
-            return {
+            summary = {
                 "total_chunks": len(self.chunks),
                 "total_vectors": self.index.ntotal if self.index else 0,
                 "embedding_model": self.model_name,
                 "embedding_dimension": self.embedding_dimension,
             }
+        summary["index_memory"] = self.get_index_memory()
+        if self.index is not None:
+            summary["index"] = describe_index(self.index)
+        summary["embedding_backend"] = self.active_embedding_backend
+        summary["build_id"] = self.manifest.get("build_id") if self.manifest else None
+        summary["store_version"] = self.snapshot.version if self.snapshot else None
+        if self.snapshot is not None and self.snapshot.delta_sequence:
+            summary["delta"] = {
+                "sequence": self.snapshot.delta_sequence,
+                "appended_rows": self.snapshot.chunk_store.num_rows
+                - self.snapshot.base_chunk_store.num_rows,
+                "withdrawn_rows": len(getattr(self.snapshot.index, "removed_rows", [])),
+            }
+        return summary
 
     def is_loaded(self) -> bool:
         """Check if vector store is loaded."""
         return self.index is not None and len(self.chunks) > 0
+
+
+def _mapped_file_usage(path: Path) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Return (mapped_bytes, resident_bytes) for all mappings of a file in this process.
+
+    Reads /proc/self/smaps, so it only reports on Linux; other platforms get (None, None).
+    """
+    smaps_path = Path("/proc/self/smaps")
+    if not smaps_path.exists():
+        return None, None
+
+    target = os.path.realpath(path)
+    mapped = resident = 0
+    in_target = False
+    try:
+        with open(smaps_path, "r") as f:
+            for line in f:
+                fields = line.split()
+                if not fields:
+                    continue
+                if "-" in fields[0] and not fields[0].endswith(":"):
+                    # Mapping header: "start-end perms offset dev inode [pathname]"
+                    header = line.split(None, 5)
+                    in_target = len(header) == 6 and header[5].strip() == target
+                elif in_target and fields[0] == "Size:":
+                    mapped += int(fields[1]) * 1024
+                elif in_target and fields[0] == "Rss:":
+                    resident += int(fields[1]) * 1024
+    except OSError:
+        return None, None
+    return mapped, resident
@@ -33,3 +33,99 @@ def reset_path():
     yield
     # Any cleanup can go here if needed
 
+
+class FakeEmbeddingModel:
+    """
+    Deterministic bag-of-words stand-in for SentenceTransformer.
+
+    Each word is hashed to one dimension, so texts sharing words get a high
+    cosine similarity. Lets retrieval tests run without downloading a model.
+    """
+
+    def __init__(self, model_name_or_path: str = "fake-model", dimension: int = 32, **kwargs):
+        self.model_name = model_name_or_path
+        self.dimension = dimension
+        self.encode_calls = 0
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences, convert_to_numpy=True, batch_size=32,
+               show_progress_bar=False, normalize_embeddings=False, **kwargs):
+        import zlib
+        import numpy as np
+
+        self.encode_calls += 1
+        vectors = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for word in sentence.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % self.dimension] += 1.0
+            vectors[row, self.dimension - 1] += 0.1  # avoid all-zero vectors
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+SAMPLE_COMPLAINTS = [
+    ("Credit Cards", "unexpected annual fee charged on my credit card statement"),
+    ("Credit Cards", "fraudulent charges appeared on my card and the bank refused a refund"),
+    ("Credit Cards", "the apr on my credit card increased without notice"),
+    ("Personal Loans", "loan application was denied without explanation"),
+    ("Personal Loans", "payday loan lender charged excessive interest and fees"),
+    ("Savings Accounts", "bank froze my savings account and would not explain why"),
+    ("Savings Accounts", "overdraft fee charged on my checking account twice"),
+    ("Money Transfers", "zelle money transfer was delayed for two weeks"),
+    ("Money Transfers", "wire transfer never arrived and customer service was unhelpful"),
+    ("Money Transfers", "money transfer fee was higher than advertised"),
+]
+
+
+@pytest.fixture
+def fake_embedding_model(monkeypatch):
+    """Replace SentenceTransformer in the loader with FakeEmbeddingModel."""
+    import src.vector_store_loader as vector_store_loader
+
+    monkeypatch.setattr(vector_store_loader, "SentenceTransformer", FakeEmbeddingModel)
+    return FakeEmbeddingModel
+
+
+@pytest.fixture
+def sample_records():
+    """Chunk texts and metadata for SAMPLE_COMPLAINTS (two chunks per complaint)."""
+    chunks, metadata = [], []
+    for complaint_id, (category, text) in enumerate(SAMPLE_COMPLAINTS):
+        words = text.split()
+        halves = [" ".join(words[: len(words) // 2 + 1]), " ".join(words[len(words) // 2 - 1:])]
+        for chunk_index, chunk in enumerate(halves):
+            chunks.append(chunk)
+            metadata.append({
+                "complaint_id": str(complaint_id),
+                "product_category": category,
+                "date_received": f"2023-{complaint_id + 1:02d}-15",
+                "chunk_index": chunk_index,
+                "total_chunks": len(halves),
+            })
+    return chunks, metadata
+
+
+@pytest.fixture
+def vector_store_dir(tmp_path, sample_records):
+    """Write a small flat FAISS index and columnar chunk store built with FakeEmbeddingModel."""
+    faiss = pytest.importorskip("faiss")
+    from src.chunk_store import ChunkStore
+
+    chunks, metadata = sample_records
+    model = FakeEmbeddingModel()
+    embeddings = model.encode(chunks, normalize_embeddings=True)
+    index = faiss.IndexFlatIP(model.dimension)
+    index.add(embeddings)
+
+    store_dir = tmp_path / "vector_store"
+    store_dir.mkdir()
+    faiss.write_index(index, str(store_dir / "complaint_embeddings.index"))
+    ChunkStore.from_records(
+        chunks,
+        metadata,
+        {"model_name": "fake-model", "embedding_dimension": model.dimension},
+    ).save(store_dir / "chunk_store")
+    return store_dir
@@ -39,3 +39,20 @@ def test_src_init():
     assert hasattr(src, '__version__')
     assert src.__version__ == "1.0.0"
 
+
+def test_query_rag_streams_sources_before_answer(vector_store_dir, fake_embedding_model, monkeypatch):
+    """Test that query_rag shows the sources before the answer is generated."""
+    import app
+    import src.rag_pipeline as rag_pipeline
+    from tests.test_rag_pipeline import FakeGenerator
+
+    monkeypatch.setattr(rag_pipeline, "Generator", FakeGenerator)
+    monkeypatch.setattr(app, "pipeline", rag_pipeline.RAGPipeline(vector_store_dir, top_k=3))
+    monkeypatch.setattr(app, "MIN_SIMILARITY_THRESHOLD", -1.0)
+    updates = list(app.query_rag("What complaints mention a credit card annual fee?", []))
+
+    first_answer, first_sources = updates[0]
+    assert "Generating answer" in first_answer
+    assert "Retrieved Complaint Sources (3 relevant sources)" in first_sources
+    assert "generated answer" in updates[-1][0]
+    assert all(sources == first_sources for _, sources in updates)
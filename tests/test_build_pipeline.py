@@ -0,0 +1,149 @@
+"""
+Unit tests for src/build_pipeline.py (streaming, resumable vector store builds).
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pd = pytest.importorskip("pandas")
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("langchain_text_splitters")
+
+from src.build_pipeline import BuildPipeline, CHECKPOINT_FILENAME
+from src.vector_store_loader import VectorStoreLoader
+from src.retriever import Retriever
+from tests.conftest import FakeEmbeddingModel, SAMPLE_COMPLAINTS
+
+PRODUCTS = {
+    "Credit Cards": "Credit card or prepaid card",
+    "Personal Loans": "Payday loan, title loan, or personal loan",
+    "Savings Accounts": "Checking or savings account",
+    "Money Transfers": "Money transfer, virtual currency, or money service",
+}
+
+
+@pytest.fixture
+def complaints_csv(tmp_path):
+    rows = [
+        {
+            "Date received": f"2023-{i + 1:02d}-15",
+            "Product": PRODUCTS[category],
+            "Issue": "unused column",
+            "narrative": text,
+            "cleaned_word_count": len(text.split()),
+        }
+        for i, (category, text) in enumerate(SAMPLE_COMPLAINTS)
+    ]
+    rows.insert(3, {"Date received": "2023-03-01", "Product": "Mortgage",
+                    "Issue": "", "narrative": "escrow problem", "cleaned_word_count": 2})
+    rows.insert(5, {"Date received": "2023-03-02", "Product": PRODUCTS["Credit Cards"],
+                    "Issue": "", "narrative": None, "cleaned_word_count": None})
+    csv_path = tmp_path / "filtered_complaints.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    return csv_path
+
+
+class FailingEmbeddingModel(FakeEmbeddingModel):
+    """Crashes on the n-th encode call, like a build killed mid-way."""
+
+    def __init__(self, fail_on_call: int):
+        super().__init__()
+        self.fail_on_call = fail_on_call
+
+    def encode(self, sentences, **kwargs):
+        if self.encode_calls + 1 == self.fail_on_call:
+            raise RuntimeError("simulated crash")
+        return super().encode(sentences, **kwargs)
+
+
+def _pipeline(csv_path, output_dir, model, **kwargs):
+    options = dict(model_name="fake-model", embedding_model=model, batch_rows=4,
+                   embed_block_size=3, workers=0)
+    options.update(kwargs)
+    return BuildPipeline(csv_path, output_dir, **options)
+
+
+def test_build_writes_loadable_store(complaints_csv, tmp_path, fake_embedding_model):
+    output_dir = tmp_path / "vector_store"
+    manifest = _pipeline(complaints_csv, output_dir, FakeEmbeddingModel(), workers=2).run()
+
+    assert manifest["vector_count"] == len(SAMPLE_COMPLAINTS)
+    assert set(manifest["throughput"]) >= {"read", "chunk", "embed", "write"}
+    assert manifest["throughput"]["read"]["items"] == len(SAMPLE_COMPLAINTS) + 2
+    assert not (output_dir / ".build").exists()
+
+    loader = VectorStoreLoader(output_dir)
+    assert loader.load()
+    # Row positions become complaint ids; the Mortgage row and empty narrative are skipped
+    ids = [m["complaint_id"] for m in loader.metadata]
+    assert ids == ["0", "1", "2", "4", "6", "7", "8", "9", "10", "11"]
+    assert loader.get_summary()["category_distribution"]["Money Transfers"] == 3
+    results = Retriever(loader, top_k=1).retrieve("zelle money transfer delayed")
+    assert results[0]["metadata"]["product_category"] == "Money Transfers"
+
+
+def test_interrupted_build_resumes_from_checkpoint(complaints_csv, tmp_path):
+    reference = _pipeline(complaints_csv, tmp_path / "reference", FakeEmbeddingModel()).run()
+
+    output_dir = tmp_path / "vector_store"
+    with pytest.raises(RuntimeError, match="simulated crash"):
+        _pipeline(complaints_csv, output_dir, FailingEmbeddingModel(fail_on_call=3)).run()
+    assert (output_dir / ".build" / CHECKPOINT_FILENAME).exists()
+
+    model = FakeEmbeddingModel()
+    resumed = _pipeline(complaints_csv, output_dir, model).run()
+    # 10 chunks in blocks of 3: two blocks were checkpointed, two remain
+    assert model.encode_calls == 2
+    assert resumed["files"]["complaint_embeddings.index"]["sha256"] == (
+        reference["files"]["complaint_embeddings.index"]["sha256"]
+    )
+
+
+def test_rebuild_reuses_cached_embeddings(complaints_csv, tmp_path):
+    output_dir = tmp_path / "vector_store"
+    first = _pipeline(complaints_csv, output_dir, FakeEmbeddingModel()).run()
+    assert first["embedding_cache"]["misses"] == len(SAMPLE_COMPLAINTS)
+
+    model = FakeEmbeddingModel()
+    second = _pipeline(complaints_csv, output_dir, model).run()
+    assert model.encode_calls == 0
+    assert second["embedding_cache"]["hit_rate"] == 1.0
+    assert ".embedding_cache" not in " ".join(second["files"])
+
+
+def test_rebuild_with_other_shard_count_replaces_index(complaints_csv, tmp_path, fake_embedding_model):
+    output_dir = tmp_path / "vector_store"
+    reference = _pipeline(complaints_csv, tmp_path / "reference", FakeEmbeddingModel()).run()
+    for num_shards in (2, 1, 3):
+        manifest = _pipeline(
+            complaints_csv, output_dir, FakeEmbeddingModel(), num_shards=num_shards
+        ).run()
+        assert manifest["num_shards"] == num_shards
+        loader = VectorStoreLoader(output_dir)
+        assert loader.load()
+        assert loader.index.ntotal == reference["vector_count"]
+        if num_shards == 1:
+            assert not (output_dir / "shards.json").exists()
+            assert manifest["files"]["complaint_embeddings.index"] == (
+                reference["files"]["complaint_embeddings.index"]
+            )
+        else:
+            assert not (output_dir / "complaint_embeddings.index").exists()
+            assert len(loader.index.shards) == num_shards
+        results = Retriever(loader, top_k=1).retrieve("zelle money transfer delayed")
+        assert results[0]["metadata"]["product_category"] == "Money Transfers"
+
+
+def test_stratified_sample(complaints_csv, tmp_path):
+    pipeline = _pipeline(complaints_csv, tmp_path / "vector_store", FakeEmbeddingModel(),
+                         sample_size=4)
+    rows = pipeline.sample_rows()
+    assert len(rows) == 4
+    manifest = pipeline.run()
+    assert manifest["vector_count"] == 4
@@ -0,0 +1,83 @@
+"""
+Unit tests for src/chunk_store.py.
+
+Covers the columnar encoding round trip and the pickle converter.
+"""
+
+import pickle
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip("numpy")
+
+from src.chunk_store import ChunkStore, convert_pickle_to_chunk_store
+
+
+CHUNKS = [
+    "i was charged a late fee twice",
+    "my money transfer was delayed for ten days – über annoying",
+    "the bank closed my savings account",
+    "",
+]
+
+METADATA = [
+    {"complaint_id": "101", "product_category": "Credit Cards", "product": "Credit card",
+     "date_received": "2023-01-15", "chunk_index": 0, "total_chunks": 1, "original_word_count": 7},
+    {"complaint_id": "205", "product_category": "Money Transfers", "product": "Money transfer",
+     "date_received": None, "chunk_index": 0, "total_chunks": 2, "original_word_count": 120.0},
+    {"complaint_id": "205", "product_category": "Money Transfers", "product": "Money transfer",
+     "date_received": "2023-03-02", "chunk_index": 1, "total_chunks": 2, "original_word_count": 120.0},
+    {"complaint_id": "9", "product_category": "Savings Accounts", "product": "Checking or savings",
+     "date_received": "2022-12-31", "chunk_index": 0, "total_chunks": 1, "original_word_count": 5},
+]
+
+
+def test_round_trip_through_disk(tmp_path):
+    attributes = {"model_name": "sentence-transformers/all-MiniLM-L6-v2", "embedding_dimension": 384}
+    ChunkStore.from_records(CHUNKS, METADATA, attributes).save(tmp_path / "store")
+
+    store = ChunkStore.open(tmp_path / "store")
+    assert store.attributes == attributes
+    assert len(store.chunks) == len(store.metadata) == 4
+    assert list(store.chunks) == CHUNKS
+    assert list(store.metadata) == METADATA
+    assert store.chunks[-1] == CHUNKS[-1]
+    assert store.metadata[1:3] == METADATA[1:3]
+
+
+def test_columns_are_typed_and_memory_mapped(tmp_path):
+    ChunkStore.from_records(CHUNKS, METADATA).save(tmp_path / "store")
+    store = ChunkStore.open(tmp_path / "store")
+
+    assert store.column_kind("complaint_id") == "int"
+    assert store.column_kind("date_received") == "date"
+    assert store.column_kind("chunk_index") == "int"
+    assert store.column_values("date_received").dtype == np.dtype("datetime64[D]")
+    assert isinstance(store.column_values("total_chunks"), np.memmap)
+    assert store.get_field(2, "product_category") == "Money Transfers"
+    assert store.get_field(2, "missing", "N/A") == "N/A"
+
+
+def test_out_of_range_row_raises():
+    store = ChunkStore.from_records(CHUNKS, METADATA)
+    with pytest.raises(IndexError):
+        store.metadata[len(METADATA)]
+
+
+def test_convert_pickle(tmp_path):
+    pickle_path = tmp_path / "chunk_metadata.pkl"
+    with open(pickle_path, "wb") as f:
+        pickle.dump({"chunks": CHUNKS, "metadata": METADATA, "model_name": "m",
+                     "embedding_dimension": 8, "total_chunks": 4}, f)
+
+    output_dir = convert_pickle_to_chunk_store(pickle_path)
+    store = ChunkStore.open(output_dir)
+    assert output_dir == tmp_path / "chunk_store"
+    assert store.attributes["embedding_dimension"] == 8
+    assert list(store.chunks) == CHUNKS
+    assert list(store.metadata) == METADATA
@@ -0,0 +1,78 @@
+"""
+Unit tests for src/concurrency.py and concurrent RAGPipeline queries.
+"""
+
+import threading
+import pytest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.concurrency import QueryExecutor, ThreadBudget
+
+
+@pytest.fixture
+def restore_torch_threads():
+    """Query workers set torch's process-wide thread count; restore it afterwards."""
+    torch = pytest.importorskip("torch")
+    threads = torch.get_num_threads()
+    yield
+    torch.set_num_threads(threads)
+
+
+def test_thread_budget_splits_threads_between_workers():
+    budget = ThreadBudget(query_workers=4, total_threads=16)
+    assert (budget.faiss_threads, budget.torch_threads) == (4, 4)
+    budget = ThreadBudget(query_workers=16, total_threads=8, faiss_threads=1)
+    assert (budget.faiss_threads, budget.torch_threads) == (1, 1)
+    with pytest.raises(ValueError):
+        ThreadBudget(query_workers=0)
+
+
+def test_query_executor_bounds_in_flight_queries(restore_torch_threads):
+    pytest.importorskip("faiss")
+    executor = QueryExecutor(ThreadBudget(query_workers=2, total_threads=2), max_pending=1)
+    release = threading.Event()
+    try:
+        futures = [executor.submit(release.wait, 10) for _ in range(3)]
+        with pytest.raises(RuntimeError):
+            executor.submit(release.wait, 10)
+        assert executor.get_stats()["rejected"] == 1
+        release.set()
+        assert all(f.result(timeout=10) for f in futures)
+
+        # Nested run() calls on a worker execute inline instead of deadlocking
+        assert executor.run(lambda: executor.in_worker() and executor.run(lambda: 42)) == 42
+        assert not executor.in_worker()
+        stats = executor.get_stats()
+        assert stats["in_flight"] == 0 and stats["completed"] == 4
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_concurrent_pipeline_queries_match_serial(
+    vector_store_dir, fake_embedding_model, monkeypatch, restore_torch_threads
+):
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("transformers")
+    import src.rag_pipeline as rag_pipeline
+    from tests.test_rag_pipeline import FakeGenerator
+
+    monkeypatch.setattr(rag_pipeline, "Generator", FakeGenerator)
+    pipeline = rag_pipeline.RAGPipeline(vector_store_dir, top_k=3, query_workers=4, total_threads=4)
+    questions = ["credit card annual fee", "zelle transfer delayed", "loan denied", "savings account frozen"] * 8
+    try:
+        serial = [[c.row for c in pipeline.query(q)["retrieved_chunks"]] for q in questions]
+        with ThreadPoolExecutor(max_workers=16) as clients:
+            concurrent = list(clients.map(lambda q: [c.row for c in pipeline.query(q)["retrieved_chunks"]], questions))
+        assert concurrent == serial
+        pool = pipeline.get_pipeline_info()["query_pool"]
+        assert pool["query_workers"] == 4 and pool["torch_threads"] == 1
+        assert pool["completed"] == 2 * len(questions) and pool["rejected"] == 0
+    finally:
+        pipeline.close()
@@ -0,0 +1,185 @@
+"""
+Unit tests for src/delta_store.py (appends, withdrawals and compaction).
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("langchain_text_splitters")
+
+from src.chunk_store import ChunkStore, ConcatChunkStore
+from src.delta_store import DeltaStore, LiveIndex, read_delta_state
+from src.store_builder import write_vector_store
+from src.store_manifest import resolve_active_dir
+from src.vector_store_loader import VectorStoreLoader
+from src.retriever import Retriever
+from tests.conftest import FakeEmbeddingModel
+
+NEW_COMPLAINTS = [
+    {
+        "complaint_id": "100",
+        "narrative": "crypto exchange withdrawal frozen and support ignored my tickets",
+        "product": "Money transfer, virtual currency, or money service",
+        "date_received": "2024-02-01",
+    },
+    {
+        "complaint_id": "101",
+        "narrative": "personal loan servicer lost my autopay enrollment",
+        "product_category": "Personal Loans",
+    },
+]
+
+
+@pytest.fixture
+def loaded(vector_store_dir, fake_embedding_model):
+    loader = VectorStoreLoader(vector_store_dir)
+    assert loader.load()
+    loader.get_snapshot()
+    return loader, Retriever(loader, top_k=5), DeltaStore(vector_store_dir, FakeEmbeddingModel())
+
+
+def _complaint_ids(results):
+    return [r["metadata"]["complaint_id"] for r in results]
+
+
+def test_append_is_searched_with_base(loaded):
+    loader, retriever, delta = loaded
+    base_rows = len(loader.chunks)
+    assert delta.append(NEW_COMPLAINTS) == 2
+
+    query = "crypto exchange withdrawal frozen"
+    assert "100" not in _complaint_ids(retriever.retrieve(query))
+    assert loader.reload()
+    assert loader.get_snapshot().version == "unversioned-1+delta1"
+    results = retriever.retrieve(query)
+    assert results[0]["metadata"]["complaint_id"] == "100"
+    assert results[0]["metadata"]["product_category"] == "Money Transfers"
+    assert len(retriever.chunks) == base_rows + 2
+    assert loader.reload() is False
+
+
+def test_withdraw_hides_complaint_and_keeps_top_k(loaded):
+    loader, retriever, delta = loaded
+    delta.append(NEW_COMPLAINTS)
+    assert delta.withdraw(["0", "100"]) == 2
+    assert delta.withdraw(["0"]) == 0
+    assert loader.reload()
+
+    results = retriever.retrieve("unexpected annual fee charged on my credit card", top_k=5)
+    assert len(results) == 5
+    assert "0" not in _complaint_ids(results)
+    assert "100" not in _complaint_ids(retriever.retrieve("crypto exchange withdrawal frozen"))
+    assert loader.get_summary()["delta"]["withdrawn_rows"] == 3
+
+
+def test_withdraw_matches_integer_complaint_ids(tmp_path, sample_records, fake_embedding_model):
+    # Task 2 pickles keep complaint_id as an int, giving a plain int column
+    chunks, metadata = sample_records
+    metadata = [dict(m, complaint_id=int(m["complaint_id"])) for m in metadata]
+    model = FakeEmbeddingModel()
+    store_dir = tmp_path / "int_ids"
+    store_dir.mkdir()
+    index = faiss.IndexFlatIP(model.dimension)
+    index.add(model.encode(chunks, normalize_embeddings=True))
+    faiss.write_index(index, str(store_dir / "complaint_embeddings.index"))
+    ChunkStore.from_records(
+        chunks, metadata, {"model_name": "fake-model", "embedding_dimension": model.dimension}
+    ).save(store_dir / "chunk_store")
+
+    loader = VectorStoreLoader(store_dir)
+    assert loader.load()
+    loader.get_snapshot()
+    retriever = Retriever(loader, top_k=5)
+    assert DeltaStore(store_dir, model).withdraw([0]) == 1
+    assert loader.reload()
+    assert loader.get_summary()["delta"]["withdrawn_rows"] == 2
+    assert 0 not in _complaint_ids(retriever.retrieve("unexpected annual fee charged on my credit card"))
+
+
+def test_compaction_publishes_equivalent_build(loaded):
+    loader, retriever, delta = loaded
+    delta.append(NEW_COMPLAINTS)
+    delta.withdraw(["3"])
+    loader.reload()
+    query = "loan denied without explanation"
+    before = retriever.retrieve(query, top_k=8)
+
+    build_id = delta.compact()
+    assert resolve_active_dir(loader.vector_store_dir).name == build_id
+    assert read_delta_state(resolve_active_dir(loader.vector_store_dir))["sequence"] == 0
+    assert loader.reload()
+    assert loader.get_snapshot().version == build_id
+
+    after = retriever.retrieve(query, top_k=8)
+    assert [r["chunk"] for r in after] == [r["chunk"] for r in before]
+    assert [r["similarity_score"] for r in after] == pytest.approx(
+        [r["similarity_score"] for r in before]
+    )
+    assert len(loader.chunks) == 20 + 2 - 2
+    assert delta.compact() is None
+
+
+def test_live_index_is_exact_top_k_over_live_rows():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 16)).astype(np.float32)
+    queries = rng.standard_normal((5, 16)).astype(np.float32)
+    flat = faiss.IndexFlatIP(16)
+    flat.add(vectors)
+    _, top = flat.search(queries, 20)
+    # Tombstone some of the best hits and many rows that never rank
+    removed = np.unique(np.concatenate([top[:, :6].ravel(), np.arange(100, 200)]))
+    live = np.setdiff1d(np.arange(200), removed)
+
+    distances, labels = LiveIndex(flat, removed).search(queries, 8)
+    expected = live[np.argsort(-(queries @ vectors[live].T), axis=1)[:, :8]]
+    np.testing.assert_array_equal(labels, expected)
+    assert not np.isin(labels, removed).any()
+
+
+def test_compaction_reembeds_quantized_builds(tmp_path, sample_records, fake_embedding_model):
+    np = pytest.importorskip("numpy")
+    chunks, metadata = sample_records
+    model = FakeEmbeddingModel()
+    embeddings = model.encode(chunks, normalize_embeddings=True)
+    store_dir = tmp_path / "sq8"
+    write_vector_store(store_dir, chunks, metadata, embeddings, "fake-model", index_type="sq8")
+    encoded = []
+
+    class CountingModel(FakeEmbeddingModel):
+        def encode(self, sentences, **kwargs):
+            encoded.extend(sentences)
+            return super().encode(sentences, **kwargs)
+
+    delta = DeltaStore(store_dir, CountingModel(), use_embedding_cache=False)
+    delta.withdraw(["0"])
+    delta.compact()
+    assert sorted(encoded) == sorted(chunks[2:])
+
+    loader = VectorStoreLoader(store_dir)
+    assert loader.load()
+    index = loader.get_snapshot().index
+    assert index.ntotal == 18
+    # Quantized once from the original embeddings
+    np.testing.assert_allclose(index.reconstruct_n(0, 18), embeddings[2:], atol=0.02)
+
+
+def test_concat_store_remaps_category_codes(sample_records):
+    chunks, metadata = sample_records
+    first = ChunkStore.from_records(chunks[:6], metadata[:6])
+    second = ChunkStore.from_records(chunks[6:], metadata[6:])
+    combined = ConcatChunkStore([first, second])
+
+    assert combined.num_rows == 20
+    assert combined.metadata[7] == metadata[7]
+    categories = combined.column_categories("product_category")
+    codes = combined.column_values("product_category")
+    assert [categories[c] for c in codes] == [m["product_category"] for m in metadata]
+    assert list(combined.find_rows("complaint_id", ["1", "9"])) == [2, 3, 18, 19]
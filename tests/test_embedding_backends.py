@@ -0,0 +1,102 @@
+"""
+Unit tests for src/embedding_backends.py and backend selection in VectorStoreLoader.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip("numpy")
+
+from src.embedding_backends import cosine_agreement, sample_rows
+from tests.conftest import FakeEmbeddingModel
+
+
+class PerturbedModel(FakeEmbeddingModel):
+    """FakeEmbeddingModel with noise added, like a badly exported model."""
+
+    def encode(self, sentences, **kwargs):
+        vectors = super().encode(sentences, **kwargs)
+        return vectors + np.random.default_rng(0).normal(0, 0.5, vectors.shape).astype(np.float32)
+
+
+def test_sample_rows_spread_and_bounded():
+    assert list(sample_rows(5, 32)) == [0, 1, 2, 3, 4]
+    rows = sample_rows(1000, 32)
+    assert len(rows) == 32 and rows[0] == 0 and rows[-1] == 999
+    assert len(sample_rows(0)) == 0
+
+
+def test_onnx_backend_falls_back_to_torch_without_export(vector_store_dir, fake_embedding_model):
+    pytest.importorskip("sentence_transformers")
+    from src.vector_store_loader import VectorStoreLoader
+
+    with pytest.raises(ValueError):
+        VectorStoreLoader(vector_store_dir, embedding_backend="tensorrt")
+
+    loader = VectorStoreLoader(vector_store_dir, embedding_backend="onnx_int8")
+    assert loader.load()
+    assert loader.active_embedding_backend == "torch"
+    assert isinstance(loader.embedding_model, FakeEmbeddingModel)
+    assert loader.get_summary()["embedding_backend"] == "torch"
+
+
+def test_verify_embedding_backend_against_index(vector_store_dir, fake_embedding_model):
+    pytest.importorskip("sentence_transformers")
+    from src.vector_store_loader import VectorStoreLoader
+
+    loader = VectorStoreLoader(vector_store_dir)
+    assert loader.load()
+    rows = sample_rows(loader.index.ntotal)
+    texts = [loader.chunk_store.get_text(int(row)) for row in rows]
+    reference = loader.index.reconstruct_batch(rows)
+    assert cosine_agreement(FakeEmbeddingModel(), texts, reference) == pytest.approx(1.0, abs=1e-5)
+
+    # An encoder that agrees with the index is kept
+    loader.embedding_model, loader.active_embedding_backend = FakeEmbeddingModel(), "onnx"
+    assert loader.verify_embedding_backend() == pytest.approx(1.0, abs=1e-5)
+    assert loader.active_embedding_backend == "onnx"
+
+    # One that disagrees is replaced by the torch model
+    loader.embedding_model, loader.active_embedding_backend = PerturbedModel(), "onnx_int8"
+    assert loader.verify_embedding_backend() < 0.98
+    assert loader.active_embedding_backend == "torch"
+    assert type(loader.embedding_model) is FakeEmbeddingModel
+
+
+def test_onnx_export_matches_torch(tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    transformers = pytest.importorskip("transformers")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    from src.embedding_backends import OnnxEmbeddingModel, export_onnx
+
+    # Tiny randomly initialised BERT, so the test needs no model download
+    model_dir = tmp_path / "tiny-bert"
+    model_dir.mkdir()
+    words = ["account", "bank", "card", "charged", "fee", "loan", "refund", "transfer"]
+    (model_dir / "vocab.txt").write_text(
+        "\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words) + "\n"
+    )
+    transformers.BertTokenizerFast(str(model_dir / "vocab.txt")).save_pretrained(str(model_dir))
+    config = transformers.BertConfig(
+        vocab_size=5 + len(words), hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64,
+    )
+    transformers.BertModel(config).save_pretrained(str(model_dir))
+    model = sentence_transformers.SentenceTransformer(str(model_dir), device="cpu")
+
+    texts = ["card fee charged", "loan transfer", "bank refund account fee"]
+    reference = model.encode(texts, normalize_embeddings=True)
+    info = export_onnx(model, "tiny-bert", tmp_path / "build", texts, reference)
+    assert info["variants"]["onnx"]["verified"]
+    assert info["variants"]["onnx"]["min_cosine"] > 0.9999
+
+    onnx_model = OnnxEmbeddingModel(tmp_path / "build" / "onnx", "onnx")
+    vectors = onnx_model.encode(["card fee", "bank account refund"], normalize_embeddings=True)
+    expected = model.encode(["card fee", "bank account refund"], normalize_embeddings=True)
+    np.testing.assert_allclose(vectors, expected, atol=1e-4)
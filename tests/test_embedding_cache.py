@@ -0,0 +1,92 @@
+"""
+Unit tests for src/embedding_cache.py.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip("numpy")
+
+from src.embedding_cache import CachedEncoder, EmbeddingCache
+from tests.conftest import FakeEmbeddingModel
+
+TEXTS = [f"complaint chunk number {i} about fees" for i in range(10)]
+
+
+def test_cache_persists_and_counts_hits(tmp_path):
+    model = FakeEmbeddingModel()
+    cache = EmbeddingCache(tmp_path, "fake-model")
+    encoder = CachedEncoder(cache, lambda: model)
+    first = encoder.encode(TEXTS[:6])
+    assert model.encode_calls == 1
+    assert cache.get_stats()["misses"] == 6
+
+    reopened = EmbeddingCache(tmp_path, "fake-model")
+    encoder = CachedEncoder(reopened, lambda: model)
+    second = encoder.encode(TEXTS)
+    np.testing.assert_array_equal(second[:6], first)
+    np.testing.assert_array_equal(second, model.encode(TEXTS))
+    stats = reopened.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (6, 4, 10)
+
+    # Other model or normalization: separate namespace
+    assert EmbeddingCache(tmp_path, "fake-model", normalize=True).lookup(TEXTS) == [None] * 10
+    assert EmbeddingCache(tmp_path, "other-model").lookup(TEXTS) == [None] * 10
+
+
+def test_fully_cached_encode_never_loads_model(tmp_path):
+    cache = EmbeddingCache(tmp_path, "fake-model")
+    cache.add(TEXTS, FakeEmbeddingModel().encode(TEXTS))
+
+    def load_model():
+        raise AssertionError("model should not be loaded")
+
+    vectors = CachedEncoder(cache, load_model).encode(TEXTS[::-1])
+    np.testing.assert_array_equal(vectors, FakeEmbeddingModel().encode(TEXTS[::-1]))
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path):
+    row_bytes = FakeEmbeddingModel().dimension * 4
+    cache = EmbeddingCache(tmp_path, "fake-model", max_bytes=5 * row_bytes)
+    vectors = FakeEmbeddingModel().encode(TEXTS)
+    cache.add(TEXTS[:5], vectors[:5])
+    cache.lookup(TEXTS[:2])  # touch the first two
+    cache.add(TEXTS[5:7], vectors[5:7])
+
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 5 * row_bytes
+    assert stats["evictions"] == 7 - stats["entries"]
+    found = cache.lookup(TEXTS[:7])
+    assert found[0] is not None and found[1] is not None and found[6] is not None
+    assert found[2] is None
+    np.testing.assert_array_equal(found[6], vectors[6])
+
+    reopened = EmbeddingCache(tmp_path, "fake-model", max_bytes=5 * row_bytes)
+    assert len(reopened) == stats["entries"]
+    np.testing.assert_array_equal(reopened.lookup([TEXTS[1]])[0], vectors[1])
+
+
+def test_crash_during_eviction_keeps_cache_consistent(tmp_path, monkeypatch):
+    row_bytes = FakeEmbeddingModel().dimension * 4
+    vectors = FakeEmbeddingModel().encode(TEXTS)
+    cache = EmbeddingCache(tmp_path, "fake-model", max_bytes=5 * row_bytes)
+    cache.add(TEXTS[:5], vectors[:5])
+
+    # Crash after the compacted vector file is written, before its index is
+    def crash():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache, "_write_index", crash)
+    with pytest.raises(OSError):
+        cache.add(TEXTS[5:7], vectors[5:7])
+
+    reopened = EmbeddingCache(tmp_path, "fake-model", max_bytes=5 * row_bytes)
+    assert len(reopened) == 5
+    found = reopened.lookup(TEXTS[:5])
+    np.testing.assert_array_equal(np.stack(found), vectors[:5])
+    assert [p.name for p in cache.directory.glob("vectors*.f32")] == ["vectors.f32"]
@@ -0,0 +1,68 @@
+"""
+Unit tests for src/filtered_search.py (pre-filtered top-k search).
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+faiss = pytest.importorskip("faiss")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sentence_transformers")
+
+from src.delta_store import LiveIndex
+from src.filtered_search import RowFilter, search_filtered
+from src.index_types import build_index
+from src.sharded_index import ShardedIndex
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((2000, 16)).astype(np.float32)
+    faiss.normalize_L2(data)
+    return data
+
+
+def _brute_force(vectors, queries, k, rows):
+    scores = queries @ vectors[rows].T
+    return rows[np.argsort(-scores, axis=1, kind="stable")[:, :k]]
+
+
+def test_sharded_filtered_search_is_exact(vectors):
+    rows = np.arange(3, 2000, 17)
+    shards = [build_index(vectors[start:end]) for start, end in [(0, 700), (700, 1500), (1500, 2000)]]
+    index = ShardedIndex(shards, [0, 700, 1500])
+
+    distances, labels = search_filtered(index, vectors[:5], 10, RowFilter(rows))
+    np.testing.assert_array_equal(labels, _brute_force(vectors, vectors[:5], 10, rows))
+    assert np.all(np.diff(distances, axis=1) <= 1e-6)
+
+    # Fewer allowed rows than k: every allowed row, then -1 padding
+    _, labels = search_filtered(index, vectors[:1], 5, RowFilter(np.array([10, 1600])))
+    assert sorted(labels[0, :2]) == [10, 1600] and list(labels[0, 2:]) == [-1] * 3
+
+
+@pytest.mark.parametrize("index_type", ["ivf_flat", "hnsw"])
+def test_small_filter_on_ann_index_still_returns_k(vectors, index_type):
+    # 12 scattered rows: one IVF probe / a small HNSW beam rarely reaches them all
+    rows = np.arange(0, 2000, 167)
+    index = build_index(vectors, index_type, nlist=32)
+    queries = vectors[1000:1010]
+
+    _, labels = search_filtered(index, queries, 8, RowFilter(rows), nprobe=1, ef_search=8)
+    assert (labels >= 0).all()
+    assert np.isin(labels, rows).all()
+    np.testing.assert_array_equal(labels, _brute_force(vectors, queries, 8, rows))
+
+
+def test_tombstoned_rows_are_never_returned(vectors):
+    index = LiveIndex(build_index(vectors), np.array([5, 22]))
+    rows = np.arange(0, 40)
+    _, labels = search_filtered(index, vectors[[5, 22]], 3, RowFilter(rows))
+    assert not np.isin(labels, [5, 22]).any()
+    assert (labels >= 0).all()
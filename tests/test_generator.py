@@ -0,0 +1,139 @@
+"""
+Unit tests for src/generator.py, using a tiny randomly initialized GPT-2.
+"""
+
+import threading
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+import src.generator as generator_module
+from src.generator import Generator
+
+VOCAB = (
+    "<eos> the a credit card fee annual loan bank account transfer money was "
+    "charged late payment customer service why are people unhappy with complaints"
+).split()
+
+
+@pytest.fixture
+def tiny_generator():
+    """Generator around a 2-layer GPT-2 and a word-level tokenizer (no download)."""
+    word_level = tokenizers.Tokenizer(
+        tokenizers.models.WordLevel({word: i for i, word in enumerate(VOCAB)}, unk_token="<eos>")
+    )
+    word_level.pre_tokenizer = tokenizers.pre_tokenizers.WhitespaceSplit()
+    word_level.decoder = tokenizers.decoders.WordPiece()
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=word_level, eos_token="<eos>", pad_token="<eos>"
+    )
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(
+        vocab_size=len(VOCAB), n_positions=128, n_embd=32, n_layer=2, n_head=2,
+        bos_token_id=0, eos_token_id=0,
+    )
+    generator = Generator.__new__(Generator)
+    generator.model_name = "tiny-gpt2"
+    generator.use_local = True
+    generator.device = "cpu"
+    generator._tokenizer_lock = threading.Lock()
+    generator.tokenizer = tokenizer
+    generator.model = transformers.GPT2LMHeadModel(config).eval()
+    generator.prefix_ids = None
+    generator._prefix_cache = None
+    return generator
+
+
+def test_generate_many_matches_per_prompt_generation(tiny_generator):
+    prompts = [
+        "why are people unhappy with credit card fee",
+        "loan",
+        "customer service was late with the money transfer complaints",
+    ]
+    expected = [tiny_generator.generate(p, max_length=6, temperature=0) for p in prompts]
+
+    # Left padding must not change any prompt's continuation (whatever the tokenizer's own side)
+    tiny_generator.tokenizer.padding_side = "right"
+    assert tiny_generator.generate_many(prompts, max_length=6, temperature=0, batch_size=3) == expected
+    assert tiny_generator.tokenizer.padding_side == "right"
+    assert tiny_generator.generate_many(prompts, max_length=6, temperature=0, batch_size=2) == expected
+    with pytest.raises(ValueError):
+        tiny_generator.generate_many(prompts, batch_size=0)
+
+
+def test_generate_many_falls_back_per_prompt(tiny_generator, monkeypatch):
+    def failing_generate(*args, **kwargs):
+        if kwargs.get("attention_mask") is not None:
+            raise RuntimeError("out of memory")
+        return original_generate(*args, **kwargs)
+
+    original_generate = tiny_generator.model.generate
+    monkeypatch.setattr(tiny_generator.model, "generate", failing_generate)
+    prompts = ["credit card fee", "bank account"]
+    answers = tiny_generator.generate_many(prompts, max_length=4, temperature=0)
+    assert answers == [tiny_generator.generate(p, max_length=4, temperature=0) for p in prompts]
+
+    tiny_generator.model = None
+    assert tiny_generator.generate_many(prompts) == [tiny_generator._fallback_generate(p) for p in prompts]
+
+
+def test_generate_stream_yields_the_generated_answer(tiny_generator):
+    prompt = "why are people unhappy with credit card fee"
+    pieces = list(tiny_generator.generate_stream(prompt, max_length=6, temperature=0))
+    assert len(pieces) > 1
+    assert "".join(pieces).strip() == tiny_generator.generate(prompt, max_length=6, temperature=0)
+
+    # Closing the stream early stops the generation thread
+    stream = tiny_generator.generate_stream(prompt, max_length=200, temperature=0)
+    next(stream)
+    stream.close()
+    tiny_generator.model = None
+    assert list(tiny_generator.generate_stream(prompt)) == [tiny_generator._fallback_generate(prompt)]
+
+
+def test_prefix_cache_matches_full_prefill(tiny_generator):
+    prefix = "why are people unhappy with"
+    prompts = [f"{prefix} credit card fee complaints", f"{prefix} the bank", "loan late payment"]
+    expected = [tiny_generator.generate(p, max_length=6, temperature=0) for p in prompts]
+
+    tiny_generator.cache_prefix(prefix)
+    assert tiny_generator.prefix_ids == tiny_generator.tokenizer.encode(prefix)
+    input_ids = tiny_generator.tokenizer.encode(prompts[0], return_tensors="pt")
+    kwargs = tiny_generator._prefix_cache_kwargs(input_ids)
+    assert kwargs["past_key_values"].get_seq_length() == len(tiny_generator.prefix_ids)
+    assert tiny_generator._prefix_cache_kwargs(
+        tiny_generator.tokenizer.encode(prompts[2], return_tensors="pt")
+    ) == {}
+
+    # Next-token distribution after prefilling only the suffix equals the full prefill
+    suffix_ids = input_ids[:, len(tiny_generator.prefix_ids):]
+    with torch.no_grad():
+        full = tiny_generator.model(input_ids).logits[0, -1]
+        cached = tiny_generator.model(suffix_ids, **kwargs).logits[0, -1]
+    assert torch.allclose(torch.softmax(full, -1), torch.softmax(cached, -1), atol=1e-6)
+
+    # The shared cache is copied per request, so repeated generation is unaffected
+    assert [tiny_generator.generate(p, max_length=6, temperature=0) for p in prompts] == expected
+    assert "".join(tiny_generator.generate_stream(prompts[0], max_length=6, temperature=0)).strip() == expected[0]
+
+
+def test_prefix_cache_needs_cache_objects(tiny_generator, monkeypatch):
+    prefix = "why are people unhappy with"
+    prompt = f"{prefix} credit card fee complaints"
+    expected = tiny_generator.generate(prompt, max_length=6, temperature=0)
+
+    # Older transformers: no Cache class, or legacy tuple key/values
+    for cache_class in (None, type("LegacyCache", (), {})):
+        monkeypatch.setattr(generator_module, "Cache", cache_class)
+        tiny_generator.cache_prefix(prefix)
+        assert tiny_generator.prefix_ids is None and tiny_generator._prefix_cache is None
+        assert tiny_generator._prefix_cache_kwargs(tiny_generator.tokenizer.encode(prompt, return_tensors="pt")) == {}
+        assert tiny_generator.generate(prompt, max_length=6, temperature=0) == expected
@@ -0,0 +1,99 @@
+"""
+Unit tests for src/lexical_index.py and hybrid retrieval.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip("numpy")
+
+from src.lexical_index import BM25Index, LexicalSearcher, tokenize
+from tests.conftest import FakeEmbeddingModel, SAMPLE_COMPLAINTS
+
+TEXTS = [text for _, text in SAMPLE_COMPLAINTS]
+
+
+def test_tokenize_drops_stopwords_and_redactions():
+    assert tokenize("The APR on my XXXX card, rose to 29.9%!") == ["apr", "card", "rose", "29", "9"]
+
+
+def test_bm25_roundtrip_and_ranking(tmp_path):
+    index = BM25Index.build(TEXTS)
+    index.save(tmp_path / "bm25")
+    reopened = BM25Index.open(tmp_path / "bm25")
+    assert reopened.num_docs == len(TEXTS)
+    np.testing.assert_array_equal(reopened.doc_ids, index.doc_ids)
+
+    scores, rows = LexicalSearcher([(reopened, 0)]).search("zelle transfer", 3)
+    assert rows[0] == 7  # the only Zelle complaint
+    assert list(scores) == sorted(scores, reverse=True)
+    assert set(rows[1:]) <= {8, 9}
+
+    # Two parts behave like one corpus; allowed / removed rows are honoured
+    split = LexicalSearcher([(BM25Index.build(TEXTS[:5]), 0), (BM25Index.build(TEXTS[5:]), 5)])
+    assert split.search("zelle transfer", 3)[1][0] == 7
+    assert list(split.search("charged", 5, allowed_rows=np.array([0, 4]))[1]) in ([0, 4], [4, 0])
+    assert 7 not in split.search("zelle", 5, removed_rows=np.array([7]))[1]
+    assert len(split.search("the of", 5)[1]) == 0
+
+
+def test_hybrid_retrieval_fuses_rankings(tmp_path, sample_records, fake_embedding_model):
+    pytest.importorskip("faiss")
+    pytest.importorskip("sentence_transformers")
+    from src.store_builder import write_vector_store
+    from src.vector_store_loader import VectorStoreLoader
+    from src.retriever import Retriever
+
+    chunks, metadata = sample_records
+    store_dir = tmp_path / "store"
+    write_vector_store(store_dir, chunks, metadata, FakeEmbeddingModel().encode(chunks), "fake-model")
+    assert (store_dir / "bm25" / "bm25.json").exists()
+
+    loader = VectorStoreLoader(store_dir)
+    assert loader.load()
+    retriever = Retriever(loader, top_k=4, retrieval_mode="hybrid", hybrid_candidates=6)
+    timings = {}
+    results = retriever.retrieve_many(["zelle transfer delayed"], timings=timings)[0]
+
+    assert set(timings) == {"embed", "dense_search", "lexical_search", "fusion"}
+    assert results[0]["metadata"]["complaint_id"] == "7"
+    assert [r["rank"] for r in results] == [1, 2, 3, 4]
+    assert all(r["fusion_score"] > 0 for r in results)
+    scores = [r["fusion_score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    # Similarity is always the dense cosine, also for lexical-only hits
+    dense = {r["metadata"]["complaint_id"] + r["chunk"]: r["similarity_score"]
+             for r in retriever.retrieve("zelle transfer delayed", top_k=20, mode="dense")}
+    for r in results:
+        assert r["similarity_score"] == pytest.approx(dense[r["metadata"]["complaint_id"] + r["chunk"]], abs=1e-5)
+
+    filtered = retriever.retrieve("transfer fee", filters={"product_category": "Credit Cards"})
+    assert {r["metadata"]["product_category"] for r in filtered} == {"Credit Cards"}
+    assert set(retriever.latency.get_stats()) >= {"embed", "lexical_search", "fusion"}
+
+
+def test_hybrid_retrieval_covers_delta_segments(vector_store_dir, fake_embedding_model):
+    pytest.importorskip("faiss")
+    pytest.importorskip("langchain_text_splitters")
+    from src.delta_store import DeltaStore
+    from src.vector_store_loader import VectorStoreLoader
+    from src.retriever import Retriever
+
+    loader = VectorStoreLoader(vector_store_dir)
+    assert loader.load()
+    loader.get_snapshot()
+    delta = DeltaStore(vector_store_dir, FakeEmbeddingModel())
+    delta.append([{"complaint_id": "100", "narrative": "crypto exchange withdrawal frozen",
+                   "product_category": "Money Transfers"}])
+    delta.withdraw(["7"])
+    assert loader.reload()
+
+    retriever = Retriever(loader, top_k=3, retrieval_mode="hybrid")
+    ids = [r["metadata"]["complaint_id"] for r in retriever.retrieve("crypto withdrawal zelle")]
+    assert ids[0] == "100"
+    assert "7" not in ids
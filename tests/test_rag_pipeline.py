@@ -0,0 +1,184 @@
+"""
+Unit tests for src/rag_pipeline.py.
+
+The embedding model and generator are replaced with lightweight fakes.
+"""
+
+import threading
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("transformers")
+
+import src.rag_pipeline as rag_pipeline
+from src.rag_pipeline import RAGPipeline
+
+
+class FakeGenerator:
+    """Generator stand-in whose loading can be held back by a test."""
+
+    release = None
+
+    def __init__(self, model_name="gpt2", **kwargs):
+        if FakeGenerator.release is not None:
+            FakeGenerator.release.wait(timeout=10)
+        self.model_name = model_name
+
+    def generate(self, prompt, **kwargs):
+        return "generated answer"
+
+    def generate_many(self, prompts, **kwargs):
+        return [self.generate(prompt) for prompt in prompts]
+
+    def generate_stream(self, prompt, **kwargs):
+        yield "generated"
+        yield " answer"
+
+    def _fallback_generate(self, prompt):
+        return "fallback answer"
+
+
+@pytest.fixture
+def fake_generator(monkeypatch):
+    monkeypatch.setattr(rag_pipeline, "Generator", FakeGenerator)
+    FakeGenerator.release = None
+    yield FakeGenerator
+    FakeGenerator.release = None
+
+
+def test_eager_pipeline_loads_all_components(vector_store_dir, fake_embedding_model, fake_generator):
+    pipeline = RAGPipeline(vector_store_dir, top_k=3)
+    assert pipeline.is_ready()
+
+    result = pipeline.query("credit card annual fee")
+    assert result["answer"] == "generated answer"
+    assert result["generated"] is True
+    assert len(result["retrieved_chunks"]) == 3
+
+    info = pipeline.get_pipeline_info()
+    assert set(info["components"]) == {"index", "chunks", "embedding_model", "generator"}
+    assert all(c["ready"] and c["load_seconds"] is not None for c in info["components"].values())
+
+
+def test_background_load_serves_retrieval_before_generator(vector_store_dir, fake_embedding_model, fake_generator):
+    fake_generator.release = threading.Event()
+    pipeline = RAGPipeline(vector_store_dir, top_k=2, background_load=True)
+
+    result = pipeline.query("zelle transfer delayed", wait_for_generator=False)
+    assert result["generated"] is False
+    assert result["answer"] == rag_pipeline.GENERATOR_LOADING_MESSAGE
+    assert result["retrieved_chunks"][0]["metadata"]["product_category"] == "Money Transfers"
+    assert not pipeline.get_pipeline_info()["components"]["generator"]["ready"]
+
+    fake_generator.release.set()
+    assert pipeline.query("zelle transfer delayed")["answer"] == "generated answer"
+    assert pipeline.is_ready("generator")
+
+
+def test_missing_store_raises(tmp_path, fake_embedding_model, fake_generator):
+    with pytest.raises(RuntimeError):
+        RAGPipeline(tmp_path)
+
+
+def test_query_many_batches_retrieval(vector_store_dir, fake_embedding_model, fake_generator):
+    pipeline = RAGPipeline(vector_store_dir, top_k=2)
+    questions = ["credit card annual fee", "zelle transfer delayed"]
+    results = pipeline.query_many(questions, product_categories=[None, "Money Transfers"])
+
+    assert [r["question"] for r in results] == questions
+    assert results[0]["retrieved_chunks"] == pipeline.query(questions[0])["retrieved_chunks"]
+    assert all(c["metadata"]["product_category"] == "Money Transfers"
+               for c in results[1]["retrieved_chunks"])
+    assert all(r["answer"] == "generated answer" for r in results)
+
+
+def test_query_stream_yields_sources_before_answer(
+    vector_store_dir, fake_embedding_model, fake_generator, monkeypatch
+):
+    pipeline = RAGPipeline(vector_store_dir, top_k=3)
+    updates = list(pipeline.query_stream("credit card annual fee"))
+
+    assert updates[0]["answer"] == "" and not updates[0]["done"]
+    assert [u["delta"] for u in updates[1:-1]] == ["generated", " answer"]
+    final = updates[-1]
+    assert final["done"] and final["generated"] and final["answer"] == "generated answer"
+    assert all(u["retrieved_chunks"] == final["retrieved_chunks"] for u in updates)
+    expected = pipeline.query("credit card annual fee")
+    assert [c.row for c in final["retrieved_chunks"]] == [c.row for c in expected["retrieved_chunks"]]
+    assert final["timings"]["time_to_sources"] <= final["timings"]["time_to_first_token"]
+
+    # time_to_first_token is recorded once per query, even after empty pieces
+    monkeypatch.setattr(fake_generator, "generate_stream", lambda self, prompt, **kwargs: iter(["", "", "answer"]))
+    before = pipeline.latency.get_stats().get("time_to_first_token", {}).get("count", 0)
+    assert list(pipeline.query_stream("zelle transfer delayed"))[-1]["answer"] == "answer"
+    assert pipeline.latency.get_stats()["time_to_first_token"]["count"] == before + 1
+
+    # An all-whitespace answer falls back like Generator.generate
+    monkeypatch.setattr(fake_generator, "generate_stream", lambda self, prompt, **kwargs: iter([" ", "\n"]))
+    final = list(pipeline.query_stream("overdraft fee charged twice"))[-1]
+    assert final["done"] and final["answer"] == "fallback answer"
+
+    # Nothing to generate: a single, final update
+    updates = list(pipeline.query_stream("credit card annual fee", min_similarity=1.01))
+    assert len(updates) == 1 and updates[0]["done"] and updates[0]["prompt"] is None
+
+
+def test_query_skips_generation_when_no_chunk_qualifies(
+    vector_store_dir, fake_embedding_model, fake_generator, monkeypatch
+):
+    calls = []
+    monkeypatch.setattr(
+        fake_generator, "generate", lambda self, prompt, **kwargs: calls.append(prompt) or "generated answer"
+    )
+    pipeline = RAGPipeline(vector_store_dir, top_k=3, min_similarity=1.01)
+
+    result = pipeline.query("credit card annual fee")
+    assert result["retrieved_chunks"] == [] and result["prompt"] is None
+    assert result["generated"] is False
+    assert result["answer"] == rag_pipeline.NO_RELEVANT_CHUNKS_MESSAGE
+    assert calls == []
+
+    result = pipeline.query("credit card annual fee", min_similarity=0.0)
+    assert result["generated"] is True and len(result["retrieved_chunks"]) == 3
+    assert calls == [result["prompt"]]
+
+
+def test_result_cache_reuses_answers_for_near_duplicate_questions(
+    vector_store_dir, fake_embedding_model, fake_generator, monkeypatch
+):
+    calls = []
+    monkeypatch.setattr(
+        fake_generator, "generate", lambda self, prompt, **kwargs: calls.append(prompt) or f"answer {len(calls)}"
+    )
+    pipeline = RAGPipeline(vector_store_dir, top_k=3, result_cache_size=8, result_cache_max_distance=0.05)
+
+    first = pipeline.query("credit card annual fee")
+    assert first["cached"] is False and first["answer"] == "answer 1"
+    # Same words in another order: identical bag-of-words embedding
+    again = pipeline.query("Annual fee credit card")
+    assert again["cached"] is True and again["answer"] == "answer 1"
+    assert again["question"] == "Annual fee credit card"
+    assert [c.row for c in again["retrieved_chunks"]] == [c.row for c in first["retrieved_chunks"]]
+    assert "dense_search" not in again["timings"] and len(calls) == 1
+
+    # Different filters or settings never share results; unrelated questions miss
+    assert pipeline.query("credit card annual fee", product_category="Credit Cards")["cached"] is False
+    assert pipeline.query("credit card annual fee", top_k=2)["cached"] is False
+    assert pipeline.query("zelle transfer delayed")["cached"] is False
+    stats = pipeline.get_pipeline_info()["result_cache"]
+    assert stats["hits"] == 1 and stats["misses"] == 4 and stats["entries"] == 4
+
+    # The cache lookup, the retrieval and the cached entry share one snapshot
+    loader = pipeline.vector_store_loader
+    snapshots = []
+    get_snapshot = loader.get_snapshot
+    monkeypatch.setattr(loader, "get_snapshot", lambda: snapshots.append(get_snapshot()) or snapshots[-1])
+    pipeline.query("loan denied")
+    assert len(snapshots) == 1
@@ -0,0 +1,48 @@
+"""
+Unit tests for src/result_cache.py.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip("numpy")
+
+from src.result_cache import SemanticResultCache
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_lookup_by_cosine_distance_within_partition():
+    cache = SemanticResultCache(max_entries=4, max_distance=0.05)
+    cache.put(unit(1, 0, 0), "v1", "key", {"answer": "a"})
+    cache.put(unit(0, 1, 0), "v1", "key", {"answer": "b"})
+
+    result, similarity = cache.get(unit(1, 0.2, 0), "v1", "key")
+    assert result["answer"] == "a" and similarity == pytest.approx(0.9806, abs=1e-3)
+    assert cache.get(unit(1, 0.5, 0), "v1", "key") is None  # cosine 0.89
+    assert cache.get(unit(1, 0, 0), "v1", "other key") is None
+    assert cache.get_stats()["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_lru_eviction_and_version_invalidation():
+    cache = SemanticResultCache(max_entries=2, max_distance=0.01)
+    cache.put(unit(1, 0, 0), "v1", "key", {"answer": "a"})
+    cache.put(unit(0, 1, 0), "v1", "key", {"answer": "b"})
+    assert cache.get(unit(1, 0, 0), "v1", "key") is not None  # "a" is now most recent
+    cache.put(unit(0, 0, 1), "v1", "key", {"answer": "c"})
+    assert cache.get(unit(0, 1, 0), "v1", "key") is None
+    assert len(cache) == 2 and cache.get_stats()["evictions"] == 1
+
+    # A new store version drops everything; late results of the old one are ignored
+    assert cache.get(unit(1, 0, 0), "v2", "key") is None
+    assert len(cache) == 0 and cache.get_stats()["invalidations"] == 2
+    cache.put(unit(1, 0, 0), "v1", "key", {"answer": "stale"})
+    assert len(cache) == 0
@@ -0,0 +1,242 @@
+"""
+Unit tests for src/retriever.py.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+
+from src.vector_store_loader import VectorStoreLoader
+from src.retriever import Retriever
+from src.query_cache import QueryEmbeddingCache
+from src.diversity import mmr_select
+from src.retrieved_chunk import RetrievedChunk
+
+QUERIES = [
+    "credit card annual fee",
+    "zelle money transfer delayed",
+    "loan application denied",
+    "fee charged twice",
+]
+
+
+@pytest.fixture
+def retriever(vector_store_dir, fake_embedding_model):
+    loader = VectorStoreLoader(vector_store_dir)
+    assert loader.load()
+    return Retriever(loader, top_k=3)
+
+
+def test_retrieve_many_matches_single_queries(retriever):
+    retriever.query_cache = None
+    single = [retriever.retrieve(query) for query in QUERIES]
+    calls = retriever.embedding_model.encode_calls
+
+    batched = retriever.retrieve_many(QUERIES)
+    assert retriever.embedding_model.encode_calls == calls + 1
+    assert batched == single
+    assert retriever.retrieve_many([]) == []
+
+
+def test_retrieve_many_applies_per_query_filters(retriever):
+    filters = [None, {"product_category": "Savings Accounts"}, None, {"product_category": "Credit Cards"}]
+    batched = retriever.retrieve_many(QUERIES, top_k=2, filters=filters)
+
+    assert batched[0] == retriever.retrieve(QUERIES[0], top_k=2)
+    assert batched[1] == retriever.retrieve_with_filter(QUERIES[1], "Savings Accounts", top_k=2)
+    assert all(r["metadata"]["product_category"] == "Savings Accounts" for r in batched[1])
+    assert all(r["metadata"]["product_category"] == "Credit Cards" for r in batched[3])
+
+    with pytest.raises(ValueError):
+        retriever.retrieve_many(QUERIES, filters=[None])
+
+
+def test_query_cache_skips_model_for_repeated_queries(retriever):
+    model = retriever.embedding_model
+    first = retriever.retrieve("Credit card annual fee")
+    calls = model.encode_calls
+
+    assert retriever.retrieve("  credit CARD   annual fee ") == first
+    assert model.encode_calls == calls
+    # Only the uncached query is embedded, once despite the repeat
+    retriever.retrieve_many(["credit card annual fee", "loan denied", "Loan denied"])
+    assert model.encode_calls == calls + 1
+    stats = retriever.get_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 3, 2)
+
+    # A different embedding model never reuses the vectors
+    retriever.vector_store.model_name = "other-model"
+    retriever.retrieve("credit card annual fee")
+    assert model.encode_calls == calls + 2
+
+    # Nor does another embedding backend (e.g. after an ONNX -> torch fallback)
+    retriever.vector_store.active_embedding_backend = "onnx_int8"
+    retriever.retrieve("credit card annual fee")
+    assert model.encode_calls == calls + 3
+
+
+def test_query_cache_evicts_and_expires(monkeypatch):
+    np = pytest.importorskip("numpy")
+    import src.query_cache as query_cache
+
+    now = [0.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=10)
+    for query in ["a", "b", "c"]:
+        cache.put(cache.make_key("m", query), np.ones(4))
+    assert cache.get(cache.make_key("m", "a")) is None
+    assert cache.get(cache.make_key("m", "C ")) is not None
+
+    now[0] = 11.0
+    assert cache.get(cache.make_key("m", "c")) is None
+    stats = cache.get_stats()
+    assert (stats["evictions"], stats["expirations"], stats["entries"]) == (1, 1, 1)
+
+
+def test_filtered_retrieval_returns_exactly_top_k(retriever):
+    # Money Transfers has 6 chunks; a global 3x over-fetch for a credit card
+    # query would not find them all
+    results = retriever.retrieve_with_filter("credit card annual fee", "Money Transfers", top_k=6)
+    assert len(results) == 6
+    assert {r["metadata"]["product_category"] for r in results} == {"Money Transfers"}
+    assert [r["rank"] for r in results] == [1, 2, 3, 4, 5, 6]
+
+    either = retriever.retrieve_many(
+        ["fee"], top_k=10, filters=[{"product_category": ["Money Transfers", "Personal Loans"]}]
+    )[0]
+    assert len(either) == 10
+
+
+def test_collapse_by_complaint_keeps_best_chunk_per_complaint(retriever):
+    query = "credit card annual fee"
+    chunks = retriever.retrieve(query, top_k=20)
+    collapsed = retriever.retrieve(query, top_k=5, collapse_by_complaint=True)
+
+    ids = [r["metadata"]["complaint_id"] for r in collapsed]
+    assert len(ids) == 5 and len(set(ids)) == 5
+    assert [r["rank"] for r in collapsed] == [1, 2, 3, 4, 5]
+    # Same order and scores as the first chunk of each complaint in the full ranking
+    first_seen = {}
+    for r in chunks:
+        first_seen.setdefault(r["metadata"]["complaint_id"], r)
+    expected = list(first_seen.values())[:5]
+    assert [r["chunk"] for r in collapsed] == [r["chunk"] for r in expected]
+
+    # Over-fetch grows until the filter's complaints are covered
+    cards = retriever.retrieve(query, top_k=3, filters={"product_category": "Credit Cards"},
+                               collapse_by_complaint=True)
+    assert sorted(r["metadata"]["complaint_id"] for r in cards) == ["0", "1", "2"]
+    hybrid = retriever.retrieve(query, top_k=5, mode="hybrid", collapse_by_complaint=True)
+    assert len({r["metadata"]["complaint_id"] for r in hybrid}) == 5
+
+
+def test_merge_siblings_returns_one_record_per_complaint(retriever, sample_records):
+    chunks, _ = sample_records
+    merged = retriever.retrieve("zelle money transfer delayed", top_k=3, merge_siblings=True)
+
+    assert len({r["metadata"]["complaint_id"] for r in merged}) == 3
+    top = merged[0]
+    assert top["metadata"]["complaint_id"] == "7"
+    assert top["num_chunks"] == 2
+    # The two halves share "was delayed"; the merged narrative holds it once
+    assert top["chunk"] == "zelle money transfer was delayed for two weeks"
+    assert top["best_chunk"] in chunks[14:16]
+
+
+def test_mmr_select_skips_near_duplicates():
+    import numpy as np
+
+    query = np.array([1.0, 0.0, 0.0], dtype="float32")
+    duplicate = np.array([0.9, 0.436, 0.0], dtype="float32")
+    other = np.array([0.8, 0.0, 0.6], dtype="float32")
+    candidates = np.vstack([duplicate, duplicate, other])
+
+    assert mmr_select(query, candidates, 2, mmr_lambda=1.0).tolist() == [0, 1]
+    assert mmr_select(query, candidates, 2, mmr_lambda=0.5).tolist() == [0, 2]
+    assert mmr_select(query, candidates, 5).tolist() == [0, 2, 1]
+    with pytest.raises(ValueError):
+        mmr_select(query, candidates, 2, mmr_lambda=1.5)
+
+
+def test_mmr_rerank_diversifies_results(retriever):
+    query = "money transfer fee"
+    plain = retriever.retrieve(query, top_k=4, mmr_lambda=1.0)
+    assert [r["chunk"] for r in plain] == [r["chunk"] for r in retriever.retrieve(query, top_k=4)]
+
+    timings = {}
+    diverse = retriever.retrieve_many([query], top_k=4, mmr_lambda=0.3, timings=timings)[0]
+    assert "mmr" in timings
+    assert len(diverse) == 4
+    assert diverse[0]["chunk"] == plain[0]["chunk"]
+    # Low lambda spreads the picks over more complaints
+    assert len({r["metadata"]["complaint_id"] for r in diverse}) >= len(
+        {r["metadata"]["complaint_id"] for r in plain}
+    )
+    hybrid = retriever.retrieve(query, top_k=4, mode="hybrid", mmr_lambda=0.3)
+    assert len(hybrid) == 4 and hybrid[0]["similarity_score"] is not None
+
+
+def test_min_similarity_drops_weak_chunks(retriever):
+    query = "zelle money transfer delayed"
+    ranked = retriever.retrieve(query, top_k=20)
+    threshold = (ranked[2]["similarity_score"] + ranked[3]["similarity_score"]) / 2
+
+    for options in ({}, {"collapse_by_complaint": True}, {"mode": "hybrid"}, {"mmr_lambda": 0.5}):
+        results = retriever.retrieve(query, top_k=10, min_similarity=threshold, **options)
+        assert results and all(r["similarity_score"] >= threshold for r in results)
+    assert [r["chunk"] for r in retriever.retrieve(query, top_k=10, min_similarity=threshold)] == [
+        r["chunk"] for r in ranked[:3]
+    ]
+    assert retriever.retrieve(query, min_similarity=1.01) == []
+
+
+def test_results_are_lazy_mapping_compatible_hits(retriever, sample_records):
+    chunks, metadata = sample_records
+    hit = retriever.retrieve("zelle money transfer delayed", top_k=1)[0]
+
+    assert isinstance(hit, RetrievedChunk)
+    assert hit._text is None and hit._metadata is None
+    assert hit["chunk"] == chunks[hit.row] and hit.get("metadata") == metadata[hit.row]
+    assert list(hit) == ["chunk", "metadata", "similarity_score", "rank"]
+    assert hit.to_dict() == {
+        "chunk": chunks[hit.row], "metadata": metadata[hit.row],
+        "similarity_score": hit.similarity_score, "rank": 1,
+    }
+    assert hit.get("fusion_score") is None and "fusion_score" not in hit
+    assert not hasattr(hit, "__dict__")
+
+    fused = retriever.retrieve("zelle money transfer delayed", top_k=1, mode="hybrid")[0]
+    assert "fusion_score" in fused and fused["dense_rank"] == 1
+
+
+def test_expand_neighbors_attaches_adjacent_chunks(retriever, sample_records):
+    from src.prompt_template import PromptTemplate
+
+    chunks, _ = sample_records
+    results = retriever.retrieve("zelle money transfer delayed", top_k=4, expand_neighbors=1)
+    for result in results:
+        row = result.row
+        # Each complaint has two chunks: the first has a next chunk, the second a previous one
+        if row % 2 == 0:
+            assert result["context_before"] == [] and result["context_after"] == [chunks[row + 1]]
+        else:
+            assert result["context_before"] == [chunks[row - 1]] and result["context_after"] == []
+    prompt = PromptTemplate.build_prompt_with_metadata("zelle?", results[:1])
+    assert "Narrative: zelle money transfer was delayed for two weeks" in prompt
+    assert "context_before" not in retriever.retrieve("zelle money transfer delayed", top_k=1)[0]
+
+
+def test_merge_overlapping_keeps_shared_text_once():
+    from src.prompt_template import PromptTemplate
+
+    text = "I was charged a late fee even though my payment was sent on time. The bank refused to refund it."
+    parts = [text[:60], text[45:], "Unrelated final chunk."]
+    assert PromptTemplate.merge_overlapping(parts[:2]) == text
+    assert PromptTemplate.merge_overlapping(parts) == text + " Unrelated final chunk."
@@ -0,0 +1,84 @@
+"""
+Unit tests for src/secondary_index.py (metadata filter expressions).
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip("numpy")
+
+from src.chunk_store import ChunkStore
+from src.secondary_index import SecondaryIndexes, filter_key
+
+
+@pytest.fixture
+def indexes(sample_records):
+    chunks, metadata = sample_records
+    return SecondaryIndexes(ChunkStore.from_records(chunks, metadata))
+
+
+def test_filter_expressions_resolve_to_rows(indexes, sample_records):
+    _, metadata = sample_records
+
+    def expected(predicate):
+        return [row for row, m in enumerate(metadata) if predicate(m)]
+
+    q4 = {"date_received": {"from": "2023-04-01", "to": "2023-06-30"}}
+    assert indexes.resolve(q4).tolist() == expected(lambda m: "2023-04" <= m["date_received"][:7] <= "2023-06")
+    assert indexes.resolve({"date_received": {"from": "2023-09-15"}}).tolist() == expected(
+        lambda m: m["date_received"] >= "2023-09-15"
+    )
+
+    mixed = {"product_category": ["Credit Cards", "Personal Loans"], "date_received": {"to": "2023-04-15"}}
+    assert indexes.resolve(mixed).tolist() == expected(
+        lambda m: m["product_category"] in ("Credit Cards", "Personal Loans")
+        and m["date_received"] <= "2023-04-15"
+    )
+    assert indexes.resolve({"product_category": "Unknown"}).tolist() == []
+    assert indexes.resolve({"complaint_id": ["3", "7"]}).tolist() == [6, 7, 14, 15]
+    assert filter_key(mixed) == filter_key(dict(reversed(list(mixed.items()))))
+
+    with pytest.raises(ValueError):
+        indexes.resolve({"product_category": {"from": "A"}})
+
+
+def test_complaint_ranges(indexes):
+    ranges = indexes.complaint_ranges
+    assert ranges.ranges(["3"]) == [(6, 7)]
+    assert ranges.ranges(["9", "0"]) == [(0, 1), (18, 19)]
+    assert ranges.ranges(["42", "not-an-id"]) == []
+
+    # row -> group numbers complaints densely; groups list their rows back
+    assert ranges.num_groups == 10
+    groups = ranges.row_groups
+    assert len(groups) == 20 and (groups[0::2] == groups[1::2]).all()
+    assert len(set(groups[0::2].tolist())) == 10
+    assert ranges.group_rows(int(groups[6])).tolist() == [6, 7]
+
+    # Neighbouring chunks stay within their complaint
+    assert ranges.neighbour_rows([6, 7, 0, 19, -1], 1).tolist() == [7, -1, 1, -1, -1]
+    assert ranges.neighbour_rows([6, 7, 0, 19, -1], -1).tolist() == [-1, 6, -1, 18, -1]
+
+
+def test_retriever_pushes_date_filter_into_search(vector_store_dir, fake_embedding_model):
+    pytest.importorskip("faiss")
+    pytest.importorskip("sentence_transformers")
+    from src.vector_store_loader import VectorStoreLoader
+    from src.retriever import Retriever
+
+    loader = VectorStoreLoader(vector_store_dir)
+    assert loader.load()
+    retriever = Retriever(loader, top_k=4)
+    last_quarter = {"date_received": {"from": "2023-08-01", "to": "2023-10-31"}}
+
+    results = retriever.retrieve("money transfer fee", filters=last_quarter)
+    assert len(results) == 4
+    assert all("2023-08-01" <= r["metadata"]["date_received"] <= "2023-10-31" for r in results)
+    assert loader.get_snapshot().row_filter(last_quarter) is loader.get_snapshot().row_filter(
+        dict(reversed(list(last_quarter.items())))
+    )
@@ -0,0 +1,124 @@
+"""
+Unit tests for src/sharded_index.py and sharded store builds.
+"""
+
+import os
+import threading
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+faiss = pytest.importorskip("faiss")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sentence_transformers")
+
+from src.sharded_index import ShardedIndex, shard_ranges
+from src.store_builder import write_vector_store
+from src.vector_store_loader import VectorStoreLoader
+from src.retriever import Retriever
+from tests.conftest import FakeEmbeddingModel
+
+
+def test_shard_ranges_cover_all_rows():
+    ranges = shard_ranges(10, 3)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    with pytest.raises(ValueError):
+        shard_ranges(10, 0)
+
+
+@pytest.mark.parametrize("metric", [faiss.METRIC_INNER_PRODUCT, faiss.METRIC_L2])
+def test_merged_search_matches_flat_index(metric):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((103, 16)).astype(np.float32)
+    queries = rng.standard_normal((7, 16)).astype(np.float32)
+
+    flat = faiss.IndexFlat(16, metric)
+    flat.add(vectors)
+    shards, starts = [], []
+    for start, end in shard_ranges(len(vectors), 4):
+        shard = faiss.IndexFlat(16, metric)
+        shard.add(vectors[start:end])
+        shards.append(shard)
+        starts.append(start)
+    sharded = ShardedIndex(shards, starts)
+
+    expected_d, expected_i = flat.search(queries, 10)
+    distances, labels = sharded.search(queries, 10)
+    np.testing.assert_array_equal(labels, expected_i)
+    np.testing.assert_allclose(distances, expected_d, rtol=1e-5)
+    np.testing.assert_array_equal(sharded.reconstruct(57), vectors[57])
+    rows = [99, 3, 57, 30]
+    np.testing.assert_array_equal(sharded.reconstruct_batch(rows), vectors[rows])
+    np.testing.assert_array_equal(sharded.reconstruct_n(20, 60), vectors[20:80])
+
+    # Asking for more neighbours than vectors pads with -1
+    _, labels = sharded.search(queries[:1], 110)
+    assert (labels[0, 103:] == -1).all() and sorted(labels[0, :103]) == list(range(103))
+
+    # Views built per snapshot share one search pool instead of starting threads each
+    for _ in range(5):
+        ShardedIndex(shards, starts).search(queries, 10)
+    search_threads = [t for t in threading.enumerate() if t.name.startswith("shard-search")]
+    assert len(search_threads) <= (os.cpu_count() or 1)
+
+
+@pytest.mark.parametrize("index_load_mode", ["eager", "mmap"])
+def test_sharded_build_retrieves_like_flat_build(
+    tmp_path, sample_records, fake_embedding_model, index_load_mode
+):
+    chunks, metadata = sample_records
+    embeddings = FakeEmbeddingModel().encode(chunks)
+    write_vector_store(tmp_path / "flat", chunks, metadata, embeddings, "fake-model")
+    manifest = write_vector_store(
+        tmp_path / "sharded", chunks, metadata, embeddings, "fake-model", num_shards=3
+    )
+    assert manifest["num_shards"] == 3
+    assert "shards/shard_002.index" in manifest["files"]
+
+    results = {}
+    for name in ("flat", "sharded"):
+        loader = VectorStoreLoader(tmp_path / name, index_load_mode=index_load_mode)
+        assert loader.load()
+        retriever = Retriever(loader, top_k=5)
+        results[name] = retriever.retrieve("credit card fee charged")
+    assert isinstance(loader.index, ShardedIndex)
+    assert loader.get_index_memory()["index_file_bytes"] > 0
+
+    assert [r["chunk"] for r in results["sharded"]] == [r["chunk"] for r in results["flat"]]
+    assert [r["similarity_score"] for r in results["sharded"]] == pytest.approx(
+        [r["similarity_score"] for r in results["flat"]]
+    )
+
+
+def test_rebuild_into_same_directory_replaces_the_other_layout(
+    tmp_path, sample_records, fake_embedding_model
+):
+    chunks, metadata = sample_records
+    embeddings = FakeEmbeddingModel().encode(chunks)
+    store_dir = tmp_path / "store"
+    expected = None
+    for num_shards in (3, 1, 2):
+        manifest = write_vector_store(
+            store_dir, chunks, metadata, embeddings, "fake-model", num_shards=num_shards
+        )
+        loader = VectorStoreLoader(store_dir)
+        assert loader.load()
+        if num_shards == 1:
+            assert not (store_dir / "shards.json").exists() and not (store_dir / "shards").exists()
+            assert not isinstance(loader.index, ShardedIndex)
+            assert not any(name.startswith("shards") for name in manifest["files"])
+        else:
+            assert not (store_dir / "complaint_embeddings.index").exists()
+            assert isinstance(loader.index, ShardedIndex) and len(loader.index.shards) == num_shards
+            assert sorted(p.name for p in (store_dir / "shards").iterdir()) == [
+                f"shard_{i:03d}.index" for i in range(num_shards)
+            ]
+            assert "complaint_embeddings.index" not in manifest["files"]
+        rows = [r.row for r in Retriever(loader, top_k=5).retrieve("credit card fee charged")]
+        assert expected is None or rows == expected
+        expected = rows
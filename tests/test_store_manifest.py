@@ -0,0 +1,111 @@
+"""
+Unit tests for src/store_manifest.py and vector store hot reloading.
+"""
+
+import shutil
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+
+from src.store_manifest import (
+    publish_version,
+    read_manifest,
+    resolve_active_dir,
+    verify_manifest,
+    write_manifest,
+)
+from src.vector_store_loader import VectorStoreLoader
+from src.retriever import Retriever
+
+
+def _stamp(build_dir, build_id):
+    index = faiss.read_index(str(build_dir / "complaint_embeddings.index"))
+    return write_manifest(build_dir, index.ntotal, build_id=build_id,
+                          extra={"embedding_model": "fake-model"})
+
+
+def test_manifest_detects_tampering(vector_store_dir):
+    manifest = _stamp(vector_store_dir, "build-1")
+    assert read_manifest(vector_store_dir)["build_id"] == "build-1"
+    assert verify_manifest(vector_store_dir, manifest, vector_count=manifest["vector_count"]) == []
+
+    text_path = vector_store_dir / "chunk_store" / "text.bin"
+    data = bytearray(text_path.read_bytes())
+    data[0] ^= 0xFF
+    text_path.write_bytes(bytes(data))
+    problems = verify_manifest(vector_store_dir, manifest, vector_count=manifest["vector_count"] + 1)
+    assert any("checksum" in p for p in problems)
+    assert any("vectors" in p for p in problems)
+
+
+def test_load_fails_on_manifest_mismatch(vector_store_dir, fake_embedding_model):
+    manifest = _stamp(vector_store_dir, "build-1")
+    manifest_path = vector_store_dir / "manifest.json"
+    manifest_path.write_text(manifest_path.read_text().replace(
+        f'"vector_count": {manifest["vector_count"]}', '"vector_count": 3'))
+    assert VectorStoreLoader(vector_store_dir).load() is False
+
+
+def test_reload_swaps_published_version(tmp_path, vector_store_dir, fake_embedding_model):
+    root = tmp_path / "versioned"
+    root.mkdir()
+    _stamp(vector_store_dir, "build-1")
+    build_2 = tmp_path / "build-2"
+    shutil.copytree(vector_store_dir, build_2)
+    publish_version(root, vector_store_dir)
+    assert resolve_active_dir(root) == root / "versions" / "build-1"
+
+    loader = VectorStoreLoader(root)
+    assert loader.load()
+    retriever = Retriever(loader, top_k=3)
+    old_snapshot = loader.get_snapshot()
+    assert loader.reload() is False  # nothing new published
+
+    # Second build holds only the first 4 rows of the first one
+    index = faiss.read_index(str(build_2 / "complaint_embeddings.index"))
+    small = faiss.IndexFlatIP(index.d)
+    small.add(index.reconstruct_n(0, 4))
+    faiss.write_index(small, str(build_2 / "complaint_embeddings.index"))
+    from src.chunk_store import ChunkStore
+    store = ChunkStore.open(build_2 / "chunk_store")
+    ChunkStore.from_records(store.chunks[:4], store.metadata[:4], store.attributes).save(
+        tmp_path / "chunk_store_tmp")
+    shutil.rmtree(build_2 / "chunk_store")
+    shutil.move(str(tmp_path / "chunk_store_tmp"), str(build_2 / "chunk_store"))
+    _stamp(build_2, "build-2")
+    publish_version(root, build_2)
+
+    assert loader.check_for_update() == "build-2"
+    assert loader.reload() is True
+    new_snapshot = loader.get_snapshot()
+    assert new_snapshot.version == "build-2"
+    assert new_snapshot.index.ntotal == len(new_snapshot.chunks) == 4
+    # A query that captured the old snapshot keeps reading the old build
+    assert old_snapshot.index.ntotal == len(old_snapshot.chunks) == 20
+    results = retriever.retrieve("money transfer delayed", top_k=10)
+    assert len(results) == 4
+    assert loader.get_summary()["store_version"] == "build-2"
+
+
+def test_reload_rejects_corrupt_build(tmp_path, vector_store_dir, fake_embedding_model):
+    root = tmp_path / "versioned"
+    root.mkdir()
+    build_2 = tmp_path / "build-2"
+    shutil.copytree(vector_store_dir, build_2)
+    _stamp(vector_store_dir, "build-1")
+    publish_version(root, vector_store_dir)
+    loader = VectorStoreLoader(root)
+    assert loader.load()
+
+    _stamp(build_2, "build-2")
+    (build_2 / "chunk_store" / "text.bin").write_bytes(b"x" * (build_2 / "chunk_store" / "text.bin").stat().st_size)
+    publish_version(root, build_2)
+    assert loader.reload() is False
+    assert loader.get_snapshot().version == "build-1"
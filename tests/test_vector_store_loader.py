@@ -0,0 +1,95 @@
+"""
+Unit tests for src/vector_store_loader.py.
+
+Uses a small synthetic FAISS index so no embedding model is required.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+faiss = pytest.importorskip("faiss")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sentence_transformers")
+
+from src.vector_store_loader import VectorStoreLoader
+
+
+@pytest.fixture
+def flat_store(tmp_path):
+    """Write a normalized 200 x 16 IndexFlatIP to a temporary vector store."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 16)).astype("float32")
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(16)
+    index.add(vectors)
+    faiss.write_index(index, str(tmp_path / "complaint_embeddings.index"))
+    return tmp_path, vectors
+
+
+def test_invalid_load_mode_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        VectorStoreLoader(tmp_path, index_load_mode="lazy")
+
+
+def test_mmap_load_matches_eager_search(flat_store):
+    store_dir, vectors = flat_store
+    eager = VectorStoreLoader(store_dir, index_load_mode="eager").load_index()
+    mmap_loader = VectorStoreLoader(store_dir, index_load_mode="mmap")
+    mapped = mmap_loader.load_index()
+
+    assert mapped.ntotal == eager.ntotal == 200
+    d_eager, i_eager = eager.search(vectors[:5], 3)
+    d_mmap, i_mmap = mapped.search(vectors[:5], 3)
+    np.testing.assert_array_equal(i_eager, i_mmap)
+    np.testing.assert_allclose(d_eager, d_mmap)
+
+
+def test_index_memory_reports_mode(flat_store):
+    store_dir, _ = flat_store
+    file_bytes = (store_dir / "complaint_embeddings.index").stat().st_size
+
+    eager = VectorStoreLoader(store_dir)
+    eager.load_index()
+    eager_stats = eager.get_index_memory()
+    assert eager_stats["mmapped"] is False
+    assert eager_stats["mapped_bytes"] == 0
+    assert eager_stats["resident_bytes"] == file_bytes
+
+    mapped = VectorStoreLoader(store_dir, index_load_mode="mmap")
+    mapped.load_index()
+    mapped_stats = mapped.get_index_memory()
+    if mapped_stats["mmapped"]:
+        assert mapped_stats["mapped_bytes"] > 0
+    assert "index_memory" in mapped.get_summary()
+
+
+def test_load_chunks_prefers_columnar_store(tmp_path):
+    import pickle
+    from src.chunk_store import convert_pickle_to_chunk_store
+
+    chunks = ["late fee charged", "transfer delayed"]
+    metadata = [
+        {"complaint_id": "1", "product_category": "Credit Cards", "chunk_index": 0},
+        {"complaint_id": "2", "product_category": "Money Transfers", "chunk_index": 0},
+    ]
+    with open(tmp_path / "chunk_metadata.pkl", "wb") as f:
+        pickle.dump({"chunks": chunks, "metadata": metadata, "embedding_dimension": 16}, f)
+
+    from_pickle = VectorStoreLoader(tmp_path)
+    assert not from_pickle.has_chunk_store()
+    from_pickle.load_chunks()
+
+    convert_pickle_to_chunk_store(tmp_path / "chunk_metadata.pkl")
+    from_store = VectorStoreLoader(tmp_path)
+    assert from_store.has_chunk_store()
+    from_store.load_chunks()
+
+    for loader in (from_pickle, from_store):
+        assert list(loader.chunks) == chunks
+        assert list(loader.metadata) == metadata
+        assert loader.embedding_dimension == 16